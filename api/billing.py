@@ -0,0 +1,167 @@
+"""
+Stripe webhook processing.
+
+The webhook endpoint only verifies the signature, records the event in the
+stripe_events table (supabase-schema.sql) and acknowledges; tier changes are
+applied afterwards by process_event, outside the request. The Stripe event id
+is the table's primary key, so a redelivered event finds its row and is
+acknowledged without being applied again.
+
+An event is applied by whoever claims its row. Inserting the row claims it;
+so does a conditional update that only matches a failed event, or a pending
+one whose claim is older than STALE_AFTER (its worker died mid-way). Two
+workers racing for the same row cannot both match, so an event is never
+applied twice at once. sweep_events, which the API runs every
+STRIPE_SWEEP_INTERVAL seconds, re-claims stale and failed events, so one
+acknowledged but never applied is retried without waiting for Stripe.
+
+Profiles are matched by stripe_customer_id, which checkout stores, so a
+cancellation is one indexed update with no call back to Stripe. Callers pass
+the Stripe SDK configured with the secret key (main.get_stripe), which the
+email lookup for older profiles needs, whether it runs after a webhook or
+from the sweep.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+# Events that change a user's tier; anything else is acknowledged and ignored
+HANDLED_EVENTS = ("checkout.session.completed", "customer.subscription.deleted")
+
+# A pending claim older than this belongs to a worker that died before finishing
+STALE_AFTER = timedelta(minutes=5)
+
+# Failed events are retried by the sweep at most every RETRY_DELAY, up to MAX_ATTEMPTS
+# in total (a manual resend from the Stripe dashboard retries one past that)
+RETRY_DELAY = timedelta(minutes=1)
+MAX_ATTEMPTS = 5
+
+SWEEP_BATCH = 50
+
+
+def _timestamp(moment: datetime) -> str:
+    # No "+00:00" suffix, so the value can sit inside a PostgREST or= filter
+    return moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def claimable_filter(now: datetime, retry_failed_after: timedelta = timedelta(0), max_attempts: Optional[int] = None) -> str:
+    """PostgREST or= filter matching events that may be claimed at `now`."""
+    failed = f"status.eq.failed,claimed_at.lt.{_timestamp(now - retry_failed_after)}"
+    if max_attempts is not None:
+        failed += f",attempts.lt.{max_attempts}"
+    return f"and({failed}),and(status.eq.pending,claimed_at.lt.{_timestamp(now - STALE_AFTER)})"
+
+
+def claim_event(supabase, event_id: str, filters: str) -> Optional[dict]:
+    """Mark an event pending and claimed now if it matches `filters`; returns the row, or None if not claimed."""
+    result = supabase.table("stripe_events").update({
+        "status": "pending",
+        "claimed_at": _timestamp(datetime.now(timezone.utc)),
+    }).eq("id", event_id).or_(filters).execute()
+    return result.data[0] if result.data else None
+
+
+def record_event(supabase, event: dict) -> Optional[dict]:
+    """
+    Store an event as pending and claim it. Returns the claimed row, or None if
+    the event is already processed or being processed, so redeliveries are no-ops.
+    A redelivered failed or stale pending event is claimed again.
+    """
+    result = supabase.table("stripe_events").upsert(
+        {
+            "id": event["id"],
+            "type": event["type"],
+            "payload": event["data"]["object"],
+            "status": "pending",
+            "claimed_at": _timestamp(datetime.now(timezone.utc)),
+        },
+        on_conflict="id",
+        ignore_duplicates=True,
+    ).execute()
+    if result.data:
+        return result.data[0]
+
+    return claim_event(supabase, event["id"], claimable_filter(datetime.now(timezone.utc)))
+
+
+def apply_event(supabase, stripe, event_type: str, obj: dict):
+    """Apply one event's tier change to user_profiles"""
+    if event_type == "checkout.session.completed":
+        customer_id = obj.get("customer")
+        customer_email = obj.get("customer_email") or (obj.get("customer_details") or {}).get("email")
+        update = {
+            "tier": "pro",
+            "tier_expires_at": None,  # Subscription doesn't expire (handled by Stripe)
+        }
+        if customer_id:
+            update["stripe_customer_id"] = customer_id
+        if obj.get("subscription"):
+            update["stripe_subscription_id"] = obj["subscription"]
+
+        if customer_email:
+            supabase.table("user_profiles").update(update).eq("email", customer_email).execute()
+            print(f"[Stripe] Upgraded {customer_email} to Pro tier")
+        elif customer_id:
+            supabase.table("user_profiles").update(update).eq("stripe_customer_id", customer_id).execute()
+            print(f"[Stripe] Upgraded customer {customer_id} to Pro tier")
+
+    elif event_type == "customer.subscription.deleted":
+        customer_id = obj.get("customer")
+        if not customer_id:
+            return
+
+        result = supabase.table("user_profiles").update({"tier": "free"}).eq("stripe_customer_id", customer_id).execute()
+        if result.data:
+            print(f"[Stripe] Downgraded customer {customer_id} to Free tier")
+            return
+
+        # Profiles upgraded before stripe_customer_id was stored: look the email up once and backfill it
+        customer_email = stripe.Customer.retrieve(customer_id).get("email")
+        if customer_email:
+            supabase.table("user_profiles").update({"tier": "free", "stripe_customer_id": customer_id}).eq("email", customer_email).execute()
+            print(f"[Stripe] Downgraded {customer_email} to Free tier")
+
+
+def process_event(supabase, stripe, event_id: str, event_type: str, obj: dict, attempts: int = 0):
+    """
+    Apply a claimed event once and store the outcome. Runs as a background task
+    or from sweep_events; a failure is left for the next sweep to retry.
+    """
+    try:
+        apply_event(supabase, stripe, event_type, obj)
+        status, error = "processed", None
+    except Exception as e:
+        status, error = "failed", str(e)
+        print(f"[Stripe] Event {event_id} attempt {attempts + 1}/{MAX_ATTEMPTS} failed: {e}")
+
+    try:
+        supabase.table("stripe_events").update({
+            "status": status,
+            "attempts": attempts + 1,
+            "last_error": error,
+            "processed_at": _timestamp(datetime.now(timezone.utc)),
+        }).eq("id", event_id).execute()
+    except Exception as e:
+        # The row stays pending and is picked up again once its claim is stale
+        print(f"[Stripe] Failed to record outcome of event {event_id}: {e}")
+
+
+def sweep_events(supabase, stripe, limit: int = SWEEP_BATCH) -> int:
+    """
+    Claim and apply failed events due for a retry and pending events whose
+    worker never finished them. Returns the number of events claimed.
+    """
+    filters = claimable_filter(datetime.now(timezone.utc), RETRY_DELAY, MAX_ATTEMPTS)
+    rows = supabase.table("stripe_events").select("id, type, payload, attempts").or_(filters).limit(limit).execute().data
+
+    claimed = 0
+    for row in rows:
+        # Another worker's sweep or a redelivery may have claimed it since the select
+        claimed_row = claim_event(supabase, row["id"], filters)
+        if claimed_row is None:
+            continue
+        claimed += 1
+        process_event(supabase, stripe, row["id"], row["type"], row["payload"], claimed_row["attempts"])
+    if claimed:
+        print(f"[Stripe] Sweep re-applied {claimed} event(s)")
+    return claimed
@@ -0,0 +1,110 @@
+"""
+Per-process caches kept coherent across API worker processes.
+
+Each worker caches query results locally. A generation counter stored in a
+small memory-mapped file is shared by every worker on the host; writers bump
+it when the underlying data changes and every cache drops its entries as soon
+as it sees a newer generation. Reading the counter is a single 8-byte load,
+so checking coherence costs nothing on the request path.
+"""
+
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Hashable
+
+
+def default_generation_path(name: str, scope: str) -> Path:
+    """
+    Shared-memory location for a generation counter (falls back to the temp dir).
+    The path is namespaced by `scope`, which should identify the data the counter
+    guards (e.g. a database URL or path): processes caching the same data share a
+    counter, while other deployments or test runs on the host get their own.
+    """
+    shm = Path("/dev/shm")
+    digest = hashlib.sha256(scope.encode()).hexdigest()[:12]
+    return (shm if shm.is_dir() else Path(tempfile.gettempdir())) / f"robosim-{name}-{digest}.gen"
+
+
+class GenerationCounter:
+    """Monotonic counter shared by all processes that map the same file."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._lock = threading.Lock()  # flock does not exclude threads of one process
+
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size < 8:
+                os.ftruncate(self._fd, 8)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+        self._mmap = mmap.mmap(self._fd, 8)
+
+    def current(self) -> int:
+        return struct.unpack_from("<Q", self._mmap)[0]
+
+    def bump(self) -> int:
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                value = self.current() + 1
+                struct.pack_into("<Q", self._mmap, 0, value)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        return value
+
+
+class GenerationCache:
+    """Process-local LRU cache invalidated whenever the shared generation changes."""
+
+    def __init__(self, counter: GenerationCounter, max_entries: int = 1024, max_age: float = 60.0):
+        self.counter = counter
+        self.max_entries = max_entries
+        # Upper bound on staleness for writes that bypass invalidate() (e.g. direct database edits)
+        self.max_age = max_age
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._generation = counter.current()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable):
+        """Return the cached value for key, computing and storing it on a miss"""
+        with self._lock:
+            self._sync()
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] <= self.max_age:
+                self._entries.move_to_end(key)
+                return entry[1]
+            generation = self._generation
+
+        value = compute()
+
+        with self._lock:
+            # Don't store a value computed against data that changed meanwhile
+            if self.counter.current() == generation:
+                self._entries[key] = (time.monotonic(), value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self):
+        """Drop cached entries in every worker"""
+        self.counter.bump()
+        with self._lock:
+            self._sync()
+
+    def _sync(self):
+        generation = self.counter.current()
+        if generation != self._generation:
+            self._entries.clear()
+            self._generation = generation
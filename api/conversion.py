@@ -0,0 +1,332 @@
+"""
+Episode to Parquet conversion (CPU-bound).
+
+These functions take plain dicts and only depend on pyarrow and numpy so they
+can run in a worker process of the conversion pool without importing the web
+app. Episodes are dicts with "episodeIndex", "frames" and "metadata" keys, as
+in the Episode request model.
+
+For robots with a known URDF, rows get an "observation.ee_position" column:
+the end-effector position (meters, Y-up Three.js frame) from batched forward
+kinematics of observation.state.
+"""
+
+import io
+import json
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from api.kinematics import ROBOTS, app_to_radians, end_effector_positions, load_chain, normalize_robot_type
+
+EE_COLUMN = "observation.ee_position"
+
+# Single data file of an uploaded dataset, relative to the dataset root
+DATA_FILE = "data/train-00000-of-00001.parquet"
+
+# Columns with few distinct values (task_index has one per task). Joint values
+# are left plain: they rarely repeat, so building a dictionary for them only
+# costs write time before falling back to plain encoding.
+DICTIONARY_COLUMNS = ["episode_index", "frame_index", "timestamp", "task_index"]
+
+
+def end_effector_column(robot_type: Optional[str], states: list) -> Optional[pa.Array]:
+    """
+    Fixed-size list<float32, 3> array of end-effector positions for state rows,
+    or None if the robot's kinematics are unknown or states are missing/ragged.
+    Frames with arm joints past the URDF limits are reported, then clamped.
+    """
+    if not robot_type or load_chain(robot_type) is None or not states:
+        return None
+    dof = len(ROBOTS[normalize_robot_type(robot_type)]["joints"])
+    if any(state is None or len(state) != dof for state in states):
+        return None
+
+    positions = np.asarray(states, dtype=float)
+    inside = load_chain(robot_type).within_limits(app_to_radians(robot_type, positions, clamp=False))
+    outside = int(np.count_nonzero(~inside))
+    if outside:
+        print(f"[Dataset] {outside} of {len(positions)} frames have joints outside the {robot_type} URDF limits")
+
+    ee = end_effector_positions(robot_type, positions).astype(np.float32)
+    return pa.FixedSizeListArray.from_arrays(pa.array(ee.ravel()), 3)
+
+
+def convert_episodes(episodes: List[dict], robot_type: Optional[str] = None) -> dict:
+    """
+    Convert episodes to a Parquet file in memory, with end-effector positions
+    when `robot_type` has known kinematics.
+    Returns {"parquet": bytes, "num_rows": int}; num_rows is 0 if there are no frames.
+    """
+    all_rows = []
+
+    for episode in episodes:
+        ep_idx = episode["episodeIndex"]
+
+        for frame_idx, frame in enumerate(episode["frames"]):
+            obs = frame.get("observation", {})
+            action = frame.get("action", {})
+
+            row = {
+                "episode_index": ep_idx,
+                "frame_index": frame_idx,
+                "timestamp": frame.get("timestamp", frame_idx / 30.0),
+            }
+
+            if "jointPositions" in obs:
+                row["observation.state"] = obs["jointPositions"]
+            if "jointPositions" in action:
+                row["action"] = action["jointPositions"]
+
+            all_rows.append(row)
+
+    if not all_rows:
+        return {"parquet": b"", "num_rows": 0}
+
+    # Create simple columnar format
+    columns = {
+        "episode_index": [r["episode_index"] for r in all_rows],
+        "frame_index": [r["frame_index"] for r in all_rows],
+        "timestamp": [r["timestamp"] for r in all_rows],
+    }
+
+    if "observation.state" in all_rows[0]:
+        columns["observation.state"] = [r.get("observation.state", []) for r in all_rows]
+    if "action" in all_rows[0]:
+        columns["action"] = [r.get("action", []) for r in all_rows]
+    if "observation.state" in columns:
+        ee = end_effector_column(robot_type, columns["observation.state"])
+        if ee is not None:
+            columns[EE_COLUMN] = ee
+
+    table = pa.table(columns)
+
+    # Write to buffer
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer)
+
+    return {"parquet": buffer.getvalue(), "num_rows": len(all_rows)}
+
+
+def write_lerobot_dataset(
+    folder: str,
+    episodes: List[dict],
+    robot_type: str,
+    fps: int,
+    repo_name: str,
+    repo_id: str,
+) -> None:
+    """
+    Write episodes to `folder` in LeRobot v3.0 layout:
+    - data/train-XXXXX-of-XXXXX.parquet (episode data)
+    - meta/info.json (dataset metadata)
+    - meta/episodes.jsonl (episode metadata)
+    - meta/tasks.jsonl (task descriptions)
+    - meta/task_episodes.json (episodes and row ranges of each task)
+    - README.md (dataset card)
+
+    Each episode's languageInstruction is its task. Task indices are assigned
+    in order of first appearance, so the same episodes always get the same indices.
+    """
+    tmppath = Path(folder)
+
+    # Create directory structure
+    (tmppath / "data").mkdir()
+    (tmppath / "meta").mkdir()
+
+    # Convert all episodes to a single Parquet file
+    all_rows = []
+    episode_metadata = []
+    task_indices = {}  # task -> task_index, in first-seen order
+    task_episodes = []  # per task_index: its episodes and their rows in the Parquet file
+
+    for episode in episodes:
+        ep_idx = episode["episodeIndex"]
+        task = episode["metadata"].get("languageInstruction", "manipulation task")
+        task_index = task_indices.setdefault(task, len(task_indices))
+        if task_index == len(task_episodes):
+            task_episodes.append({"task_index": task_index, "task": task, "episodes": [], "row_ranges": [], "num_frames": 0})
+
+        # Episodes are written in order, so an episode's rows are one contiguous range
+        start, end = len(all_rows), len(all_rows) + len(episode["frames"])
+        entry = task_episodes[task_index]
+        entry["episodes"].append(ep_idx)
+        entry["num_frames"] += end - start
+        if entry["row_ranges"] and entry["row_ranges"][-1][1] == start:
+            entry["row_ranges"][-1][1] = end
+        elif end > start:
+            entry["row_ranges"].append([start, end])
+
+        episode_metadata.append({
+            "episode_index": ep_idx,
+            "tasks": [task],
+            "length": len(episode["frames"]),
+        })
+
+        for frame_idx, frame in enumerate(episode["frames"]):
+            obs = frame.get("observation", {})
+            action = frame.get("action", {})
+
+            row = {
+                "episode_index": ep_idx,
+                "frame_index": frame_idx,
+                "timestamp": frame.get("timestamp", frame_idx / 30.0),
+                "task_index": task_index,
+            }
+
+            # Add observation fields
+            if "jointPositions" in obs:
+                row["observation.state"] = obs["jointPositions"]
+            if "image" in obs:
+                # Store image as bytes if present
+                row["observation.image"] = obs["image"]
+
+            # Add action fields
+            if "jointPositions" in action:
+                row["action"] = action["jointPositions"]
+            elif "targetPositions" in action:
+                row["action"] = action["targetPositions"]
+
+            all_rows.append(row)
+
+    # Create Parquet file
+    ee = None
+    if all_rows:
+        # Build schema dynamically based on data
+        schema_fields = [
+            ("episode_index", pa.int64()),
+            ("frame_index", pa.int64()),
+            ("timestamp", pa.float64()),
+            ("task_index", pa.int64()),
+        ]
+
+        # Check for state/action dimensions from first row
+        sample_row = all_rows[0]
+        if "observation.state" in sample_row:
+            state_dim = len(sample_row["observation.state"])
+            schema_fields.append(("observation.state", pa.list_(pa.float32(), state_dim)))
+        if "action" in sample_row:
+            action_dim = len(sample_row["action"])
+            schema_fields.append(("action", pa.list_(pa.float32(), action_dim)))
+
+        # Convert to columnar format
+        columns = {field[0]: [] for field in schema_fields}
+        for row in all_rows:
+            for field_name, _ in schema_fields:
+                if field_name in row:
+                    val = row[field_name]
+                    # Convert lists to proper format
+                    if isinstance(val, list):
+                        columns[field_name].append([float(v) for v in val])
+                    else:
+                        columns[field_name].append(val)
+                else:
+                    columns[field_name].append(None)
+
+        # Create PyArrow table
+        arrays = []
+        names = []
+        for field_name, field_type in schema_fields:
+            if field_name in columns and columns[field_name]:
+                arrays.append(pa.array(columns[field_name], type=field_type))
+                names.append(field_name)
+
+        ee = end_effector_column(robot_type, columns.get("observation.state"))
+        if ee is not None:
+            arrays.append(ee)
+            names.append(EE_COLUMN)
+
+        table = pa.table(dict(zip(names, arrays)))
+
+        # Write Parquet file, dictionary-encoding only the low-cardinality columns
+        pq.write_table(table, tmppath / DATA_FILE, use_dictionary=DICTIONARY_COLUMNS)
+
+    total_frames = sum(len(ep["frames"]) for ep in episodes)
+
+    # Create meta/info.json
+    info = {
+        "codebase_version": "v3.0",
+        "robot_type": robot_type,
+        "fps": fps,
+        "total_episodes": len(episodes),
+        "total_frames": total_frames,
+        "total_tasks": len(task_indices),
+        "features": {
+            "observation.state": {
+                "dtype": "float32",
+                "shape": [len(all_rows[0].get("observation.state", []))] if all_rows else [6],
+                "names": ["joint_1", "joint_2", "joint_3", "joint_4", "joint_5", "gripper"],
+            },
+            "action": {
+                "dtype": "float32",
+                "shape": [len(all_rows[0].get("action", []))] if all_rows else [6],
+                "names": ["joint_1", "joint_2", "joint_3", "joint_4", "joint_5", "gripper"],
+            },
+            "task_index": {"dtype": "int64", "shape": [1], "names": None},
+        },
+        "splits": {"train": f"0:{len(episodes)}"},
+    }
+    if ee is not None:
+        info["features"][EE_COLUMN] = {"dtype": "float32", "shape": [3], "names": ["x", "y", "z"]}
+
+    with open(tmppath / "meta" / "info.json", "w") as f:
+        json.dump(info, f, indent=2)
+
+    # Create meta/episodes.jsonl
+    with open(tmppath / "meta" / "episodes.jsonl", "w") as f:
+        for ep_meta in episode_metadata:
+            f.write(json.dumps(ep_meta) + "\n")
+
+    # Create meta/tasks.jsonl, ordered by task_index
+    with open(tmppath / "meta" / "tasks.jsonl", "w") as f:
+        for task, task_index in task_indices.items():
+            f.write(json.dumps({"task_index": task_index, "task": task}) + "\n")
+
+    # Create meta/task_episodes.json, so loaders can select a task's rows without scanning the data
+    with open(tmppath / "meta" / "task_episodes.json", "w") as f:
+        json.dump({"data_file": DATA_FILE, "tasks": task_episodes}, f, indent=2)
+
+    # Create README.md
+    readme_content = f"""---
+license: apache-2.0
+task_categories:
+  - robotics
+tags:
+  - LeRobot
+  - robotics
+  - manipulation
+---
+
+# {repo_name}
+
+Robot manipulation dataset created with [RoboSim](https://github.com/hshadab/robotics-simulation).
+
+## Dataset Information
+
+- **Robot Type**: {robot_type}
+- **Total Episodes**: {len(episodes)}
+- **Total Frames**: {total_frames}
+- **Tasks**: {len(task_indices)}
+- **FPS**: {fps}
+
+## Usage
+
+```python
+from lerobot.common.datasets.lerobot_dataset import LeRobotDataset
+
+dataset = LeRobotDataset("{repo_id}")
+```
+
+## Training
+
+```bash
+python -m lerobot.scripts.train \\
+    --dataset.repo_id={repo_id} \\
+    --policy.type=act
+```
+"""
+    with open(tmppath / "README.md", "w") as f:
+        f.write(readme_content)
@@ -0,0 +1,221 @@
+"""
+Batched forward kinematics from a URDF joint tree.
+
+The chain is built from the same URDF and transform helpers as
+scripts/convert_urdf_to_gltf.py, so poses agree with the exported models.
+Poses for N joint configurations are computed with one batched matrix product
+per joint (the loop is over the handful of joints, never over frames), which
+keeps millions of uploaded frames cheap to validate or annotate.
+"""
+
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from api.urdf import parse_urdf
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# URDF Z-up to the Y-up Three.js frame used by the app: (x, y, z) -> (x, z, -y)
+URDF_TO_THREE = np.array([
+    [1.0, 0.0, 0.0, 0.0],
+    [0.0, 0.0, 1.0, 0.0],
+    [0.0, -1.0, 0.0, 0.0],
+    [0.0, 0.0, 0.0, 1.0],
+])
+
+# Robots with a known URDF, keyed by normalized robot type ("so-101" -> "so101").
+# "joints" is the order of the app's jointPositions arrays; "gripper" maps its
+# 0-100 % opening onto the jaw angle the way the 3D view does (SO101Arm3D.tsx).
+ROBOTS = {
+    "so101": {
+        "urdf": PROJECT_ROOT / "public" / "models" / "so101" / "so101.urdf",
+        "joints": ("shoulder_pan", "shoulder_lift", "elbow_flex", "wrist_flex", "wrist_roll", "gripper"),
+        "gripper": ("gripper", -0.35, 1.74533),
+        "end_effector": "gripper_frame_link",
+    },
+}
+
+# Robot types the frontend sends that name a robot in ROBOTS: uploads carry the
+# app's ActiveRobotType, and the SO-101 is its only "arm" (src/config/robots.ts)
+ROBOT_ALIASES = {"arm": "so101"}
+
+
+def euler_to_matrices(rpy):
+    """Convert an (N, 3) array of roll-pitch-yaw angles to (N, 3, 3) rotation matrices (Rz @ Ry @ Rx)."""
+    rpy = np.asarray(rpy, dtype=float).reshape(-1, 3)
+    cr, cp, cy = np.cos(rpy).T
+    sr, sp, sy = np.sin(rpy).T
+
+    matrices = np.empty((len(rpy), 3, 3))
+    matrices[:, 0, 0] = cy * cp
+    matrices[:, 0, 1] = cy * sp * sr - sy * cr
+    matrices[:, 0, 2] = cy * sp * cr + sy * sr
+    matrices[:, 1, 0] = sy * cp
+    matrices[:, 1, 1] = sy * sp * sr + cy * cr
+    matrices[:, 1, 2] = sy * sp * cr - cy * sr
+    matrices[:, 2, 0] = -sp
+    matrices[:, 2, 1] = cp * sr
+    matrices[:, 2, 2] = cp * cr
+    return matrices
+
+
+def create_transforms(xyz, rpy):
+    """Create (N, 4, 4) transformation matrices from (N, 3) xyz and rpy arrays."""
+    rotations = euler_to_matrices(rpy)
+    matrices = np.zeros((len(rotations), 4, 4))
+    matrices[:, :3, :3] = rotations
+    matrices[:, :3, 3] = np.asarray(xyz, dtype=float).reshape(-1, 3)
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+
+def axis_rotations(axis, angles):
+    """(N, 3, 3) rotations by `angles` (radians) about a unit axis (Rodrigues' formula)."""
+    x, y, z = axis
+    cross = np.array([[0.0, -z, y], [z, 0.0, -x], [-y, x, 0.0]])
+    angles = np.asarray(angles, dtype=float)
+    return (
+        np.eye(3)
+        + np.sin(angles)[:, None, None] * cross
+        + (1 - np.cos(angles))[:, None, None] * (cross @ cross)
+    )
+
+
+class KinematicChain:
+    """
+    Joint tree of a parsed URDF robot. Columns of a configuration array follow
+    `joint_names` (by default every movable joint, in URDF order); values are
+    radians for revolute joints and meters for prismatic ones.
+    """
+
+    def __init__(self, robot, joint_names=None):
+        joints = robot["joints"]
+        children = {}
+        for joint in joints:
+            children.setdefault(joint["parent"], []).append(joint)
+
+        # Parents before children, so one pass over the joints sees every parent pose first
+        child_links = {joint["child"] for joint in joints}
+        self.roots = [link for link in robot["links"] if link not in child_links]
+        self.joints = []
+        pending = list(self.roots)
+        while pending:
+            for joint in children.get(pending.pop(0), []):
+                self.joints.append(joint)
+                pending.append(joint["child"])
+
+        self.joint_names = list(joint_names or [
+            joint["name"] for joint in joints if joint["type"] in ("revolute", "continuous", "prismatic")
+        ])
+        columns = {name: i for i, name in enumerate(self.joint_names)}
+        self.columns = [columns.get(joint["name"]) for joint in self.joints]
+        self.origins = create_transforms(
+            [joint["origin_xyz"] for joint in self.joints],
+            [joint["origin_rpy"] for joint in self.joints],
+        ) if self.joints else np.zeros((0, 4, 4))
+        self.axes = [np.asarray(joint["axis"], dtype=float) / (np.linalg.norm(joint["axis"]) or 1.0)
+                     for joint in self.joints]
+        self.limits = np.array([
+            next(joint["limit"] or [-np.inf, np.inf] for joint in joints if joint["name"] == name)
+            for name in self.joint_names
+        ]).reshape(-1, 2)
+
+    @property
+    def links(self):
+        return self.roots + [joint["child"] for joint in self.joints]
+
+    def link_poses(self, q, links=None):
+        """
+        Base-frame poses of links for an (N, len(joint_names)) configuration array.
+        Returns {link: (N, 4, 4)}, for every link or only those in `links`.
+        """
+        q = np.asarray(q, dtype=float).reshape(-1, len(self.joint_names))
+        count = len(q)
+        wanted = set(links) if links is not None else None
+
+        poses = {root: np.broadcast_to(np.eye(4), (count, 4, 4)) for root in self.roots}
+        for joint, origin, axis, column in zip(self.joints, self.origins, self.axes, self.columns):
+            pose = poses[joint["parent"]] @ origin
+            if column is not None and joint["type"] in ("revolute", "continuous"):
+                motion = np.zeros((count, 4, 4))
+                motion[:, :3, :3] = axis_rotations(axis, q[:, column])
+                motion[:, 3, 3] = 1.0
+                pose = pose @ motion
+            elif column is not None and joint["type"] == "prismatic":
+                pose = pose.copy()
+                pose[:, :3, 3] += pose[:, :3, :3] @ axis * q[:, column, None]
+            poses[joint["child"]] = pose
+
+        if wanted is None:
+            return poses
+        return {link: pose for link, pose in poses.items() if link in wanted}
+
+    def positions(self, q, link, frame="urdf", chunk=65536):
+        """
+        (N, 3) positions of one link, evaluated `chunk` configurations at a time
+        to bound memory. frame="three" returns the app's Y-up Three.js frame.
+        """
+        q = np.asarray(q, dtype=float).reshape(-1, len(self.joint_names))
+        rotation = URDF_TO_THREE[:3, :3] if frame == "three" else np.eye(3)
+        out = np.empty((len(q), 3))
+        for start in range(0, len(q), chunk):
+            pose = self.link_poses(q[start:start + chunk], [link])[link]
+            out[start:start + chunk] = pose[:, :3, 3] @ rotation.T
+        return out
+
+    def within_limits(self, q, tolerance=1e-6):
+        """(N,) mask of configurations inside every joint limit."""
+        q = np.asarray(q, dtype=float).reshape(-1, len(self.joint_names))
+        return np.all((q >= self.limits[:, 0] - tolerance) & (q <= self.limits[:, 1] + tolerance), axis=1)
+
+
+def normalize_robot_type(robot_type: str) -> str:
+    """ROBOTS key for a robot type ("SO-101" and "arm" -> "so101"); unknown types are only normalized"""
+    normalized = robot_type.lower().replace("-", "").replace("_", "")
+    return ROBOT_ALIASES.get(normalized, normalized)
+
+
+def load_chain(robot_type: str):
+    """Kinematic chain for a robot type in ROBOTS (in app joint order), or None if unknown."""
+    return _load_chain(normalize_robot_type(robot_type))
+
+
+@lru_cache(maxsize=None)
+def _load_chain(key: str):
+    # Cached per ROBOTS key, so every spelling of a robot type shares one chain
+    entry = ROBOTS.get(key)
+    if entry is None or not entry["urdf"].exists():
+        return None
+    return KinematicChain(parse_urdf(entry["urdf"]), entry["joints"])
+
+
+def app_to_radians(robot_type: str, positions, clamp=True):
+    """
+    Convert app jointPositions rows (degrees, gripper in 0-100 %) to URDF joint
+    values. With `clamp`, values are held to the URDF limits like the 3D view's
+    URDF loader does; the gripper is always clamped, as its mapped closed
+    position deliberately overshoots the limit.
+    """
+    entry = ROBOTS[normalize_robot_type(robot_type)]
+    chain = load_chain(robot_type)
+    q = np.radians(np.asarray(positions, dtype=float).reshape(-1, len(entry["joints"])))
+    gripper, closed, opened = entry["gripper"]
+    column = entry["joints"].index(gripper)
+    q[:, column] = np.clip(
+        closed + np.degrees(q[:, column]) / 100 * (opened - closed), *chain.limits[column],
+    )
+    return np.clip(q, chain.limits[:, 0], chain.limits[:, 1]) if clamp else q
+
+
+def end_effector_positions(robot_type: str, positions):
+    """
+    (N, 3) end-effector positions in meters, in the app's Y-up Three.js frame,
+    for app jointPositions rows. None if the robot type has no known URDF.
+    """
+    chain = load_chain(robot_type)
+    if chain is None:
+        return None
+    entry = ROBOTS[normalize_robot_type(robot_type)]
+    return chain.positions(app_to_radians(robot_type, positions), entry["end_effector"], frame="three")
@@ -7,44 +7,199 @@ Handles:
 3. Stripe webhook for Pro subscriptions
 4. Shared training examples (crowd-sourced pickup data)
 5. Training job triggers
+
+Each of these is a router; API_ROUTERS selects which ones a deployment mounts.
 """
 
-import io
+import time
+
+_import_started = time.perf_counter()
+
+import asyncio
 import json
+import multiprocessing
 import tempfile
 import os
-import math
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Optional, List
+from typing import TYPE_CHECKING, Optional, List
 from pathlib import Path
 
-from fastapi import FastAPI, HTTPException, Request, Header, Query
+from fastapi import APIRouter, BackgroundTasks, FastAPI, HTTPException, Request, Response, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-import pyarrow as pa
-import pyarrow.parquet as pq
-from huggingface_hub import HfApi, create_repo
-import stripe
-from supabase import create_client, Client
+
+from api.cache import GenerationCache, GenerationCounter, default_generation_path
+from api.storage import ExampleStore, SQLiteExampleStore, SupabaseExampleStore
+
+# Heavy dependencies are imported on first use by the code that needs them:
+# pyarrow (via api.conversion) and huggingface_hub by the dataset endpoints,
+# stripe by the webhook, numpy by the reachability map, and supabase by
+# get_supabase, i.e. also by example queries when they use the Supabase backend.
+# Importing this module and serving /health loads none of them.
+if TYPE_CHECKING:
+    from supabase import Client
+    from api.reachability import ReachabilityMap
+
+HEAVY_MODULES = ("pyarrow", "numpy", "huggingface_hub", "stripe", "supabase")
 
 # Stripe configuration
-stripe.api_key = os.environ.get("STRIPE_SECRET_KEY")
+STRIPE_SECRET_KEY = os.environ.get("STRIPE_SECRET_KEY")
 STRIPE_WEBHOOK_SECRET = os.environ.get("STRIPE_WEBHOOK_SECRET")
 
+def get_stripe():
+    """Get the Stripe SDK, configured with the secret key"""
+    import stripe
+    stripe.api_key = STRIPE_SECRET_KEY
+    return stripe
+
 # Supabase configuration
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_SERVICE_KEY = os.environ.get("SUPABASE_SERVICE_KEY")  # Service role key for admin access
 
-def get_supabase() -> Optional[Client]:
+def get_supabase() -> Optional["Client"]:
     """Get Supabase client if configured"""
     if SUPABASE_URL and SUPABASE_SERVICE_KEY:
+        from supabase import create_client
         return create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
     return None
 
+# Shared examples storage: "supabase" or "sqlite" (defaults to Supabase when configured)
+EXAMPLES_BACKEND = os.environ.get("EXAMPLES_BACKEND")
+EXAMPLES_DB_PATH = os.environ.get("EXAMPLES_DB_PATH", str(Path(__file__).parent / "shared_examples.db"))
+
+def examples_backend() -> str:
+    return EXAMPLES_BACKEND or ("supabase" if SUPABASE_URL and SUPABASE_SERVICE_KEY else "sqlite")
+
+def examples_data_id() -> str:
+    """Identifies the examples data this deployment reads, to scope its cache generation counter"""
+    if examples_backend() == "supabase":
+        return f"supabase:{SUPABASE_URL}"
+    return f"sqlite:{Path(EXAMPLES_DB_PATH).resolve()}"
+
+_example_store: Optional[ExampleStore] = None
+
+def get_example_store() -> ExampleStore:
+    """Get the shared examples storage backend"""
+    global _example_store
+    if _example_store is None:
+        backend = examples_backend()
+        if backend == "supabase":
+            supabase = get_supabase()
+            if not supabase:
+                raise RuntimeError("EXAMPLES_BACKEND=supabase but SUPABASE_URL/SUPABASE_SERVICE_KEY are not set")
+            _example_store = SupabaseExampleStore(supabase)
+        elif backend == "sqlite":
+            _example_store = SQLiteExampleStore(Path(EXAMPLES_DB_PATH))
+        else:
+            raise RuntimeError(f"Unknown EXAMPLES_BACKEND: {backend}")
+    return _example_store
+
+# Per-worker cache of example aggregates, invalidated across workers on writes.
+# The default counter file is shared by every process on the host using the same examples data.
+EXAMPLES_CACHE_PATH = os.environ.get(
+    "EXAMPLES_CACHE_PATH", str(default_generation_path("examples", examples_data_id())),
+)
+
+_examples_cache: Optional[GenerationCache] = None
+
+def get_examples_cache() -> GenerationCache:
+    """Get the shared-examples query cache for this worker"""
+    global _examples_cache
+    if _examples_cache is None:
+        _examples_cache = GenerationCache(GenerationCounter(Path(EXAMPLES_CACHE_PATH)))
+    return _examples_cache
+
+# Voxel reachability map built by scripts/build_reachability_map.py (optional)
+REACHABILITY_PATH = os.environ.get("REACHABILITY_PATH", str(Path(__file__).parent / "data" / "reachability_so101"))
+
+_reachability_map: Optional["ReachabilityMap"] = None
+_reachability_loaded = False
+
+def get_reachability_map() -> Optional["ReachabilityMap"]:
+    """Get the memory-mapped reachability map, or None if it has not been built"""
+    global _reachability_map, _reachability_loaded
+    if not _reachability_loaded:
+        from api.reachability import ReachabilityMap
+        _reachability_map = ReachabilityMap.load(Path(REACHABILITY_PATH))
+        _reachability_loaded = True
+        if _reachability_map is None:
+            print(f"[Reachability] No map at {REACHABILITY_PATH}; coverage gaps and IK seeds are disabled")
+    return _reachability_map
+
+# CPU-bound conversion runs in a process pool (0 = run in a thread of this worker)
+CONVERSION_PROCESSES = int(os.environ.get("CONVERSION_PROCESSES", "0"))
+
+_conversion_pool: Optional[ProcessPoolExecutor] = None
+
+async def run_cpu_bound(fn, *args):
+    """Run a CPU-bound function without blocking the event loop"""
+    global _conversion_pool
+    if CONVERSION_PROCESSES <= 0:
+        return await asyncio.to_thread(fn, *args)
+    if _conversion_pool is None:
+        # Spawned (not forked) so workers don't inherit the event loop's threads
+        _conversion_pool = ProcessPoolExecutor(
+            max_workers=CONVERSION_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return await asyncio.get_running_loop().run_in_executor(_conversion_pool, fn, *args)
+
+def shutdown_conversion_pool():
+    """Stop conversion worker processes, if any were started"""
+    global _conversion_pool
+    if _conversion_pool is not None:
+        _conversion_pool.shutdown()
+        _conversion_pool = None
+
+def startup_report() -> dict:
+    """Import time of this module and which heavy dependencies it pulled in"""
+    return {
+        "import_ms": round((_app_built - _import_started) * 1000, 1),
+        "routers": ENABLED_ROUTERS,
+        "heavy_modules_loaded": [name for name in HEAVY_MODULES if name in sys.modules],
+    }
+
+_first_health_logged = False
+
+STRIPE_SWEEP_INTERVAL = 60.0  # seconds between retries of unfinished Stripe events
+
+async def sweep_stripe_events():
+    """Periodically retry Stripe events that failed or were never finished"""
+    supabase = None
+    while True:
+        await asyncio.sleep(STRIPE_SWEEP_INTERVAL)
+        try:
+            # Imported after the first wait so startup stays free of the SDKs
+            from api.billing import sweep_events
+            supabase = supabase or get_supabase()
+            await asyncio.to_thread(sweep_events, supabase, get_stripe())
+        except Exception as e:
+            print(f"[Stripe] Event sweep failed: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    report = startup_report()
+    print(
+        f"[Startup] api.main imported in {report['import_ms']:.0f} ms, "
+        f"routers: {', '.join(report['routers']) or 'none'}, "
+        f"heavy modules loaded: {', '.join(report['heavy_modules_loaded']) or 'none'}"
+    )
+    sweeper = None
+    if "billing" in ENABLED_ROUTERS and SUPABASE_URL and SUPABASE_SERVICE_KEY:
+        sweeper = asyncio.create_task(sweep_stripe_events())
+    yield
+    if sweeper is not None:
+        sweeper.cancel()
+    shutdown_conversion_pool()
+
 app = FastAPI(
     title="RoboSim API",
     description="Backend for Parquet conversion and HuggingFace upload",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS for frontend
@@ -92,13 +247,29 @@ class UploadResponse(BaseModel):
     message: str
 
 
+def episode_to_dict(episode: Episode) -> dict:
+    """Plain-dict view of an episode for the conversion pool (no copy of frames)"""
+    return {"episodeIndex": episode.episodeIndex, "frames": episode.frames, "metadata": episode.metadata}
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
+    global _first_health_logged
+    if not _first_health_logged:
+        _first_health_logged = True
+        print(f"[Startup] First health check {(time.perf_counter() - _import_started) * 1000:.0f} ms after import")
     return {"status": "healthy", "service": "robosim-api"}
 
 
-@app.post("/api/dataset/upload", response_model=UploadResponse)
+# =============================================================================
+# DATASETS
+# =============================================================================
+
+datasets_router = APIRouter(tags=["datasets"])
+
+
+@datasets_router.post("/api/dataset/upload", response_model=UploadResponse)
 async def upload_dataset(request: UploadRequest):
     """
     Convert episodes to Parquet and upload to HuggingFace Hub.
@@ -108,7 +279,11 @@ async def upload_dataset(request: UploadRequest):
     - meta/info.json (dataset metadata)
     - meta/episodes.jsonl (episode metadata)
     - meta/tasks.jsonl (task descriptions)
+    - meta/task_episodes.json (episodes and row ranges of each task)
     """
+    from huggingface_hub import HfApi, create_repo
+    from api.conversion import write_lerobot_dataset
+
     try:
         hf_api = HfApi(token=request.hfToken)
 
@@ -134,186 +309,21 @@ async def upload_dataset(request: UploadRequest):
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to create repo: {e}")
 
-        # Convert episodes to columnar format and create Parquet
+        # Convert episodes and write the LeRobot layout off the event loop
         with tempfile.TemporaryDirectory() as tmpdir:
-            tmppath = Path(tmpdir)
-
-            # Create directory structure
-            (tmppath / "data").mkdir()
-            (tmppath / "meta").mkdir()
-
-            # Convert all episodes to a single Parquet file
-            all_rows = []
-            episode_metadata = []
-            tasks = set()
-
-            for episode in request.episodes:
-                ep_idx = episode.episodeIndex
-                task = episode.metadata.get("languageInstruction", "manipulation task")
-                tasks.add(task)
-
-                episode_metadata.append({
-                    "episode_index": ep_idx,
-                    "tasks": [task],
-                    "length": len(episode.frames),
-                })
-
-                for frame_idx, frame in enumerate(episode.frames):
-                    obs = frame.get("observation", {})
-                    action = frame.get("action", {})
-
-                    row = {
-                        "episode_index": ep_idx,
-                        "frame_index": frame_idx,
-                        "timestamp": frame.get("timestamp", frame_idx / 30.0),
-                        "task_index": 0,  # Single task for now
-                    }
-
-                    # Add observation fields
-                    if "jointPositions" in obs:
-                        row["observation.state"] = obs["jointPositions"]
-                    if "image" in obs:
-                        # Store image as bytes if present
-                        row["observation.image"] = obs["image"]
-
-                    # Add action fields
-                    if "jointPositions" in action:
-                        row["action"] = action["jointPositions"]
-                    elif "targetPositions" in action:
-                        row["action"] = action["targetPositions"]
-
-                    all_rows.append(row)
-
-            # Create Parquet file
-            if all_rows:
-                # Build schema dynamically based on data
-                schema_fields = [
-                    ("episode_index", pa.int64()),
-                    ("frame_index", pa.int64()),
-                    ("timestamp", pa.float64()),
-                    ("task_index", pa.int64()),
-                ]
-
-                # Check for state/action dimensions from first row
-                sample_row = all_rows[0]
-                if "observation.state" in sample_row:
-                    state_dim = len(sample_row["observation.state"])
-                    schema_fields.append(("observation.state", pa.list_(pa.float32(), state_dim)))
-                if "action" in sample_row:
-                    action_dim = len(sample_row["action"])
-                    schema_fields.append(("action", pa.list_(pa.float32(), action_dim)))
-
-                # Convert to columnar format
-                columns = {field[0]: [] for field in schema_fields}
-                for row in all_rows:
-                    for field_name, _ in schema_fields:
-                        if field_name in row:
-                            val = row[field_name]
-                            # Convert lists to proper format
-                            if isinstance(val, list):
-                                columns[field_name].append([float(v) for v in val])
-                            else:
-                                columns[field_name].append(val)
-                        else:
-                            columns[field_name].append(None)
-
-                # Create PyArrow table
-                arrays = []
-                names = []
-                for field_name, field_type in schema_fields:
-                    if field_name in columns and columns[field_name]:
-                        if "list_" in str(field_type):
-                            # Handle list types
-                            arr = pa.array(columns[field_name], type=field_type)
-                        else:
-                            arr = pa.array(columns[field_name], type=field_type)
-                        arrays.append(arr)
-                        names.append(field_name)
-
-                table = pa.table(dict(zip(names, arrays)))
-
-                # Write Parquet file
-                parquet_path = tmppath / "data" / "train-00000-of-00001.parquet"
-                pq.write_table(table, parquet_path)
-
-            # Create meta/info.json
-            info = {
-                "codebase_version": "v3.0",
-                "robot_type": request.metadata.robotType,
-                "fps": request.metadata.fps,
-                "total_episodes": len(request.episodes),
-                "total_frames": sum(len(ep.frames) for ep in request.episodes),
-                "features": {
-                    "observation.state": {
-                        "dtype": "float32",
-                        "shape": [len(all_rows[0].get("observation.state", []))] if all_rows else [6],
-                        "names": ["joint_1", "joint_2", "joint_3", "joint_4", "joint_5", "gripper"],
-                    },
-                    "action": {
-                        "dtype": "float32",
-                        "shape": [len(all_rows[0].get("action", []))] if all_rows else [6],
-                        "names": ["joint_1", "joint_2", "joint_3", "joint_4", "joint_5", "gripper"],
-                    },
-                },
-                "splits": {"train": f"0:{len(request.episodes)}"},
-            }
-
-            with open(tmppath / "meta" / "info.json", "w") as f:
-                json.dump(info, f, indent=2)
-
-            # Create meta/episodes.jsonl
-            with open(tmppath / "meta" / "episodes.jsonl", "w") as f:
-                for ep_meta in episode_metadata:
-                    f.write(json.dumps(ep_meta) + "\n")
-
-            # Create meta/tasks.jsonl
-            with open(tmppath / "meta" / "tasks.jsonl", "w") as f:
-                for i, task in enumerate(tasks):
-                    f.write(json.dumps({"task_index": i, "task": task}) + "\n")
-
-            # Create README.md
-            readme_content = f"""---
-license: apache-2.0
-task_categories:
-  - robotics
-tags:
-  - LeRobot
-  - robotics
-  - manipulation
----
-
-# {request.repoName}
-
-Robot manipulation dataset created with [RoboSim](https://github.com/hshadab/robotics-simulation).
-
-## Dataset Information
-
-- **Robot Type**: {request.metadata.robotType}
-- **Total Episodes**: {len(request.episodes)}
-- **Total Frames**: {sum(len(ep.frames) for ep in request.episodes)}
-- **FPS**: {request.metadata.fps}
-
-## Usage
-
-```python
-from lerobot.common.datasets.lerobot_dataset import LeRobotDataset
-
-dataset = LeRobotDataset("{repo_id}")
-```
-
-## Training
-
-```bash
-python -m lerobot.scripts.train \\
-    --dataset.repo_id={repo_id} \\
-    --policy.type=act
-```
-"""
-            with open(tmppath / "README.md", "w") as f:
-                f.write(readme_content)
+            await run_cpu_bound(
+                write_lerobot_dataset,
+                tmpdir,
+                [episode_to_dict(ep) for ep in request.episodes],
+                request.metadata.robotType,
+                request.metadata.fps,
+                request.repoName,
+                repo_id,
+            )
 
             # Upload all files to HuggingFace
-            hf_api.upload_folder(
+            await asyncio.to_thread(
+                hf_api.upload_folder,
                 folder_path=tmpdir,
                 repo_id=repo_id,
                 repo_type="dataset",
@@ -334,63 +344,31 @@ python -m lerobot.scripts.train \\
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/api/dataset/convert")
-async def convert_to_parquet(episodes: list[Episode]):
+@datasets_router.post("/api/dataset/convert")
+async def convert_to_parquet(episodes: list[Episode], robot_type: Optional[str] = Query(None)):
     """
     Convert episodes to Parquet format and return as bytes.
-    For local download without HuggingFace upload.
+    For local download without HuggingFace upload. With a known robot_type,
+    end-effector positions are added as an extra column.
     """
-    try:
-        all_rows = []
-
-        for episode in episodes:
-            ep_idx = episode.episodeIndex
-
-            for frame_idx, frame in enumerate(episode.frames):
-                obs = frame.get("observation", {})
-                action = frame.get("action", {})
-
-                row = {
-                    "episode_index": ep_idx,
-                    "frame_index": frame_idx,
-                    "timestamp": frame.get("timestamp", frame_idx / 30.0),
-                }
-
-                if "jointPositions" in obs:
-                    row["observation.state"] = obs["jointPositions"]
-                if "jointPositions" in action:
-                    row["action"] = action["jointPositions"]
+    from api.conversion import convert_episodes
 
-                all_rows.append(row)
+    try:
+        result = await run_cpu_bound(
+            convert_episodes, [episode_to_dict(ep) for ep in episodes], robot_type,
+        )
 
-        if not all_rows:
+        if not result["num_rows"]:
             raise HTTPException(status_code=400, detail="No frames to convert")
 
-        # Create simple columnar format
-        columns = {
-            "episode_index": [r["episode_index"] for r in all_rows],
-            "frame_index": [r["frame_index"] for r in all_rows],
-            "timestamp": [r["timestamp"] for r in all_rows],
-        }
-
-        if "observation.state" in all_rows[0]:
-            columns["observation.state"] = [r.get("observation.state", []) for r in all_rows]
-        if "action" in all_rows[0]:
-            columns["action"] = [r.get("action", []) for r in all_rows]
-
-        table = pa.table(columns)
-
-        # Write to buffer
-        buffer = io.BytesIO()
-        pq.write_table(table, buffer)
-        buffer.seek(0)
-
         return {
             "success": True,
-            "parquet_base64": buffer.getvalue().hex(),
-            "num_rows": len(all_rows),
+            "parquet_base64": result["parquet"].hex(),
+            "num_rows": result["num_rows"],
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -399,6 +377,8 @@ async def convert_to_parquet(episodes: list[Episode]):
 # SHARED TRAINING EXAMPLES
 # =============================================================================
 
+examples_router = APIRouter(tags=["examples"])
+
 class JointSequenceStep(BaseModel):
     base: Optional[float] = None
     shoulder: Optional[float] = None
@@ -428,6 +408,7 @@ class SharedExampleResponse(BaseModel):
     jointSequence: List[dict]
     similarity: Optional[float] = None
     contributorCount: Optional[int] = None
+    source: str = "example"  # "example", or "reachability" for an IK seed fallback
 
 
 class ExampleStats(BaseModel):
@@ -437,29 +418,40 @@ class ExampleStats(BaseModel):
     lastUpdated: str
 
 
-def euclidean_distance(pos1: List[float], pos2: List[float]) -> float:
-    """Calculate 3D Euclidean distance between two positions"""
-    return math.sqrt(sum((a - b) ** 2 for a, b in zip(pos1, pos2)))
+class CoverageGaps(BaseModel):
+    gridSize: float
+    reachableCells: int
+    coveredCells: int
+    gaps: List[dict]
+
+
+# Height band (meters) of objects resting on the table, for coverage of reachable cells
+TABLE_BAND = (0.0, 0.15)
+
 
+def example_stats(grid_size: float) -> dict:
+    """Cached aggregate example stats on a coverage grid"""
+    return get_examples_cache().get_or_compute(
+        ("stats", grid_size),
+        lambda: get_example_store().stats(grid_size),
+    )
 
-@app.post("/api/examples", response_model=dict)
+
+def set_read_headers(response: Response, read_stats: dict):
+    """Report bytes read from storage in each phase of an example query"""
+    response.headers["X-Read-Bytes-Candidates"] = str(read_stats["candidate_bytes"])
+    response.headers["X-Read-Bytes-Details"] = str(read_stats["detail_bytes"])
+
+
+@examples_router.post("/api/examples", response_model=dict)
 async def submit_example(example: SharedExample):
     """
     Submit a successful manipulation example to the shared database.
     All users benefit from crowd-sourced training data.
     """
-    supabase = get_supabase()
-    if not supabase:
-        # Fallback: store locally (for development)
-        return {
-            "success": True,
-            "message": "Example recorded (local mode - Supabase not configured)",
-            "id": f"local-{datetime.now().timestamp()}"
-        }
-
     try:
         # Insert into shared_examples table
-        result = supabase.table("shared_examples").insert({
+        example_id = get_example_store().insert({
             "object_position": example.objectPosition,
             "object_type": example.objectType,
             "object_scale": example.objectScale,
@@ -468,9 +460,8 @@ async def submit_example(example: SharedExample):
             "user_message": example.userMessage,
             "language_variants": example.languageVariants or [],
             "created_at": datetime.now().isoformat(),
-        }).execute()
-
-        example_id = result.data[0]["id"] if result.data else "unknown"
+        })
+        get_examples_cache().invalidate()
 
         return {
             "success": True,
@@ -481,100 +472,84 @@ async def submit_example(example: SharedExample):
         raise HTTPException(status_code=500, detail=f"Failed to save example: {e}")
 
 
-@app.get("/api/examples/similar", response_model=List[SharedExampleResponse])
+@examples_router.get("/api/examples/similar", response_model=List[SharedExampleResponse])
 async def get_similar_examples(
+    response: Response,
     x: float = Query(..., description="X position in meters"),
     y: float = Query(..., description="Y position in meters"),
     z: float = Query(..., description="Z position in meters"),
     object_type: Optional[str] = Query(None, description="Filter by object type"),
-    max_distance: float = Query(0.05, description="Max distance in meters"),
-    limit: int = Query(5, description="Max results to return")
+    max_distance: float = Query(0.05, gt=0, description="Max distance in meters"),
+    limit: int = Query(5, description="Max results to return"),
+    fallback_seed: bool = Query(
+        False, description="With no example in range, return an IK seed from the reachability map",
+    ),
 ):
     """
     Query similar pickup examples near a position.
     Returns proven joint sequences that worked for similar pickups.
+    With fallback_seed and no example in range, returns at most one entry with
+    source="reachability": a single-step jointSequence to seed IK from, not a
+    proven pickup.
     """
-    supabase = get_supabase()
-    if not supabase:
-        return []
-
     try:
-        # Query all examples (could optimize with PostGIS for large datasets)
-        query = supabase.table("shared_examples").select("*")
-        if object_type:
-            query = query.eq("object_type", object_type)
-
-        result = query.execute()
-
-        # Filter by distance and sort
-        target_pos = [x, y, z]
-        similar = []
-
-        for row in result.data:
-            pos = row["object_position"]
-            dist = euclidean_distance(pos, target_pos)
-
-            if dist <= max_distance:
-                similar.append({
-                    "id": row["id"],
-                    "objectPosition": pos,
-                    "objectType": row["object_type"],
-                    "objectScale": row["object_scale"],
-                    "jointSequence": row["joint_sequence"],
-                    "similarity": 1.0 - (dist / max_distance),  # 1.0 = exact match
-                })
-
-        # Sort by similarity (highest first) and limit
-        similar.sort(key=lambda x: x["similarity"], reverse=True)
-        return similar[:limit]
+        # Nearest examples within max_distance, closest first
+        rows, read_stats = get_example_store().read_similar([x, y, z], max_distance, object_type, limit)
+        set_read_headers(response, read_stats)
+
+        if not rows and fallback_seed and get_reachability_map() is not None:
+            seed = get_reachability_map().seed_near([x, y, z], max_distance)
+            if seed is None:
+                return []
+            return [{
+                "id": "reachability-seed",
+                "objectPosition": seed["position"],
+                "objectType": object_type or "any",
+                "objectScale": 0.0,
+                "jointSequence": [seed["joints"]],
+                "similarity": max(0.0, 1.0 - seed["distance"] / max_distance),
+                "source": "reachability",
+            }]
+
+        return [
+            {
+                "id": row["id"],
+                "objectPosition": row["object_position"],
+                "objectType": row["object_type"],
+                "objectScale": row["object_scale"],
+                "jointSequence": row["joint_sequence"],
+                "similarity": 1.0 - (row["distance"] / max_distance),  # 1.0 = exact match
+            }
+            for row in rows
+        ]
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to query examples: {e}")
 
 
-@app.get("/api/examples/stats", response_model=ExampleStats)
+@examples_router.get("/api/examples/stats", response_model=ExampleStats)
 async def get_example_stats():
     """
     Get aggregate statistics about shared training examples.
     Shows coverage and contribution metrics.
     """
-    supabase = get_supabase()
-    if not supabase:
-        return ExampleStats(
-            totalExamples=0,
-            byObjectType={},
-            lastUpdated=datetime.now().isoformat()
-        )
-
     try:
-        result = supabase.table("shared_examples").select("object_type, object_position").execute()
-
-        # Count by type
-        by_type = {}
-        for row in result.data:
-            obj_type = row["object_type"]
-            by_type[obj_type] = by_type.get(obj_type, 0) + 1
-
-        # Build simple coverage heatmap (grid cells)
-        heatmap = []
         grid_size = 0.05  # 5cm grid
-        grid_counts = {}
-
-        for row in result.data:
-            pos = row["object_position"]
-            # Quantize to grid
-            gx = round(pos[0] / grid_size) * grid_size
-            gz = round(pos[2] / grid_size) * grid_size
-            key = f"{gx:.2f},{gz:.2f}"
-            grid_counts[key] = grid_counts.get(key, 0) + 1
+        stats = example_stats(grid_size)
 
-        for key, count in grid_counts.items():
-            gx, gz = map(float, key.split(","))
-            heatmap.append({"x": gx, "z": gz, "count": count})
+        # Build simple coverage heatmap (grid cells), flagging cells the arm can reach
+        reachability = get_reachability_map()
+        reachable = reachability.reachable_columns(grid_size, *TABLE_BAND) if reachability else None
+        heatmap = []
+        for (ix, iz), count in stats["grid_counts"].items():
+            cell = {"x": round(ix * grid_size, 2), "z": round(iz * grid_size, 2), "count": count}
+            if reachable is not None:
+                cell["reachable"] = (ix, iz) in reachable
+            heatmap.append(cell)
 
         return ExampleStats(
-            totalExamples=len(result.data),
-            byObjectType=by_type,
+            totalExamples=stats["total"],
+            byObjectType=stats["by_type"],
             coverageHeatmap=heatmap,
             lastUpdated=datetime.now().isoformat()
         )
@@ -583,23 +558,52 @@ async def get_example_stats():
         raise HTTPException(status_code=500, detail=f"Failed to get stats: {e}")
 
 
-@app.get("/api/examples/all", response_model=List[SharedExampleResponse])
+@examples_router.get("/api/examples/coverage-gaps", response_model=CoverageGaps)
+async def get_coverage_gaps(
+    grid_size: float = Query(0.05, gt=0, description="Coverage grid cell size in meters"),
+    min_y: float = Query(TABLE_BAND[0], description="Lowest object height in meters"),
+    max_y: float = Query(TABLE_BAND[1], description="Highest object height in meters"),
+):
+    """
+    Reachable coverage grid cells (x, z) that have no shared example yet,
+    i.e. where new demonstrations would add the most.
+    """
+    reachability = get_reachability_map()
+    if reachability is None:
+        raise HTTPException(status_code=503, detail="Reachability map not built (scripts/build_reachability_map.py)")
+
+    try:
+        reachable = reachability.reachable_columns(grid_size, min_y, max_y)
+        covered = set(example_stats(grid_size)["grid_counts"])
+        gaps = sorted(reachable - covered)
+
+        return CoverageGaps(
+            gridSize=grid_size,
+            reachableCells=len(reachable),
+            coveredCells=len(reachable & covered),
+            gaps=[{"x": round(ix * grid_size, 2), "z": round(iz * grid_size, 2)} for ix, iz in gaps],
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get coverage gaps: {e}")
+
+
+@examples_router.get("/api/examples/all", response_model=List[SharedExampleResponse])
 async def get_all_examples(
-    limit: int = Query(1000, description="Max examples to return")
+    response: Response,
+    limit: int = Query(1000, description="Max examples to return"),
+    offset: int = Query(0, description="Examples to skip (for paging)")
 ):
     """
     Download all shared examples for LeRobot training.
-    Returns the complete crowd-sourced dataset.
+    Returns the complete crowd-sourced dataset, newest first, one page at a time.
     """
-    supabase = get_supabase()
-    if not supabase:
-        return []
-
     try:
-        result = supabase.table("shared_examples").select("*").limit(limit).execute()
+        rows, read_stats = get_example_store().read_page(limit, offset)
+        set_read_headers(response, read_stats)
 
         examples = []
-        for row in result.data:
+        for row in rows:
             examples.append({
                 "id": row["id"],
                 "objectPosition": row["object_position"],
@@ -615,7 +619,14 @@ async def get_all_examples(
         raise HTTPException(status_code=500, detail=f"Failed to get examples: {e}")
 
 
-@app.post("/api/training/trigger")
+# =============================================================================
+# TRAINING
+# =============================================================================
+
+training_router = APIRouter(tags=["training"])
+
+
+@training_router.post("/api/training/trigger")
 async def trigger_training(
     min_examples: int = Query(50, description="Minimum examples before training"),
     force: bool = Query(False, description="Force training even if below threshold")
@@ -626,14 +637,8 @@ async def trigger_training(
 
     Training uses Modal.com or Google Colab (free tier).
     """
-    supabase = get_supabase()
-
     # Check example count
-    if supabase:
-        result = supabase.table("shared_examples").select("id", count="exact").execute()
-        example_count = result.count or 0
-    else:
-        example_count = 0
+    example_count = get_examples_cache().get_or_compute(("count",), get_example_store().count)
 
     if example_count < min_examples and not force:
         return {
@@ -662,22 +667,37 @@ async def trigger_training(
 # STRIPE WEBHOOKS
 # =============================================================================
 
-@app.post("/api/stripe/webhook")
-async def stripe_webhook(request: Request, stripe_signature: str = Header(None, alias="Stripe-Signature")):
+billing_router = APIRouter(tags=["billing"])
+
+
+@billing_router.post("/api/stripe/webhook")
+async def stripe_webhook(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    stripe_signature: str = Header(None, alias="Stripe-Signature"),
+):
     """
     Handle Stripe webhook events for subscription management.
 
     Events handled:
     - checkout.session.completed: Upgrade user to Pro tier
     - customer.subscription.deleted: Downgrade user to Free tier
+
+    The event is verified, recorded in stripe_events and acknowledged right
+    away; the tier change runs as a background task. Redelivered events are
+    acknowledged without being applied again, unless they failed or their
+    worker died. The periodic sweep (see lifespan) retries those too.
     """
     payload = await request.body()
 
     if not STRIPE_WEBHOOK_SECRET:
         raise HTTPException(status_code=500, detail="Stripe webhook secret not configured")
 
+    stripe = get_stripe()
+    from api.billing import HANDLED_EVENTS, process_event, record_event
+
     try:
-        event = stripe.Webhook.construct_event(
+        stripe.Webhook.construct_event(
             payload, stripe_signature, STRIPE_WEBHOOK_SECRET
         )
     except ValueError as e:
@@ -685,55 +705,68 @@ async def stripe_webhook(request: Request, stripe_signature: str = Header(None,
     except stripe.error.SignatureVerificationError as e:
         raise HTTPException(status_code=400, detail=f"Invalid signature: {e}")
 
-    # Handle the event
-    if event["type"] == "checkout.session.completed":
-        session = event["data"]["object"]
-        customer_email = session.get("customer_email") or session.get("customer_details", {}).get("email")
+    # Plain dicts from the verified payload, for storage and the background task
+    event = json.loads(payload)
+    if event["type"] not in HANDLED_EVENTS:
+        return {"received": True}
 
-        if customer_email:
-            # Update user tier in Supabase
-            supabase = get_supabase()
-            if supabase:
-                try:
-                    # Find user by email and update their tier
-                    result = supabase.table("user_profiles").update({
-                        "tier": "pro",
-                        "tier_expires_at": None,  # Subscription doesn't expire (handled by Stripe)
-                    }).eq("email", customer_email).execute()
-
-                    print(f"[Stripe] Upgraded {customer_email} to Pro tier")
-                except Exception as e:
-                    print(f"[Stripe] Failed to update user tier: {e}")
-            else:
-                print(f"[Stripe] Supabase not configured, cannot update tier for {customer_email}")
-
-    elif event["type"] == "customer.subscription.deleted":
-        subscription = event["data"]["object"]
-        customer_id = subscription.get("customer")
-
-        if customer_id:
-            # Get customer email from Stripe
-            try:
-                customer = stripe.Customer.retrieve(customer_id)
-                customer_email = customer.get("email")
-
-                if customer_email:
-                    supabase = get_supabase()
-                    if supabase:
-                        try:
-                            result = supabase.table("user_profiles").update({
-                                "tier": "free",
-                            }).eq("email", customer_email).execute()
-
-                            print(f"[Stripe] Downgraded {customer_email} to Free tier")
-                        except Exception as e:
-                            print(f"[Stripe] Failed to downgrade user tier: {e}")
-            except Exception as e:
-                print(f"[Stripe] Failed to get customer: {e}")
+    supabase = get_supabase()
+    if not supabase:
+        print(f"[Stripe] Supabase not configured, cannot apply {event['type']} ({event['id']})")
+        return {"received": True}
+
+    try:
+        claimed = await asyncio.to_thread(record_event, supabase, event)
+    except Exception as e:
+        # Not acknowledged, so Stripe retries the delivery
+        print(f"[Stripe] Failed to record event {event['id']}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to record event")
 
+    if claimed is None:
+        return {"received": True, "duplicate": True}
+
+    background_tasks.add_task(
+        process_event, supabase, stripe, event["id"], event["type"], event["data"]["object"], claimed["attempts"],
+    )
     return {"received": True}
 
 
+# =============================================================================
+# ROUTERS
+# =============================================================================
+
+ROUTERS = {
+    "datasets": datasets_router,
+    "examples": examples_router,
+    "training": training_router,
+    "billing": billing_router,
+}
+
+# Comma-separated routers to mount (default: all), e.g. API_ROUTERS=examples for an examples-only service
+ENABLED_ROUTERS = [name.strip() for name in os.environ.get("API_ROUTERS", ",".join(ROUTERS)).split(",") if name.strip()]
+
+for name in ENABLED_ROUTERS:
+    if name not in ROUTERS:
+        raise RuntimeError(f"Unknown router in API_ROUTERS: {name} (expected some of {', '.join(ROUTERS)})")
+    app.include_router(ROUTERS[name])
+
+_app_built = time.perf_counter()
+
+
 if __name__ == "__main__":
+    # Production launch: python -m api.main --workers 4
+    import argparse
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+
+    parser = argparse.ArgumentParser(description="Run the RoboSim API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", "1")),
+                        help="Worker processes (default: $WEB_CONCURRENCY or 1)")
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        # Multiple workers need an import string so each process loads its own app
+        uvicorn.run("api.main:app", host=args.host, port=args.port, workers=args.workers)
+    else:
+        uvicorn.run(app, host=args.host, port=args.port)
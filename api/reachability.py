@@ -0,0 +1,102 @@
+"""
+Voxel reachability map of the arm, built offline by scripts/build_reachability_map.py.
+
+The map is memory-mapped read-only, so every worker shares one copy in the
+page cache. Positions are in the Three.js frame (Y-up, meters) like
+objectPosition in the examples API; seeds are in the app's joint units.
+"""
+
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Set, Tuple
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+# Joint order of seeds, as keys of a jointSequence step
+SEED_JOINTS = ("base", "shoulder", "elbow", "wrist", "wristRoll", "gripper")
+
+CELL_DTYPE = np.dtype([("count", "<u4"), ("distance", "<f4"), ("seed", "<f4", (len(SEED_JOINTS),))])
+
+
+class ReachabilityMap:
+    """Reachable voxels with the best sampled joint configuration for each."""
+
+    def __init__(self, cells: np.ndarray, meta: dict):
+        self.cells = cells
+        self.meta = meta
+        self.voxel_size = float(meta["voxel_size"])
+        self.origin = np.asarray(meta["origin"], dtype=float)
+        self.shape = np.asarray(cells.shape)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["ReachabilityMap"]:
+        """Open <path>.npy / <path>.json, or return None if the map has not been built."""
+        path = Path(path)
+        npy_path, meta_path = path.with_suffix(".npy"), path.with_suffix(".json")
+        if not npy_path.exists() or not meta_path.exists():
+            return None
+        meta = json.loads(meta_path.read_text())
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"unsupported reachability map version {meta.get('version')}")
+        cells = np.load(npy_path, mmap_mode="r")
+        if cells.dtype != CELL_DTYPE or list(cells.shape) != meta["shape"]:
+            raise ValueError(f"reachability map {npy_path} does not match {meta_path.name}")
+        return cls(cells, meta)
+
+    def center(self, index) -> np.ndarray:
+        return self.origin + (np.asarray(index) + 0.5) * self.voxel_size
+
+    def is_reachable(self, position) -> bool:
+        index = np.floor((np.asarray(position, dtype=float) - self.origin) / self.voxel_size).astype(int)
+        if np.any(index < 0) or np.any(index >= self.shape):
+            return False
+        return bool(self.cells["count"][tuple(index)])
+
+    def seed_near(self, position, max_distance: float) -> Optional[dict]:
+        """
+        Seed of the reachable voxel whose center is nearest to `position`, if one
+        is within max_distance (at least half a voxel, so the containing voxel counts).
+        Returns {"joints": {name: value}, "position": [x, y, z], "distance": meters}.
+        """
+        position = np.asarray(position, dtype=float)
+        radius = max(max_distance, self.voxel_size * np.sqrt(3) / 2)
+        low = np.maximum(np.floor((position - radius - self.origin) / self.voxel_size).astype(int), 0)
+        high = np.minimum(np.floor((position + radius - self.origin) / self.voxel_size).astype(int) + 1, self.shape)
+        if np.any(high <= low):
+            return None
+
+        block = self.cells["count"][low[0]:high[0], low[1]:high[1], low[2]:high[2]]
+        candidates = np.argwhere(block > 0) + low
+        if not len(candidates):
+            return None
+        distances = np.linalg.norm(self.center(candidates) - position, axis=1)
+        best = int(np.argmin(distances))
+        if distances[best] > radius:
+            return None
+
+        index = tuple(candidates[best])
+        seed = self.cells["seed"][index]
+        return {
+            "joints": {name: round(float(value), 2) for name, value in zip(SEED_JOINTS, seed)},
+            "position": self.center(index).round(4).tolist(),
+            "distance": float(distances[best]),
+        }
+
+    @lru_cache(maxsize=32)
+    def reachable_columns(self, grid_size: float, min_y: float, max_y: float) -> Set[Tuple[int, int]]:
+        """
+        (x, z) cells of the examples coverage grid (see storage.grid_cell) that
+        contain a reachable voxel with its center between min_y and max_y.
+        """
+        ys = self.origin[1] + (np.arange(self.shape[1]) + 0.5) * self.voxel_size
+        band = np.flatnonzero((ys >= min_y) & (ys <= max_y))
+        if not len(band):
+            return set()
+        columns = np.asarray(self.cells["count"][:, band[0]:band[-1] + 1, :]).any(axis=1)
+        ix, iz = np.nonzero(columns)
+        x = np.round((self.origin[0] + (ix + 0.5) * self.voxel_size) / grid_size).astype(int)
+        z = np.round((self.origin[2] + (iz + 0.5) * self.voxel_size) / grid_size).astype(int)
+        return set(zip(x.tolist(), z.tolist()))
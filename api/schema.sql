@@ -24,10 +24,57 @@ CREATE INDEX IF NOT EXISTS idx_shared_examples_object_type
 CREATE INDEX IF NOT EXISTS idx_shared_examples_created_at
     ON shared_examples(created_at DESC);
 
--- For PostGIS spatial queries (optional, more efficient for large datasets)
--- CREATE EXTENSION IF NOT EXISTS postgis;
--- ALTER TABLE shared_examples ADD COLUMN position_point geometry(Point, 4326);
--- CREATE INDEX idx_position_point ON shared_examples USING GIST(position_point);
+-- Spatial index for radius queries: object_position as a 3D cube point,
+-- populated on insert, GIST-indexed together with object_type
+CREATE EXTENSION IF NOT EXISTS cube;
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+ALTER TABLE shared_examples ADD COLUMN IF NOT EXISTS position_point cube
+    GENERATED ALWAYS AS (cube(ARRAY[
+        (object_position->>0)::FLOAT8,
+        (object_position->>1)::FLOAT8,
+        (object_position->>2)::FLOAT8
+    ])) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_shared_examples_type_position
+    ON shared_examples USING GIST(object_type, position_point);
+
+-- k-nearest examples within a radius, optionally per object type.
+-- Called by the API via RPC so only the top-k rows leave the database.
+-- Returns ranking columns only; the API fetches joint_sequence for the
+-- returned ids in a second query.
+-- (dropped first because CREATE OR REPLACE cannot change the result columns)
+DROP FUNCTION IF EXISTS match_similar_examples(FLOAT8, FLOAT8, FLOAT8, FLOAT8, INT, TEXT);
+CREATE FUNCTION match_similar_examples(
+    target_x FLOAT8,
+    target_y FLOAT8,
+    target_z FLOAT8,
+    max_distance FLOAT8,
+    match_count INT DEFAULT 5,
+    filter_type TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    object_position JSONB,
+    object_type TEXT,
+    object_scale FLOAT,
+    distance FLOAT8
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        e.id,
+        e.object_position,
+        e.object_type,
+        e.object_scale,
+        e.position_point <-> cube(ARRAY[target_x, target_y, target_z]) AS distance
+    FROM shared_examples e
+    WHERE e.position_point <@ cube_enlarge(cube(ARRAY[target_x, target_y, target_z]), max_distance, 3)
+      AND e.position_point <-> cube(ARRAY[target_x, target_y, target_z]) <= max_distance
+      AND (filter_type IS NULL OR e.object_type = filter_type)
+    ORDER BY e.position_point <-> cube(ARRAY[target_x, target_y, target_z]), e.id
+    LIMIT match_count;
+$$;
 
 -- Training jobs table - tracks training runs
 CREATE TABLE IF NOT EXISTS training_jobs (
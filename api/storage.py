@@ -0,0 +1,377 @@
+"""
+Storage backends for shared training examples.
+
+Both backends implement the semantics of the `shared_examples` table in
+api/schema.sql:
+
+- SupabaseExampleStore: hosted Postgres via the Supabase client. Radius
+  queries run server-side through the `match_similar_examples` function
+  (GIST-indexed cube column), falling back to client-side filtering when
+  the function is not installed.
+- SQLiteExampleStore: embedded store for self-hosted / air-gapped deployments.
+  Runs in WAL mode (readers never block the writer) and keeps an R*Tree
+  index on object_position so radius queries only touch nearby rows.
+
+Rows are exchanged as dicts keyed by the schema's column names.
+
+Similar-example reads are two-phase: candidates are selected and ranked
+using only the light CANDIDATE_COLUMNS, then DETAIL_COLUMNS are fetched for
+the ids that are actually returned. A paged export returns every row it
+reads, so it selects both in one ranged query. ik_errors, user_message and
+language_variants are never read back.
+"""
+
+import json
+import math
+import sqlite3
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Columns needed to filter and rank examples (phase one)
+CANDIDATE_COLUMNS = ("id", "object_position", "object_type", "object_scale")
+
+# Heavy columns fetched only for returned ids (phase two)
+DETAIL_COLUMNS = ("joint_sequence",)
+
+# Ids per Supabase detail request. The ids travel in the GET's query string
+# (about 39 bytes each), so chunks keep it far below gateway URL limits.
+DETAIL_CHUNK = 200
+
+
+def euclidean_distance(pos1: List[float], pos2: List[float]) -> float:
+    """Calculate 3D Euclidean distance between two positions"""
+    return math.sqrt(sum((a - b) ** 2 for a, b in zip(pos1, pos2)))
+
+
+def rank_by_distance(rows: List[dict], position: List[float], max_distance: float, limit: int) -> List[dict]:
+    """Filter rows to those within max_distance and return the nearest `limit`, with a `distance` key"""
+    similar = []
+    for row in rows:
+        dist = euclidean_distance(row["object_position"], position)
+        if dist <= max_distance:
+            similar.append(dict(row, distance=dist))
+
+    similar.sort(key=lambda row: row["distance"])
+    return similar[:limit]
+
+
+def payload_bytes(rows) -> int:
+    """Approximate bytes transferred for rows (JSON-encoded size)"""
+    return len(json.dumps(rows, default=str).encode())
+
+
+def grid_cell(pos: List[float], grid_size: float) -> Tuple[int, int]:
+    """Quantize a position to its (x, z) coverage grid cell"""
+    return round(pos[0] / grid_size), round(pos[2] / grid_size)
+
+
+class ExampleStore(ABC):
+    """Interface for shared example storage backends."""
+
+    @abstractmethod
+    def insert(self, row: dict) -> str:
+        """Insert an example row and return its id"""
+
+    @abstractmethod
+    def similar_candidates(
+        self,
+        position: List[float],
+        max_distance: float,
+        object_type: Optional[str] = None,
+        limit: int = 5,
+    ) -> Tuple[List[dict], int]:
+        """Phase one: candidate columns for up to `limit` rows within `max_distance`, nearest first,
+        with a `distance` key, plus the bytes read to find them"""
+
+    @abstractmethod
+    def fetch_details(self, ids: List[str]) -> Dict[str, dict]:
+        """Return DETAIL_COLUMNS for the given ids, keyed by id"""
+
+    @abstractmethod
+    def stats(self, grid_size: float = 0.05) -> dict:
+        """Return {"total", "by_type", "grid_counts"} where grid_counts maps (ix, iz) cells to counts"""
+
+    @abstractmethod
+    def page_candidates(self, limit: int, offset: int = 0) -> Tuple[List[dict], int]:
+        """CANDIDATE_COLUMNS and DETAIL_COLUMNS for a page of rows, newest first, plus the bytes read"""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Return the total number of examples"""
+
+    def read_similar(self, position, max_distance, object_type=None, limit=5) -> Tuple[List[dict], dict]:
+        """Two-phase similar-example read. Returns (rows, read stats)"""
+        return self._with_details(*self.similar_candidates(position, max_distance, object_type, limit))
+
+    def read_page(self, limit, offset=0) -> Tuple[List[dict], dict]:
+        """Single-query paged export read. Returns (rows, read stats)"""
+        rows, read_bytes = self.page_candidates(limit, offset)
+        read_stats = {
+            "candidate_rows": len(rows),
+            "candidate_bytes": read_bytes,
+            "detail_rows": 0,
+            "detail_bytes": 0,
+        }
+        return rows, read_stats
+
+    def _with_details(self, candidates: List[dict], candidate_bytes: int) -> Tuple[List[dict], dict]:
+        details = self.fetch_details([row["id"] for row in candidates]) if candidates else {}
+        rows = [dict(row, **details.get(row["id"], {})) for row in candidates]
+        read_stats = {
+            "candidate_rows": len(candidates),
+            "candidate_bytes": candidate_bytes,
+            "detail_rows": len(details),
+            "detail_bytes": payload_bytes(list(details.values())),
+        }
+        return rows, read_stats
+
+
+# =============================================================================
+# SUPABASE
+# =============================================================================
+
+class SupabaseExampleStore(ExampleStore):
+    """Shared examples stored in the hosted Supabase `shared_examples` table."""
+
+    def __init__(self, client):
+        self.client = client
+        # Cleared if the database lacks match_similar_examples (schema not migrated)
+        self._use_rpc = True
+
+    def insert(self, row: dict) -> str:
+        result = self.client.table("shared_examples").insert(row).execute()
+        return result.data[0]["id"] if result.data else "unknown"
+
+    def similar_candidates(self, position, max_distance, object_type=None, limit=5):
+        if self._use_rpc:
+            try:
+                # Returns CANDIDATE_COLUMNS plus distance
+                result = self.client.rpc("match_similar_examples", {
+                    "target_x": position[0],
+                    "target_y": position[1],
+                    "target_z": position[2],
+                    "max_distance": max_distance,
+                    "match_count": limit,
+                    "filter_type": object_type,
+                }).execute()
+                return result.data, payload_bytes(result.data)
+            except Exception as e:
+                # PGRST202: function not found in the schema cache
+                if getattr(e, "code", None) != "PGRST202":
+                    raise
+                print("[Examples] match_similar_examples not installed, filtering client-side")
+                self._use_rpc = False
+
+        # Fallback: query all candidates and filter by distance in Python
+        query = self.client.table("shared_examples").select(", ".join(CANDIDATE_COLUMNS))
+        if object_type:
+            query = query.eq("object_type", object_type)
+
+        result = query.execute()
+        # Every candidate row crosses the wire on this path
+        return rank_by_distance(result.data, position, max_distance, limit), payload_bytes(result.data)
+
+    def fetch_details(self, ids):
+        ids = list(ids)
+        details = {}
+        for start in range(0, len(ids), DETAIL_CHUNK):
+            result = (
+                self.client.table("shared_examples")
+                .select(", ".join(("id",) + DETAIL_COLUMNS))
+                .in_("id", ids[start:start + DETAIL_CHUNK])
+                .execute()
+            )
+            details.update((row["id"], row) for row in result.data)
+        return details
+
+    def stats(self, grid_size=0.05):
+        result = self.client.table("shared_examples").select("object_type, object_position").execute()
+
+        by_type = {}
+        grid_counts = {}
+        for row in result.data:
+            obj_type = row["object_type"]
+            by_type[obj_type] = by_type.get(obj_type, 0) + 1
+
+            cell = grid_cell(row["object_position"], grid_size)
+            grid_counts[cell] = grid_counts.get(cell, 0) + 1
+
+        return {"total": len(result.data), "by_type": by_type, "grid_counts": grid_counts}
+
+    def page_candidates(self, limit, offset=0):
+        result = (
+            self.client.table("shared_examples")
+            .select(", ".join(CANDIDATE_COLUMNS + DETAIL_COLUMNS))
+            .order("created_at", desc=True)
+            .range(offset, offset + limit - 1)
+            .execute()
+        )
+        return result.data, payload_bytes(result.data)
+
+    def count(self):
+        result = self.client.table("shared_examples").select("id", count="exact").execute()
+        return result.count or 0
+
+
+# =============================================================================
+# SQLITE
+# =============================================================================
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS shared_examples (
+    seq INTEGER PRIMARY KEY,            -- Rowid shared with the R*Tree index
+    id TEXT UNIQUE NOT NULL,
+    object_position TEXT NOT NULL,      -- JSON [x, y, z] in meters
+    pos_x REAL NOT NULL,
+    pos_y REAL NOT NULL,
+    pos_z REAL NOT NULL,
+    object_type TEXT NOT NULL,
+    object_scale REAL NOT NULL,
+    joint_sequence TEXT NOT NULL,       -- JSON array of joint angle objects
+    ik_errors TEXT,                     -- JSON { approach, grasp, lift }
+    user_message TEXT,
+    language_variants TEXT,             -- JSON array of phrasings
+    created_at TEXT NOT NULL,
+    contributor_hash TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_shared_examples_object_type
+    ON shared_examples(object_type);
+
+CREATE INDEX IF NOT EXISTS idx_shared_examples_created_at
+    ON shared_examples(created_at DESC);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS shared_examples_position
+    USING rtree(seq, min_x, max_x, min_y, max_y, min_z, max_z);
+"""
+
+JSON_COLUMNS = ("object_position", "joint_sequence", "ik_errors", "language_variants")
+
+
+class SQLiteExampleStore(ExampleStore):
+    """Shared examples stored in a local SQLite database (WAL + R*Tree)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # One connection per thread; WAL lets them read concurrently
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SQLITE_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> dict:
+        data = {key: row[key] for key in row.keys()}
+        for column in JSON_COLUMNS:
+            if data.get(column) is not None:
+                data[column] = json.loads(data[column])
+        return data
+
+    def insert(self, row: dict) -> str:
+        example_id = row.get("id") or str(uuid.uuid4())
+        x, y, z = row["object_position"]
+
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                INSERT INTO shared_examples (
+                    id, object_position, pos_x, pos_y, pos_z, object_type, object_scale,
+                    joint_sequence, ik_errors, user_message, language_variants,
+                    created_at, contributor_hash
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    example_id,
+                    json.dumps(row["object_position"]),
+                    x, y, z,
+                    row["object_type"],
+                    row["object_scale"],
+                    json.dumps(row["joint_sequence"]),
+                    json.dumps(row.get("ik_errors")),
+                    row.get("user_message"),
+                    json.dumps(row.get("language_variants") or []),
+                    row.get("created_at") or datetime.now().isoformat(),
+                    row.get("contributor_hash"),
+                ),
+            )
+            conn.execute(
+                "INSERT INTO shared_examples_position VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (cursor.lastrowid, x, x, y, y, z, z),
+            )
+
+        return example_id
+
+    def similar_candidates(self, position, max_distance, object_type=None, limit=5):
+        x, y, z = position
+        dist_sq = "((e.pos_x - :x) * (e.pos_x - :x) + (e.pos_y - :y) * (e.pos_y - :y) + (e.pos_z - :z) * (e.pos_z - :z))"
+        # R*Tree bounding-box prefilter, then exact distance on the candidates.
+        # Unary + keeps the planner from preferring the object_type index over the R*Tree.
+        sql = f"""
+            SELECT {", ".join("e." + c for c in CANDIDATE_COLUMNS)}, {dist_sq} AS dist_sq
+            FROM shared_examples_position r
+            JOIN shared_examples e ON e.seq = r.seq
+            WHERE r.max_x >= :x - :d AND r.min_x <= :x + :d
+              AND r.max_y >= :y - :d AND r.min_y <= :y + :d
+              AND r.max_z >= :z - :d AND r.min_z <= :z + :d
+              AND {dist_sq} <= :d * :d
+              {"AND +e.object_type = :object_type" if object_type else ""}
+            ORDER BY dist_sq, e.seq
+            LIMIT :limit
+        """
+        rows = self._connect().execute(sql, {
+            "x": x, "y": y, "z": z, "d": max_distance,
+            "object_type": object_type, "limit": limit,
+        }).fetchall()
+
+        similar = []
+        for row in rows:
+            data = self._to_dict(row)
+            data["distance"] = math.sqrt(data.pop("dist_sq"))
+            similar.append(data)
+        return similar, payload_bytes(similar)
+
+    def fetch_details(self, ids):
+        placeholders = ", ".join("?" for _ in ids)
+        rows = self._connect().execute(
+            f"SELECT {', '.join(('id',) + DETAIL_COLUMNS)} FROM shared_examples WHERE id IN ({placeholders})",
+            list(ids),
+        ).fetchall()
+        return {row["id"]: self._to_dict(row) for row in rows}
+
+    def stats(self, grid_size=0.05):
+        conn = self._connect()
+        by_type = dict(conn.execute(
+            "SELECT object_type, COUNT(*) FROM shared_examples GROUP BY object_type"
+        ).fetchall())
+
+        grid_counts: Dict[Tuple[int, int], int] = {}
+        for pos_x, pos_z in conn.execute("SELECT pos_x, pos_z FROM shared_examples"):
+            cell = grid_cell([pos_x, 0.0, pos_z], grid_size)
+            grid_counts[cell] = grid_counts.get(cell, 0) + 1
+
+        return {"total": sum(by_type.values()), "by_type": by_type, "grid_counts": grid_counts}
+
+    def page_candidates(self, limit, offset=0):
+        rows = self._connect().execute(
+            f"SELECT {', '.join(CANDIDATE_COLUMNS + DETAIL_COLUMNS)} FROM shared_examples ORDER BY created_at DESC, seq DESC LIMIT ? OFFSET ?",
+            (limit, offset),
+        ).fetchall()
+        page = [self._to_dict(row) for row in rows]
+        return page, payload_bytes(page)
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM shared_examples").fetchone()[0]
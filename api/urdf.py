@@ -0,0 +1,143 @@
+"""
+URDF parsing shared by the API (kinematics) and scripts/convert_urdf_to_gltf.py.
+
+Only depends on the standard library. Joints keep their URDF order; links map
+to their visuals, with mesh paths resolved on disk.
+"""
+
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+# Color for visuals whose URDF material has no color
+DEFAULT_COLOR = [0.8, 0.8, 0.8, 1.0]
+
+
+def _floats(text, default):
+    return [float(v) for v in text.split()] if text else list(default)
+
+
+def _parse_origin(element):
+    """(xyz, rpy) of an element's <origin>, defaulting to identity."""
+    origin = element.find("origin") if element is not None else None
+    if origin is None:
+        return [0.0, 0.0, 0.0], [0.0, 0.0, 0.0]
+    return _floats(origin.get("xyz"), [0, 0, 0]), _floats(origin.get("rpy"), [0, 0, 0])
+
+
+def _parse_color(material):
+    color = material.find("color") if material is not None else None
+    return _floats(color.get("rgba"), DEFAULT_COLOR) if color is not None else None
+
+
+def resolve_mesh_path(filename, urdf_dir):
+    """Resolve a URDF mesh filename (relative, file:// or package://) to a local path."""
+    if filename.startswith("file://"):
+        candidates = [Path(filename[len("file://"):])]
+    elif filename.startswith("package://"):
+        # package://<package>/<path> -> try <path> relative to the URDF, then the full remainder
+        remainder = filename[len("package://"):]
+        candidates = [urdf_dir / remainder.partition("/")[2], urdf_dir / remainder]
+    else:
+        candidates = [urdf_dir / filename]
+    # Some exports flatten the mesh folder next to the URDF
+    candidates.append(urdf_dir / Path(filename).name)
+
+    for path in candidates:
+        if path.exists():
+            return path
+    return candidates[0]
+
+
+def _parse_geometry(geometry, urdf_dir):
+    if geometry is None:
+        return None
+    mesh = geometry.find("mesh")
+    if mesh is not None:
+        return {
+            "type": "mesh",
+            "file": resolve_mesh_path(mesh.get("filename", ""), urdf_dir),
+            "scale": _floats(mesh.get("scale"), [1, 1, 1]),
+        }
+    box = geometry.find("box")
+    if box is not None:
+        return {"type": "box", "size": _floats(box.get("size"), [0, 0, 0])}
+    cylinder = geometry.find("cylinder")
+    if cylinder is not None:
+        return {"type": "cylinder", "radius": float(cylinder.get("radius")), "length": float(cylinder.get("length"))}
+    sphere = geometry.find("sphere")
+    if sphere is not None:
+        return {"type": "sphere", "radius": float(sphere.get("radius"))}
+    return None
+
+
+def parse_urdf(urdf_path, colors=None, default_color=DEFAULT_COLOR):
+    """
+    Parse a URDF into a robot description:
+    {"name", "urdf", "materials", "links": {link: [visual, ...]}, "joints": [joint, ...]}.
+    `colors` overrides material colors by name (inline or global); visuals with
+    no color at all get `default_color`.
+    """
+    urdf_path = Path(urdf_path)
+    root = ET.parse(urdf_path).getroot()
+    colors = colors or {}
+
+    materials = {}
+    for material in root.findall("material"):
+        color = _parse_color(material)
+        if color is not None:
+            materials[material.get("name")] = color
+
+    links = {}
+    for link in root.findall("link"):
+        visuals = []
+        for visual in link.findall("visual"):
+            geometry = _parse_geometry(visual.find("geometry"), urdf_path.parent)
+            if geometry is None:
+                print(f"  Warning: unsupported geometry in {link.get('name')}, skipping visual")
+                continue
+
+            xyz, rpy = _parse_origin(visual)
+            material = visual.find("material")
+            material_name = material.get("name") if material is not None else None
+            color = (
+                colors.get(material_name)
+                or _parse_color(material)
+                or materials.get(material_name)
+                or default_color
+            )
+            visuals.append({
+                "geometry": geometry,
+                "xyz": xyz,
+                "rpy": rpy,
+                "material": material_name or "rgba_" + "_".join(f"{c:.3g}" for c in color),
+                "color": list(color),
+            })
+        links[link.get("name")] = visuals
+
+    joints = []
+    for joint in root.findall("joint"):
+        xyz, rpy = _parse_origin(joint)
+        axis = joint.find("axis")
+        limit = joint.find("limit")
+        joints.append({
+            "name": joint.get("name"),
+            "type": joint.get("type"),
+            "parent": joint.find("parent").get("link"),
+            "child": joint.find("child").get("link"),
+            "origin_xyz": xyz,
+            "origin_rpy": rpy,
+            "axis": _floats(axis.get("xyz") if axis is not None else None, [1, 0, 0]),
+            "limit": (
+                [float(limit.get("lower", 0)), float(limit.get("upper", 0))]
+                if limit is not None and joint.get("type") in ("revolute", "prismatic")
+                else None
+            ),
+        })
+
+    return {
+        "name": root.get("name"),
+        "urdf": urdf_path,
+        "materials": materials,
+        "links": links,
+        "joints": joints,
+    }
@@ -0,0 +1,669 @@
+#!/usr/bin/env python3
+"""
+Benchmark the RoboSim API hot paths against in-memory stand-ins.
+
+Generates synthetic episodes and shared-example tables, then drives the
+real endpoint functions from api/main.py with Supabase and the HuggingFace
+Hub replaced by in-memory fakes. Each case runs in a fresh process so the
+reported peak RSS belongs to that case alone.
+
+Shared-example cases run against either backend in api/storage.py
+(--backend supabase uses an in-memory Supabase stand-in, --backend sqlite a
+temporary SQLite database). The stand-in has no match_similar_examples
+function, so similar queries take the store's client-side fallback.
+
+Cases:
+    convert  - POST /api/dataset/convert   (throughput in frames/s)
+    upload   - POST /api/dataset/upload    (throughput in frames/s)
+    similar  - GET  /api/examples/similar  (throughput in queries/s, bytes read per query)
+    stats    - GET  /api/examples/stats    (throughput in rows/s)
+    startup  - python -m api.main with --startup-workers workers until every
+               worker is up and GET /health answers (latency per cold start,
+               checked against --startup-target-ms, plus the slowest imports
+               from python -X importtime)
+
+Usage:
+    pip install -r api/requirements.txt
+    python scripts/benchmark_api.py --frames 100000 --examples 10000
+    python scripts/benchmark_api.py --cases similar stats --examples 1000000 --backend sqlite
+    python scripts/benchmark_api.py --frames 1000000 --output bench_new.json --compare bench_old.json
+    python scripts/benchmark_api.py --cases startup --routers examples --startup-target-ms 800
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+# Paths
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+CASES = ["convert", "upload", "similar", "stats", "startup"]
+OBJECT_TYPES = ["cube", "cylinder", "ball"]
+JOINT_NAMES = ["base", "shoulder", "elbow", "wrist", "wristRoll", "gripper"]
+
+
+# =============================================================================
+# SYNTHETIC DATA
+# =============================================================================
+
+def make_episodes(total_frames, frames_per_episode, seed=0):
+    """Generate episode dicts shaped like the frontend LeRobot export."""
+    rng = random.Random(seed)
+    episodes = []
+    remaining = total_frames
+    ep_idx = 0
+
+    while remaining > 0:
+        length = min(frames_per_episode, remaining)
+        frames = []
+        for frame_idx in range(length):
+            state = [rng.uniform(-90.0, 90.0) for _ in range(6)]
+            frames.append({
+                "timestamp": frame_idx / 30.0,
+                "observation": {"jointPositions": state},
+                "action": {"jointPositions": [v + rng.uniform(-1.0, 1.0) for v in state]},
+            })
+        episodes.append({
+            "episodeIndex": ep_idx,
+            "frames": frames,
+            "metadata": {"languageInstruction": f"pick up the {OBJECT_TYPES[ep_idx % len(OBJECT_TYPES)]}"},
+        })
+        remaining -= length
+        ep_idx += 1
+
+    return episodes
+
+
+def make_example_rows(count, seed=0):
+    """Generate shared_examples rows as Supabase would return them."""
+    rng = random.Random(seed)
+    rows = []
+
+    for _ in range(count):
+        rows.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "object_position": [rng.uniform(-0.25, 0.25), rng.uniform(0.0, 0.15), rng.uniform(0.05, 0.35)],
+            "object_type": rng.choice(OBJECT_TYPES),
+            "object_scale": rng.uniform(0.02, 0.05),
+            "joint_sequence": [
+                {name: rng.uniform(-90.0, 90.0) for name in JOINT_NAMES}
+                for _ in range(4)
+            ],
+            "ik_errors": {"approach": rng.random() * 0.01, "grasp": rng.random() * 0.01, "lift": rng.random() * 0.01},
+            "user_message": "pick up the object",
+            "language_variants": ["grab the object", "lift the object"],
+            "created_at": datetime.now().isoformat(),
+        })
+
+    return rows
+
+
+# =============================================================================
+# IN-MEMORY STAND-INS
+# =============================================================================
+
+class InMemoryResult:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def _split_filters(text):
+    """Split a PostgREST filter list on its top-level commas"""
+    parts, depth, current = [], 0, ""
+    for char in text:
+        if char == "," and depth == 0:
+            parts.append(current)
+            current = ""
+            continue
+        depth += (char == "(") - (char == ")")
+        current += char
+    return parts + [current]
+
+
+def _compare(value, op, operand):
+    if value is None:
+        return False
+    if operand.lstrip("-").isdigit():
+        operand = int(operand)
+    elif operand.endswith("Z") and isinstance(value, str):
+        # Timestamps compare as instants, like timestamptz columns
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        operand = datetime.fromisoformat(operand.replace("Z", "+00:00"))
+    return {"eq": value == operand, "lt": value < operand, "gt": value > operand}[op]
+
+
+def parse_filter(expr):
+    """Row predicate for one PostgREST logical filter term, e.g. and(status.eq.failed,attempts.lt.5)"""
+    if expr.startswith("and("):
+        terms = [parse_filter(part) for part in _split_filters(expr[len("and("):-1])]
+        return lambda row: all(term(row) for term in terms)
+    column, op, operand = expr.split(".", 2)
+    return lambda row: _compare(row.get(column), op, operand)
+
+
+class InMemoryQuery:
+    """Subset of the postgrest query builder used by the API (api/main.py, api/storage.py, api/billing.py)."""
+
+    def __init__(self, rows, defaults=None):
+        self._rows = rows
+        self._defaults = defaults or {}
+        self._columns = None
+        self._filters = []
+        self._limit = None
+        self._offset = 0
+        self._order = None
+        self._count = None
+        self._insert = None
+        self._conflict = None
+        self._update = None
+
+    def select(self, columns="*", count=None):
+        if columns != "*":
+            self._columns = [c.strip() for c in columns.split(",")]
+        self._count = count
+        return self
+
+    def eq(self, column, value):
+        self._filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self._filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def or_(self, filters):
+        terms = [parse_filter(part) for part in _split_filters(filters)]
+        self._filters.append(lambda row: any(term(row) for term in terms))
+        return self
+
+    def order(self, column, desc=False):
+        self._order = (column, desc)
+        return self
+
+    def limit(self, size):
+        self._limit = size
+        return self
+
+    def range(self, start, end):
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    def insert(self, row):
+        self._insert = {**self._defaults, **row, "id": row.get("id") or str(uuid.uuid4())}
+        return self
+
+    def upsert(self, row, on_conflict, ignore_duplicates=False):
+        if not ignore_duplicates:
+            raise NotImplementedError("only insert-or-ignore upserts are supported")
+        self._conflict = on_conflict
+        return self.insert(row)
+
+    def update(self, values):
+        self._update = values
+        return self
+
+    def execute(self):
+        if self._insert is not None:
+            key = self._conflict
+            if key and any(row.get(key) == self._insert[key] for row in self._rows):
+                return InMemoryResult([])
+            self._rows.append(self._insert)
+            return InMemoryResult([dict(self._insert)])
+
+        rows = [row for row in self._rows if all(f(row) for f in self._filters)]
+        if self._update is not None:
+            for row in rows:
+                row.update(self._update)
+        count = len(rows) if self._count else None
+        if self._order is not None:
+            column, desc = self._order
+            rows = sorted(rows, key=lambda row: row.get(column), reverse=desc)
+        if self._limit is not None:
+            rows = rows[self._offset:self._offset + self._limit]
+        if self._columns is not None:
+            rows = [{c: row.get(c) for c in self._columns} for row in rows]
+        else:
+            rows = [dict(row) for row in rows]
+        return InMemoryResult(rows, count)
+
+
+class InMemoryAPIError(Exception):
+    """Mirrors postgrest's APIError: the PostgREST error code is in .code"""
+
+    def __init__(self, error):
+        super().__init__(error.get("message"))
+        self.code = error.get("code")
+
+
+class InMemoryCall:
+    def __init__(self, function):
+        self._function = function
+
+    def execute(self):
+        return InMemoryResult(self._function())
+
+
+class InMemorySupabase:
+    """
+    Stand-in for the Supabase client over in-memory tables (lists of row dicts).
+    Database functions are Python callables registered in `functions`; calling
+    any other one fails with PGRST202, as on a database without the migration.
+    """
+
+    def __init__(self, tables=None, defaults=None, functions=None):
+        self.tables = tables or {}
+        # Column defaults per table, applied on insert like the schema's DEFAULT clauses
+        self.defaults = defaults or {}
+        self.functions = functions or {}
+
+    def table(self, name):
+        return InMemoryQuery(self.tables.setdefault(name, []), self.defaults.get(name))
+
+    def rpc(self, name, params):
+        if name not in self.functions:
+            raise InMemoryAPIError({
+                "code": "PGRST202",
+                "message": f"Could not find the function public.{name} in the schema cache",
+            })
+        return InMemoryCall(lambda: self.functions[name](**params))
+
+
+class InMemoryHfApi:
+    """Stand-in for huggingface_hub.HfApi that measures instead of uploading."""
+
+    uploaded_bytes = 0
+
+    def __init__(self, token=None):
+        self.token = token
+
+    def whoami(self):
+        return {"name": "benchmark"}
+
+    def upload_folder(self, folder_path, **kwargs):
+        InMemoryHfApi.uploaded_bytes += sum(
+            p.stat().st_size for p in Path(folder_path).rglob("*") if p.is_file()
+        )
+
+
+@contextmanager
+def patched(module, **attrs):
+    """Temporarily replace module attributes."""
+    originals = {name: getattr(module, name) for name in attrs}
+    for name, value in attrs.items():
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for name, value in originals.items():
+            setattr(module, name, value)
+
+
+# =============================================================================
+# CASES
+# =============================================================================
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    """Peak resident set size of this process (or its largest finished child) in MB."""
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies, units_per_call, unit):
+    total = sum(latencies)
+    return {
+        "calls": len(latencies),
+        "throughput": units_per_call * len(latencies) / total if total else 0.0,
+        "throughput_unit": unit,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": total / len(latencies) * 1000,
+    }
+
+
+def timed(fn, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_healthy(env, workers=1, timeout=60.0):
+    """
+    Seconds from launching the server until it answers /health and all
+    `workers` worker processes have started (each logs a [Startup] line).
+    """
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "api.main", "--port", str(port), "--workers", str(workers)],
+        cwd=PROJECT_ROOT, env=dict(env, PYTHONUNBUFFERED="1"),
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    started = []
+
+    def count_started():
+        for line in server.stdout:
+            if line.startswith("[Startup] api.main imported"):
+                started.append(line)
+
+    threading.Thread(target=count_started, daemon=True).start()
+    healthy = False
+    try:
+        while time.perf_counter() - start < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"server exited with code {server.returncode} before becoming healthy")
+            if not healthy:
+                try:
+                    with urllib.request.urlopen(url, timeout=1) as response:
+                        healthy = response.status == 200
+                except OSError:
+                    pass
+            if healthy and len(started) >= workers:
+                return time.perf_counter() - start
+            time.sleep(0.005)
+        raise RuntimeError(f"server not healthy after {timeout:.0f}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def slowest_imports(env, count=10):
+    """Top modules by cumulative import time (ms) when importing api.main, from python -X importtime."""
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import api.main"],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stderr
+    imports = []
+    for line in output.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                depth = (len(name) - len(name.lstrip()) - 1) // 2
+                imports.append((depth, int(cumulative) / 1000, name.strip()))
+
+    # Children are listed before their parent: walk back from api.main over its subtree
+    end = next(i for i, (depth, _, name) in enumerate(imports) if depth == 0 and name == "api.main")
+    top = [imports[end][1:]]
+    for depth, ms, name in reversed(imports[:end]):
+        if depth == 0:
+            break
+        if depth == 1:
+            top.append((ms, name))
+    return [{"module": name, "ms": round(ms, 1)} for ms, name in sorted(top, reverse=True)[:count]]
+
+
+def run_startup(params):
+    """Cold-start cases: each start is a new interpreter, as on a freshly scaled-up container."""
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT))
+    if params["routers"] is not None:
+        env["API_ROUTERS"] = params["routers"]
+
+    loaded = subprocess.run(
+        [sys.executable, "-c", "import api.main, json; print(json.dumps(api.main.startup_report()))"],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stdout.splitlines()[-1]
+    latencies = [time_to_healthy(env, params["startup_workers"]) for _ in range(params["repeat"])]
+
+    result = summarize(latencies, 1, "starts/s")
+    result["workers"] = params["startup_workers"]
+    result.update(json.loads(loaded))
+    result["slowest_imports"] = slowest_imports(env)
+    result["target_ms"] = params["startup_target_ms"]
+    result["within_target"] = result["p50_ms"] <= params["startup_target_ms"]
+    result["peak_rss_mb"] = peak_rss_mb(resource.RUSAGE_CHILDREN)
+    return result
+
+
+def run_case(case, params):
+    """Run a single benchmark case. Executed in a fresh worker process."""
+    if case == "startup":
+        return run_startup(params)
+
+    sys.path.insert(0, str(PROJECT_ROOT))
+    os.environ["CONVERSION_PROCESSES"] = str(params["conversion_processes"])
+    # Private cache generation file so invalidations don't reach a running server
+    cache_dir = tempfile.TemporaryDirectory()
+    os.environ["EXAMPLES_CACHE_PATH"] = str(Path(cache_dir.name) / "examples.gen")
+    from api import main
+
+    rng = random.Random(params["seed"])
+    # One event loop per case so loop setup is not counted in every call
+    loop = asyncio.new_event_loop()
+
+    if case in ("convert", "upload"):
+        episodes = [main.Episode(**ep) for ep in make_episodes(
+            params["frames"], params["frames_per_episode"], params["seed"]
+        )]
+        frames = sum(len(ep.frames) for ep in episodes)
+
+        if case == "convert":
+            def call():
+                loop.run_until_complete(main.convert_to_parquet(episodes, robot_type=None))
+        else:
+            request = main.UploadRequest(
+                episodes=episodes,
+                metadata=main.DatasetMetadata(
+                    robotType="so101",
+                    totalFrames=frames,
+                    totalEpisodes=len(episodes),
+                ),
+                hfToken="hf_benchmark",
+                repoName="benchmark-dataset",
+            )
+
+            import huggingface_hub
+
+            def call():
+                # upload_dataset imports these on first use, so patch them at the source
+                with patched(huggingface_hub, HfApi=InMemoryHfApi, create_repo=lambda **kwargs: None):
+                    loop.run_until_complete(main.upload_dataset(request))
+
+        latencies = timed(call, params["repeat"])
+        result = summarize(latencies, frames, "frames/s")
+        result["frames"] = frames
+
+    else:
+        from api import storage
+
+        rows = make_example_rows(params["examples"], params["seed"])
+        if params["backend"] == "sqlite":
+            tmpdir = tempfile.TemporaryDirectory()
+            store = storage.SQLiteExampleStore(Path(tmpdir.name) / "bench.db")
+            for row in rows:
+                store.insert(row)
+        else:
+            store = storage.SupabaseExampleStore(InMemorySupabase({"shared_examples": rows}))
+
+        if case == "similar":
+            read_bytes = []
+
+            def call():
+                response = main.Response()
+                loop.run_until_complete(main.get_similar_examples(
+                    response=response,
+                    x=rng.uniform(-0.25, 0.25),
+                    y=rng.uniform(0.0, 0.15),
+                    z=rng.uniform(0.05, 0.35),
+                    object_type=rng.choice([None] + OBJECT_TYPES),
+                    max_distance=0.05,
+                    limit=5,
+                    fallback_seed=False,
+                ))
+                read_bytes.append(
+                    int(response.headers["x-read-bytes-candidates"]) + int(response.headers["x-read-bytes-details"])
+                )
+
+            with patched(main, get_example_store=lambda: store):
+                latencies = timed(call, params["queries"])
+            result = summarize(latencies, 1, "queries/s")
+            result["read_bytes_per_query"] = sum(read_bytes) / len(read_bytes)
+        else:
+            def call():
+                # Measure the aggregation itself, not the per-worker cache
+                main.get_examples_cache().invalidate()
+                loop.run_until_complete(main.get_example_stats())
+
+            with patched(main, get_example_store=lambda: store):
+                latencies = timed(call, params["repeat"])
+            result = summarize(latencies, params["examples"], "rows/s")
+        result["examples"] = params["examples"]
+
+    main.shutdown_conversion_pool()
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+# =============================================================================
+# DRIVER
+# =============================================================================
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline_path):
+    """Print throughput and latency deltas against a previous results file."""
+    baseline = json.loads(Path(baseline_path).read_text())
+    print(f"\nComparison against {baseline_path} (commit {baseline.get('commit')})")
+    print(f"{'case':<10}{'throughput':>14}{'p50':>10}{'p99':>10}{'rss':>10}")
+
+    for case, result in current["results"].items():
+        base = baseline.get("results", {}).get(case)
+        if not base:
+            print(f"{case:<10}{'(no baseline)':>14}")
+            continue
+
+        def delta(key):
+            return (result[key] - base[key]) / base[key] * 100 if base[key] else 0.0
+
+        print(
+            f"{case:<10}{delta('throughput'):>+13.1f}%{delta('p50_ms'):>+9.1f}%"
+            f"{delta('p99_ms'):>+9.1f}%{delta('peak_rss_mb'):>+9.1f}%"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark RoboSim API hot paths")
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=CASES)
+    parser.add_argument("--frames", type=int, default=10_000, help="Total frames (1k to 10M)")
+    parser.add_argument("--frames-per-episode", type=int, default=300)
+    parser.add_argument("--examples", type=int, default=10_000, help="Shared examples (1k to 1M)")
+    parser.add_argument("--conversion-processes", type=int, default=0,
+                        help="Process pool size for convert/upload (0 = thread)")
+    parser.add_argument("--backend", choices=["supabase", "sqlite"], default="supabase",
+                        help="Shared examples backend for similar/stats")
+    parser.add_argument("--queries", type=int, default=200, help="Similar-example queries to issue")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions for conversion, stats and startup")
+    parser.add_argument("--routers", help="API_ROUTERS for the startup case (default: all routers)")
+    parser.add_argument("--startup-workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", "1")),
+                        help="Worker processes for the startup case, as deployed (default: $WEB_CONCURRENCY or 1, "
+                             "like python -m api.main; render.yaml sets WEB_CONCURRENCY)")
+    parser.add_argument("--startup-target-ms", type=float, default=1000.0,
+                        help="Target for the median time to the first healthy response (startup case)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=PROJECT_ROOT / "bench_results.json")
+    parser.add_argument("--compare", type=Path, help="Previous results file to diff against")
+    args = parser.parse_args()
+
+    params = {
+        "frames": args.frames,
+        "frames_per_episode": args.frames_per_episode,
+        "examples": args.examples,
+        "backend": args.backend,
+        "conversion_processes": args.conversion_processes,
+        "queries": args.queries,
+        "repeat": args.repeat,
+        "routers": args.routers,
+        "startup_workers": args.startup_workers,
+        "startup_target_ms": args.startup_target_ms,
+        "seed": args.seed,
+    }
+
+    print("=" * 60)
+    print("RoboSim API Benchmark")
+    print("=" * 60)
+
+    results = {}
+    spawn = multiprocessing.get_context("spawn")
+    for case in args.cases:
+        print(f"Running {case}...")
+        # Fresh process per case so peak RSS is not inherited from earlier cases
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+            result = pool.submit(run_case, case, params).result()
+        results[case] = result
+        print(
+            f"  {result['throughput']:.1f} {result['throughput_unit']}, "
+            f"p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms, "
+            f"peak RSS {result['peak_rss_mb']:.1f} MB"
+        )
+        if case == "startup":
+            print(
+                f"  {result['workers']} worker(s) until all are up and /health answers; "
+                f"import {result['import_ms']:.0f} ms, heavy modules loaded: "
+                f"{', '.join(result['heavy_modules_loaded']) or 'none'}; target {result['target_ms']:.0f} ms "
+                f"{'met' if result['within_target'] else 'MISSED'}"
+            )
+            for entry in result["slowest_imports"]:
+                print(f"    {entry['ms']:>8.1f} ms  {entry['module']}")
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params,
+        "results": results,
+    }
+
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"\nWrote {args.output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
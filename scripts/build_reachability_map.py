@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Build the SO-101 reachability map used by the API for coverage gaps and IK seeds.
+
+Samples the arm's joint space uniformly within the URDF limits, runs batched
+forward kinematics (api/kinematics.py) on every sample and bins the
+end-effector positions into voxels. For each voxel the map keeps how many
+samples landed in it and the sample closest to the voxel center, as a joint
+seed in the app's units (degrees, gripper in percent). Wrist roll is held at 0
+and the gripper open; neither moves the end effector much.
+
+Output (default api/data/reachability_so101.*):
+- .npy: structured array of shape (nx, ny, nz), indexed by voxel along the
+  Three.js x, y (up) and z axes, with fields count (uint32), distance (float32,
+  meters from the voxel center) and seed (float32[6]; NaN where unreachable).
+  Load it with np.load(path, mmap_mode="r") to share pages between workers.
+- .json: voxel size, grid origin and shape, frame, joint order and units.
+
+Usage:
+    python scripts/build_reachability_map.py
+    python scripts/build_reachability_map.py --samples 4000000 --voxel 0.01
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+from api.kinematics import ROBOTS, load_chain  # noqa: E402
+from api.reachability import CELL_DTYPE, FORMAT_VERSION, SEED_JOINTS  # noqa: E402
+
+OUTPUT = PROJECT_ROOT / "api" / "data" / "reachability_so101"
+
+# Joints sampled over their full range; the rest are fixed at these URDF values
+SAMPLED_JOINTS = ("shoulder_pan", "shoulder_lift", "elbow_flex", "wrist_flex")
+FIXED_JOINTS = {"wrist_roll": 0.0}
+GRIPPER_OPEN_PERCENT = 100.0
+
+
+def sample_configurations(chain, count, rng):
+    """(count, dof) URDF joint values, uniform over the sampled joints' limits."""
+    q = np.zeros((count, len(chain.joint_names)))
+    for column, name in enumerate(chain.joint_names):
+        if name in SAMPLED_JOINTS:
+            lower, upper = chain.limits[column]
+            q[:, column] = rng.uniform(lower, upper, count)
+        else:
+            q[:, column] = FIXED_JOINTS.get(name, 0.0)
+    return q
+
+
+def build_map(robot_type, samples, voxel, min_y, seed, chunk=250_000):
+    """Return (cells, meta) for a robot type with known kinematics."""
+    chain = load_chain(robot_type)
+    entry = ROBOTS[robot_type]
+    rng = np.random.default_rng(seed)
+
+    start = time.perf_counter()
+    q = sample_configurations(chain, samples, rng)
+    ee = chain.positions(q, entry["end_effector"], frame="three", chunk=chunk)
+    print(f"Forward kinematics for {samples:,} samples: {time.perf_counter() - start:.2f}s")
+
+    keep = ee[:, 1] >= min_y
+    q, ee = q[keep], ee[keep]
+
+    origin = np.floor(ee.min(axis=0) / voxel) * voxel
+    shape = tuple(int(n) for n in np.floor((ee.max(axis=0) - origin) / voxel).astype(int) + 1)
+    index = np.minimum(np.floor((ee - origin) / voxel).astype(np.int64), np.array(shape) - 1)
+    flat = np.ravel_multi_index(index.T, shape)
+    distance = np.linalg.norm(ee - (origin + (index + 0.5) * voxel), axis=1)
+
+    # Closest sample per voxel: sort by (voxel, distance) and take the first of each run
+    order = np.lexsort((distance, flat))
+    first = order[np.r_[True, flat[order][1:] != flat[order][:-1]]]
+
+    cells = np.zeros(shape, dtype=CELL_DTYPE).reshape(-1)
+    cells["distance"] = np.inf
+    cells["seed"] = np.nan
+    cells["count"] = np.bincount(flat, minlength=cells.size)
+    cells["distance"][flat[first]] = distance[first]
+
+    # Seeds in the app's joint units: degrees, gripper as percent open
+    seeds = np.degrees(q[first])
+    gripper = entry["joints"].index(entry["gripper"][0])
+    seeds[:, gripper] = GRIPPER_OPEN_PERCENT
+    cells["seed"][flat[first]] = seeds
+    cells = cells.reshape(shape)
+
+    meta = {
+        "version": FORMAT_VERSION,
+        "robot": robot_type,
+        "frame": "three",  # Y-up, meters, as objectPosition in the examples API
+        "voxel_size": voxel,
+        "origin": origin.round(9).tolist(),
+        "shape": list(shape),
+        "joints": list(SEED_JOINTS),
+        "angle_unit": "degrees",
+        "gripper_unit": "percent",
+        "samples": samples,
+        "random_seed": seed,
+        "min_y": min_y,
+        "urdf_sha256": hashlib.sha256(entry["urdf"].read_bytes()).hexdigest(),
+        "created_at": datetime.now().isoformat(),
+    }
+    return cells, meta
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the voxel reachability map for IK seeds and coverage gaps")
+    parser.add_argument("--robot", default="so101", choices=sorted(ROBOTS), help="Robot type")
+    parser.add_argument("--samples", type=int, default=2_000_000, help="Joint configurations to sample")
+    parser.add_argument("--voxel", type=float, default=0.02, help="Voxel edge length in meters")
+    parser.add_argument("--min-y", type=float, default=0.0, help="Ignore end-effector positions below this height")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed, for reproducible maps")
+    parser.add_argument("--output", type=Path, default=OUTPUT, help="Output path without extension")
+    args = parser.parse_args()
+
+    if load_chain(args.robot) is None:
+        parser.error(f"URDF for {args.robot} not found at {ROBOTS[args.robot]['urdf']}")
+    if args.samples <= 0 or args.voxel <= 0:
+        parser.error("--samples and --voxel must be positive")
+
+    cells, meta = build_map(args.robot, args.samples, args.voxel, args.min_y, args.seed)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    npy_path = args.output.with_suffix(".npy")
+    np.save(npy_path, cells)
+    args.output.with_suffix(".json").write_text(json.dumps(meta, indent=2) + "\n")
+
+    reachable = int(np.count_nonzero(cells["count"]))
+    print(f"Voxels: {cells.size:,} ({' x '.join(map(str, cells.shape))} at {args.voxel * 100:g} cm), "
+          f"{reachable:,} reachable")
+    print(f"Median seed distance to voxel center: "
+          f"{np.median(cells['distance'][cells['count'] > 0]) * 1000:.1f} mm")
+    print(f"Wrote {npy_path} ({npy_path.stat().st_size / 1024:.0f} KB) and {args.output.with_suffix('.json').name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Collision proxies for robot links, used by convert_urdf_to_gltf.py.
+
+Each link gets convex hulls of its visual geometry and an oriented bounding
+box, expressed in the link's own URDF frame (meters, Z-up). That frame is the
+{link} node of <name>_scene.glb, so runtime code attaches a proxy to the same
+transform it already animates. The link's rest-pose transform in the Three.js
+model frame is stored too, for consumers that do not run forward kinematics.
+
+Hull modes:
+- "parts": one hull per visual, i.e. a convex decomposition along the part
+  boundaries of the URDF (every STL is a separately printed or bought part).
+- "link": a single hull around all of a link's visuals.
+
+Exact hulls of the STL parts carry hundreds to thousands of vertices. With a
+sample budget, a hull is rebuilt from that many farthest-apart hull vertices
+and every face plane is pushed out by the worst excursion of the dropped ones,
+so the cheaper hull still contains the whole part, just a little inflated.
+
+Sidecar layout (<name>_collision.bin), little-endian, every section 4-byte aligned:
+
+    header   char[4]  magic "RSCP"
+             uint16   version (FORMAT_VERSION)
+             uint16   flags (bit 0: hulls are per part)
+             uint32   link count
+             uint32   total file length in bytes
+    link     uint16   name length in bytes
+             uint16   hull count
+             uint8[]  UTF-8 name, zero-padded to a multiple of 4
+             float32  rest transform[16], column-major (THREE.Matrix4.fromArray)
+             float32  box center[3]
+             float32  box axes[9], column-major: columns are the box's unit axes
+             float32  box half extents[3]
+    hull     uint32   vertex count V
+             uint32   triangle count T
+             float32  vertices[3V]
+             uint16   triangle indices[3T], counter-clockwise seen from outside,
+                      zero-padded to a multiple of 4 bytes
+
+Links follow in URDF order and each link is followed by its hulls. Links
+without geometry are omitted. Readers must reject an unknown major version.
+"""
+
+import struct
+
+import numpy as np
+import trimesh
+from scipy.spatial import ConvexHull, HalfspaceIntersection
+
+MAGIC = b"RSCP"
+FORMAT_VERSION = 1
+FLAG_PARTS = 1
+
+HULL_MODES = ("parts", "link")
+
+_HEADER = struct.Struct("<4sHHII")
+_LINK = struct.Struct("<HH")
+_HULL = struct.Struct("<II")
+
+
+def farthest_points(points, count):
+    """Indices of `count` points picked greedily to be as far apart as possible"""
+    chosen = [int(np.argmax(np.linalg.norm(points - points.mean(axis=0), axis=1)))]
+    distance = np.linalg.norm(points - points[chosen[0]], axis=1)
+    for _ in range(count - 1):
+        chosen.append(int(np.argmax(distance)))
+        distance = np.minimum(distance, np.linalg.norm(points - points[chosen[-1]], axis=1))
+    return np.array(chosen)
+
+
+def convex_hull(vertices, samples=0):
+    """
+    (vertices, faces, inflation) of a convex hull containing a point set, wound
+    outward. With `samples`, the hull is rebuilt from that many hull vertices and
+    its planes moved out by `inflation` meters so it still contains every point.
+    """
+    points = np.asarray(vertices, dtype=np.float64)
+    points = points[ConvexHull(points).vertices]
+    inflation = 0.0
+    if samples and len(points) > samples:
+        kept = points[farthest_points(points, samples)]
+        # Facet equations are n.x + d <= 0 inside, with unit normals n
+        halfspaces = ConvexHull(kept).equations
+        inflation = max(float((points @ halfspaces[:, :3].T + halfspaces[:, 3]).max()), 0.0)
+        halfspaces[:, 3] -= inflation
+        points = HalfspaceIntersection(halfspaces, kept.mean(axis=0)).intersections
+    hull = trimesh.convex.convex_hull(points)
+    return hull.vertices, hull.faces, inflation
+
+
+def oriented_box(points):
+    """(center, axes, half_extents) of a tight box; axes are unit column vectors."""
+    to_origin, extents = trimesh.bounds.oriented_bounds(np.asarray(points, dtype=np.float64))
+    box_to_points = np.linalg.inv(to_origin)
+    return box_to_points[:3, 3], box_to_points[:3, :3], np.asarray(extents) / 2
+
+
+def _padded(data):
+    return data + b"\x00" * (-len(data) % 4)
+
+
+def encode_proxies(links, parts=True):
+    """
+    Serialize proxies. `links` is a list of dicts with "name", "rest" (4x4),
+    "box" (center, axes, half_extents) and "hulls" [(vertices, faces), ...].
+    """
+    body = []
+    for link in links:
+        name = link["name"].encode()
+        center, axes, half_extents = link["box"]
+        body.append(_LINK.pack(len(name), len(link["hulls"])))
+        body.append(_padded(name))
+        body.append(np.asarray(link["rest"], dtype="<f4").T.tobytes())
+        body.append(np.concatenate([center, np.asarray(axes).T.ravel(), half_extents]).astype("<f4").tobytes())
+        for vertices, faces in link["hulls"]:
+            if len(vertices) > 65536:
+                raise ValueError(f"hull of {link['name']} has {len(vertices)} vertices, more than uint16 indices allow")
+            body.append(_HULL.pack(len(vertices), len(faces)))
+            body.append(np.asarray(vertices, dtype="<f4").tobytes())
+            body.append(_padded(np.asarray(faces, dtype="<u2").tobytes()))
+
+    length = _HEADER.size + sum(len(chunk) for chunk in body)
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, FLAG_PARTS if parts else 0, len(links), length)
+    return header + b"".join(body)
+
+
+def decode_proxies(data):
+    """Inverse of encode_proxies: (links, parts) with float32 arrays."""
+    magic, version, flags, count, length = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("not a collision proxy file")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"unsupported collision proxy version {version}")
+    if length != len(data):
+        raise ValueError(f"truncated collision proxy file ({len(data)} of {length} bytes)")
+
+    def floats(n):
+        nonlocal offset
+        values = np.frombuffer(data, dtype="<f4", count=n, offset=offset)
+        offset += 4 * n
+        return values
+
+    links = []
+    offset = _HEADER.size
+    for _ in range(count):
+        name_length, hull_count = _LINK.unpack_from(data, offset)
+        offset += _LINK.size
+        name = data[offset:offset + name_length].decode()
+        offset += name_length + (-name_length % 4)
+        rest = floats(16).reshape(4, 4).T
+        box = floats(15)
+        hulls = []
+        for _ in range(hull_count):
+            vertex_count, triangle_count = _HULL.unpack_from(data, offset)
+            offset += _HULL.size
+            vertices = floats(3 * vertex_count).reshape(-1, 3)
+            faces = np.frombuffer(data, dtype="<u2", count=3 * triangle_count, offset=offset).reshape(-1, 3)
+            offset += 6 * triangle_count + (-6 * triangle_count % 4)
+            hulls.append((vertices, faces))
+        links.append({
+            "name": name,
+            "rest": rest,
+            "box": (box[:3], box[3:12].reshape(3, 3).T, box[12:]),
+            "hulls": hulls,
+        })
+    return links, bool(flags & FLAG_PARTS)
+
+
+def proxy_error(links, sources, tolerance=1e-5, chunk=4096):
+    """
+    Check decoded proxies against the link-frame source vertices they stand in
+    for: every source vertex must lie inside each link's box and some hull (up
+    to `tolerance` meters, for float32 rounding). Returns the worst excursion.
+    """
+    worst = 0.0
+    for link in links:
+        points = sources[link["name"]]
+        center, axes, half_extents = link["box"]
+        local = np.abs((points - center) @ axes) - half_extents
+        worst = max(worst, float(local.max(initial=0.0)))
+
+        # Distance outside the hull's facet planes, minimized over hulls. Qhull's
+        # merged facets stay well-conditioned where float32 sliver triangles don't.
+        outside = np.full(len(points), np.inf)
+        for vertices, _ in link["hulls"]:
+            equations = ConvexHull(vertices.astype(np.float64)).equations
+            for start in range(0, len(points), chunk):
+                distances = (points[start:start + chunk] @ equations[:, :3].T + equations[:, 3]).max(axis=1)
+                outside[start:start + chunk] = np.minimum(outside[start:start + chunk], distances)
+        worst = max(worst, float(outside.max(initial=0.0)))
+
+    if worst > tolerance:
+        raise RuntimeError(f"collision proxies miss source geometry by {worst * 1000:.4f} mm")
+    return worst
@@ -1,285 +1,998 @@
 #!/usr/bin/env python3
 """
-Convert SO-101 URDF/STL files to a single GLTF/GLB file with bone armature.
+Convert robot URDF/STL files to a single GLTF/GLB file with bone armature.
 This creates a rigged robot model that works perfectly with Three.js and WebGPU.
 
+Links, visuals, joints and materials are read straight from the URDF. Meshes
+are parsed in a process pool and every visual's transform is computed in one
+batched NumPy pass. Results are cached on disk keyed by the URDF and mesh
+hashes: unchanged robots are copied from the cache, and changed robots only
+re-parse the meshes and re-bake the links that actually changed.
+
+Each mesh is also quadric-decimated into levels of detail that stay within a
+maximum geometric error, written as <name>_lod<n>.glb. The hierarchy scene
+stays at full resolution unless --scene-lods adds {link}_LOD<n> groups to it.
+
+With --compress, every single-mesh GLB is also written quantized
+(<stem>_quantize.glb) and/or Draco-compressed (<stem>_draco.glb); see
+gltf_compress.py. Each is decoded back and checked against its source mesh.
+
+Per-link convex hulls and oriented bounding boxes are written to
+<name>_collision.bin for runtime collision checks; collision_proxies.py
+documents the binary layout.
+
 Usage:
-    pip install trimesh numpy scipy
-    python convert_urdf_to_gltf.py
+    pip install trimesh numpy scipy fast-simplification DracoPy
+    python convert_urdf_to_gltf.py                  # all registered robots
+    python convert_urdf_to_gltf.py so101 path/to/other.urdf --jobs 4 --output-dir /tmp/models
+    python convert_urdf_to_gltf.py --no-cache       # force a full rebuild
+    python convert_urdf_to_gltf.py --lod 0.5:0.5,0.2:2  # LOD triangle ratio:max error (mm)
+    python convert_urdf_to_gltf.py --scene-lods     # also put every LOD in <name>_scene.glb
+    python convert_urdf_to_gltf.py --compress draco --compress quantize --position-bits 14
+    python convert_urdf_to_gltf.py --collision link   # one hull per link instead of per part
 """
 
+import argparse
+import filecmp
+import hashlib
+import importlib.util
+import io
+import os
+import shutil
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 import numpy as np
 import trimesh
 from pathlib import Path
+from scipy.spatial import cKDTree
 import json
 
+import collision_proxies
+import gltf_compress
+
 # Paths
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_ROOT = SCRIPT_DIR.parent
+
 MODELS_DIR = PROJECT_ROOT / "public" / "models" / "so101"
-ASSETS_DIR = MODELS_DIR / "assets"
 OUTPUT_DIR = PROJECT_ROOT / "public" / "models"
+CACHE_DIR = PROJECT_ROOT / ".cache" / "urdf_to_gltf"
+
+# URDF parsing and kinematics are shared with the API
+sys.path.insert(0, str(PROJECT_ROOT))
+from api.kinematics import URDF_TO_THREE, KinematicChain, create_transforms  # noqa: E402
+from api.urdf import DEFAULT_COLOR, parse_urdf  # noqa: E402
 
-# Material colors (from URDF)
-COLORS = {
+# Bump to invalidate every cached mesh, link and output after changing how they are built
+CACHE_VERSION = 1
+
+# SO-101 material color overrides (the URDF's 3d_printed yellow is rendered cream in the app)
+SO101_COLORS = {
     "3d_printed": [0.96, 0.94, 0.90, 1.0],  # Cream/off-white #F5F0E6
     "sts3215": [0.1, 0.1, 0.1, 1.0],  # Dark gray/black for servos
 }
 
-# Joint hierarchy from URDF (parent -> child relationships)
-# Each joint has: name, parent_link, child_link, origin_xyz, origin_rpy, axis
-JOINTS = [
-    {
-        "name": "shoulder_pan",
-        "parent": "base_link",
-        "child": "shoulder_link",
-        "origin_xyz": [0.0388353, 0, 0.0624],
-        "origin_rpy": [3.14159, 0, -3.14159],
-        "axis": [0, 0, 1],
-    },
-    {
-        "name": "shoulder_lift",
-        "parent": "shoulder_link",
-        "child": "upper_arm_link",
-        "origin_xyz": [-0.0303992, -0.0182778, -0.0542],
-        "origin_rpy": [-1.5708, -1.5708, 0],
-        "axis": [0, 0, 1],
+# Level-of-detail targets for LOD1, LOD2, ...: (triangle ratio relative to the source mesh,
+# largest allowed deviation from the source in meters, as an approximate Hausdorff distance)
+LOD_LEVELS = ((0.5, 0.001), (0.2, 0.003))
+
+# Quadric decimation aggressiveness, tried in order until a result is within LOD_MAX_ERROR
+LOD_AGGRESSION = (7, 3, 1)
+
+# Robots converted by default; each is written as <name>.glb, <name>.gltf and <name>_scene.glb.
+# "colors" overrides URDF material colors by name and "default_color" colors visuals
+# without one. Other URDFs keep their own materials, with api.urdf's neutral default.
+ROBOTS = {
+    "so101": {
+        "label": "SO-101",
+        "urdf": MODELS_DIR / "so101.urdf",
+        "colors": SO101_COLORS,
+        "default_color": SO101_COLORS["3d_printed"],
     },
-    {
-        "name": "elbow_flex",
-        "parent": "upper_arm_link",
-        "child": "lower_arm_link",
-        "origin_xyz": [-0.11257, -0.028, 0],
-        "origin_rpy": [0, 0, 1.5708],
-        "axis": [0, 0, 1],
-    },
-    {
-        "name": "wrist_flex",
-        "parent": "lower_arm_link",
-        "child": "wrist_link",
-        "origin_xyz": [-0.1349, 0.0052, 0],
-        "origin_rpy": [0, 0, -1.5708],
-        "axis": [0, 0, 1],
-    },
-    {
-        "name": "wrist_roll",
-        "parent": "wrist_link",
-        "child": "gripper_link",
-        "origin_xyz": [0, -0.0611, 0.0181],
-        "origin_rpy": [1.5708, 0.0486795, 3.14159],
-        "axis": [0, 0, 1],
-    },
-    {
-        "name": "gripper",
-        "parent": "gripper_link",
-        "child": "moving_jaw_link",
-        "origin_xyz": [0.0202, 0.0188, -0.0234],
-        "origin_rpy": [1.5708, 0, 0],
-        "axis": [0, 0, 1],
-    },
-]
-
-# Link mesh definitions from URDF
-LINKS = {
-    "base_link": [
-        {"file": "base_motor_holder_so101_v1.stl", "xyz": [-0.00636471, 0, -0.0024], "rpy": [1.5708, 0, 1.5708], "material": "3d_printed"},
-        {"file": "base_so101_v2.stl", "xyz": [-0.00636471, 0, -0.0024], "rpy": [1.5708, 0, 1.5708], "material": "3d_printed"},
-        {"file": "sts3215_03a_v1.stl", "xyz": [0.0263353, 0, 0.0437], "rpy": [0, 0, 0], "material": "sts3215"},
-    ],
-    "shoulder_link": [
-        {"file": "sts3215_03a_v1.stl", "xyz": [-0.0303992, 0.000422241, -0.0417], "rpy": [1.5708, 1.5708, 0], "material": "sts3215"},
-        {"file": "motor_holder_so101_base_v1.stl", "xyz": [-0.0675992, -0.000177759, 0.0158499], "rpy": [1.5708, -1.5708, 0], "material": "3d_printed"},
-        {"file": "rotation_pitch_so101_v1.stl", "xyz": [0.0122008, 0, 0.0464], "rpy": [-1.5708, 0, 0], "material": "3d_printed"},
-    ],
-    "upper_arm_link": [
-        {"file": "sts3215_03a_v1.stl", "xyz": [-0.11257, -0.0155, 0.0187], "rpy": [-3.14159, 0, -1.5708], "material": "sts3215"},
-        {"file": "upper_arm_so101_v1.stl", "xyz": [-0.065085, 0.012, 0.0182], "rpy": [3.14159, 0, 0], "material": "3d_printed"},
-    ],
-    "lower_arm_link": [
-        {"file": "under_arm_so101_v1.stl", "xyz": [-0.0648499, -0.032, 0.0182], "rpy": [3.14159, 0, 0], "material": "3d_printed"},
-        {"file": "motor_holder_so101_wrist_v1.stl", "xyz": [-0.0648499, -0.032, 0.018], "rpy": [-3.14159, 0, 0], "material": "3d_printed"},
-        {"file": "sts3215_03a_v1.stl", "xyz": [-0.1224, 0.0052, 0.0187], "rpy": [-3.14159, 0, -3.14159], "material": "sts3215"},
-    ],
-    "wrist_link": [
-        {"file": "sts3215_03a_no_horn_v1.stl", "xyz": [0, -0.0424, 0.0306], "rpy": [1.5708, 1.5708, 0], "material": "sts3215"},
-        {"file": "wrist_roll_pitch_so101_v2.stl", "xyz": [0, -0.028, 0.0181], "rpy": [-1.5708, -1.5708, 0], "material": "3d_printed"},
-    ],
-    "gripper_link": [
-        {"file": "sts3215_03a_v1.stl", "xyz": [0.0077, 0.0001, -0.0234], "rpy": [-1.5708, 0, 0], "material": "sts3215"},
-        {"file": "wrist_roll_follower_so101_v1.stl", "xyz": [0, 0, 0.000949706], "rpy": [-3.14159, 0, 0], "material": "3d_printed"},
-    ],
-    "moving_jaw_link": [
-        {"file": "moving_jaw_so101_v1.stl", "xyz": [0, 0, 0.0189], "rpy": [0, 0, 0], "material": "3d_printed"},
-    ],
 }
 
 
-def euler_to_matrix(rpy):
-    """Convert roll-pitch-yaw to rotation matrix."""
-    roll, pitch, yaw = rpy
-
-    # Rotation matrices
-    Rx = np.array([
-        [1, 0, 0],
-        [0, np.cos(roll), -np.sin(roll)],
-        [0, np.sin(roll), np.cos(roll)]
-    ])
-    Ry = np.array([
-        [np.cos(pitch), 0, np.sin(pitch)],
-        [0, 1, 0],
-        [-np.sin(pitch), 0, np.cos(pitch)]
-    ])
-    Rz = np.array([
-        [np.cos(yaw), -np.sin(yaw), 0],
-        [np.sin(yaw), np.cos(yaw), 0],
-        [0, 0, 1]
-    ])
-
-    return Rz @ Ry @ Rx
-
-
-def create_transform(xyz, rpy):
-    """Create 4x4 transformation matrix from xyz and rpy."""
-    matrix = np.eye(4)
-    matrix[:3, :3] = euler_to_matrix(rpy)
-    matrix[:3, 3] = xyz
-    return matrix
-
-
-def load_and_transform_mesh(mesh_def, link_transform):
-    """Load STL and apply transforms."""
-    stl_path = ASSETS_DIR / mesh_def["file"]
-    if not stl_path.exists():
-        print(f"  Warning: {stl_path} not found")
+# ============================================================================
+# Transforms
+# ============================================================================
+
+def compute_link_transforms(robot):
+    """Base-frame transform of every link at the zero pose (all joints at 0)."""
+    chain = KinematicChain(robot)
+    poses = chain.link_poses(np.zeros((1, len(chain.joint_names))))
+    return {link: pose[0] for link, pose in poses.items()}
+
+
+def visual_transforms(robot, link_transforms):
+    """
+    Flatten the robot's visuals and compute all their transforms in one batch.
+    Returns (visuals, local, world): visuals is a list of (link_name, index, visual),
+    local is (N, 4, 4) visual origins (including mesh scale) and world is
+    (N, 4, 4) transforms into the Y-up Three.js frame.
+    """
+    visuals = [
+        (link_name, i, visual)
+        for link_name, link_visuals in robot["links"].items()
+        for i, visual in enumerate(link_visuals)
+    ]
+    if not visuals:
+        return visuals, np.zeros((0, 4, 4)), np.zeros((0, 4, 4))
+
+    local = create_transforms(
+        [visual["xyz"] for _, _, visual in visuals],
+        [visual["rpy"] for _, _, visual in visuals],
+    )
+    scales = np.array([visual["geometry"].get("scale", [1, 1, 1]) for _, _, visual in visuals])
+    local[:, :3, :3] *= scales[:, None, :]
+
+    parents = np.stack([link_transforms.get(link_name, np.eye(4)) for link_name, _, _ in visuals])
+    return visuals, local, URDF_TO_THREE @ parents @ local
+
+
+# ============================================================================
+# Mesh loading
+# ============================================================================
+
+# sha256 of source files keyed by path, reused while size and mtime are unchanged
+_file_hashes = {}
+
+
+def file_digest(path):
+    """Content hash of a file, re-read only when its size or mtime changes."""
+    stat = path.stat()
+    key = str(path.resolve())
+    entry = _file_hashes.get(key)
+    if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+        return entry[2]
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    _file_hashes[key] = [stat.st_size, stat.st_mtime_ns, digest]
+    return digest
+
+
+class ConversionCache:
+    """
+    On-disk cache under one directory:
+    - hashes.json: file hashes by path (with size/mtime to skip re-hashing)
+    - meshes/<sha>.npz: parsed mesh arrays by source file hash
+    - links/<key>.npz: a link's visuals baked into the combined-mesh frame
+    - robots/<key>/: finished output files for a robot
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        for sub in ("meshes", "links", "robots"):
+            (self.root / sub).mkdir(parents=True, exist_ok=True)
+        hashes_path = self.root / "hashes.json"
+        if hashes_path.exists():
+            _file_hashes.update(json.loads(hashes_path.read_text()))
+
+    def save_hashes(self):
+        self._write(self.root / "hashes.json", json.dumps(_file_hashes).encode())
+
+    def load_arrays(self, kind, key):
+        path = self.root / kind / f"{key}.npz"
+        if not path.exists():
+            return None
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+
+    def store_arrays(self, kind, key, **arrays):
+        buffer = io.BytesIO()
+        np.savez(buffer, **arrays)
+        self._write(self.root / kind / f"{key}.npz", buffer.getvalue())
+
+    def load_outputs(self, key):
+        """Cached output file paths for a robot key, or None if not cached"""
+        manifest = self.root / "robots" / key / "manifest.json"
+        if not manifest.exists():
+            return None
+        return [manifest.parent / name for name in json.loads(manifest.read_text())]
+
+    def store_outputs(self, key, files):
+        folder = self.root / "robots" / key
+        folder.mkdir(exist_ok=True)
+        for name, data in files.items():
+            self._write(folder / name, data)
+        # Written last so a partially stored entry is never used
+        self._write(folder / "manifest.json", json.dumps(sorted(files)).encode())
+
+    @staticmethod
+    def _write(path, data):
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+
+def cache_key(*parts):
+    """Stable hash of JSON-serializable parts (paths are stringified)"""
+    return hashlib.sha256(json.dumps([CACHE_VERSION, *parts], sort_keys=True, default=str).encode()).hexdigest()
+
+
+# Parsed meshes keyed by (path, content hash) so each file is parsed once per run
+_mesh_cache = {}
+
+
+def _parse_mesh(data, file_type):
+    """Parse mesh bytes into processed (vertices, faces) arrays. Runs in pool workers."""
+    mesh = trimesh.load(io.BytesIO(data), file_type=file_type, force="mesh")
+    return mesh.vertices, mesh.faces
+
+
+def _mesh_key(path):
+    return (path.resolve(), file_digest(path))
+
+
+def preload_meshes(mesh_paths, executor=None, cache=None):
+    """
+    Make every mesh available to load_mesh: from memory, the disk cache, or by
+    parsing the files that are new or changed (in parallel when given an executor).
+    """
+    pending = {}
+    for path in mesh_paths:
+        if not path.exists():
+            continue
+        key = _mesh_key(path)
+        if key in _mesh_cache:
+            continue
+        arrays = cache.load_arrays("meshes", key[1]) if cache else None
+        if arrays is not None:
+            _mesh_cache[key] = trimesh.Trimesh(vertices=arrays["vertices"], faces=arrays["faces"], process=False)
+        else:
+            pending[key] = path
+
+    jobs = [(path.read_bytes(), path.suffix.lstrip(".").lower()) for path in pending.values()]
+    if executor is None or len(jobs) < 2:
+        results = [_parse_mesh(*job) for job in jobs]
+    else:
+        results = executor.map(_parse_mesh, *zip(*jobs))
+
+    for key, (vertices, faces) in zip(pending, results):
+        # Workers already merged and cleaned the mesh; don't redo it here
+        _mesh_cache[key] = trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+        if cache:
+            cache.store_arrays("meshes", key[1], vertices=vertices, faces=faces)
+
+    return len(pending)
+
+
+def load_mesh(path):
+    """Load a mesh file through the parse-once cache. Returns the shared (unmodified) mesh."""
+    key = _mesh_key(path)
+
+    if key not in _mesh_cache:
+        vertices, faces = _parse_mesh(path.read_bytes(), path.suffix.lstrip(".").lower())
+        _mesh_cache[key] = trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+
+    return _mesh_cache[key]
+
+
+# ============================================================================
+# Levels of detail
+# ============================================================================
+
+# Simplified meshes keyed by (path, content hash): [LOD1, LOD2, ...] for this run's LOD settings.
+# A level that could not improve on the one before it is the same object as that level.
+_lod_meshes = {}
+
+# Approximate Hausdorff error of each entry in _lod_meshes
+_lod_errors = {}
+
+
+def max_surface_distance(points, mesh, samples=20000, k=4, chunk=1024):
+    """
+    Approximate largest distance from the points to a mesh surface.
+
+    A cKDTree over surface samples gives each point an upper bound (distance to the
+    nearest sample) and candidate faces; exact point-triangle distances are then taken
+    in decreasing bound order, stopping once no remaining bound can raise the maximum.
+    """
+    sample_points, sample_faces = trimesh.sample.sample_surface(mesh, samples, seed=0)
+    sample_points = np.vstack([sample_points, mesh.triangles_center])
+    sample_faces = np.concatenate([sample_faces, np.arange(len(mesh.faces))])
+
+    bounds, nearest = cKDTree(sample_points).query(points, k=k)
+    order = np.argsort(-bounds[:, 0])
+
+    result = 0.0
+    for start in range(0, len(order), chunk):
+        rows = order[start:start + chunk]
+        if bounds[rows[0], 0] <= result:
+            break
+        queries = np.repeat(points[rows], k, axis=0)
+        closest = trimesh.triangles.closest_point(mesh.triangles[sample_faces[nearest[rows]].ravel()], queries)
+        distances = np.linalg.norm(closest - queries, axis=1).reshape(-1, k).min(axis=1)
+        result = max(result, distances.max())
+    return result
+
+
+def hausdorff_distance(a, b, samples=5000):
+    """Symmetric Hausdorff distance between two meshes, measured at vertices plus surface samples."""
+    points_a = np.vstack([a.vertices, trimesh.sample.sample_surface(a, samples, seed=1)[0]])
+    points_b = np.vstack([b.vertices, trimesh.sample.sample_surface(b, samples, seed=1)[0]])
+    return max(max_surface_distance(points_a, b), max_surface_distance(points_b, a))
+
+
+def _build_lods(vertices, faces, targets):
+    """
+    Quadric-decimate a mesh to each (triangle ratio, max error) target. Runs in pool workers.
+    Each level backs off to gentler decimation until it is within its max error of the
+    source; if it can't beat the previous level that way, the previous level is reused.
+    Returns [(vertices, faces, error), ...] per level.
+    """
+    source = trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+    levels = []
+    previous = (vertices, faces, 0.0)
+    for ratio, max_error in targets:
+        face_count = max(4, int(len(faces) * ratio))
+        for aggression in LOD_AGGRESSION:
+            simplified = source.simplify_quadric_decimation(face_count=face_count, aggression=aggression)
+            # Weld vertices the decimation left duplicated and drop unused ones
+            simplified.merge_vertices()
+            simplified.remove_unreferenced_vertices()
+            if len(simplified.faces) >= len(previous[1]):
+                continue
+            error = hausdorff_distance(source, simplified)
+            if error <= max_error:
+                previous = (simplified.vertices, simplified.faces, error)
+                break
+        levels.append(previous)
+    return levels
+
+
+def generate_lods(mesh_paths, lod, executor=None, cache=None):
+    """Simplify every loaded mesh to the (ratio, max error) levels in `lod`, reusing cached ones. Returns the number built."""
+    settings = cache_key(lod)[:16]
+    pending = []
+    for path in mesh_paths:
+        if not path.exists():
+            continue
+        key = _mesh_key(path)
+        if key in _lod_meshes:
+            continue
+        arrays = cache.load_arrays("meshes", f"{key[1]}_lod_{settings}") if cache else None
+        if arrays is not None:
+            _store_lods(key, [
+                (arrays[f"vertices_{n}"], arrays[f"faces_{n}"], float(arrays[f"error_{n}"]))
+                for n in range(1, len(lod) + 1)
+            ])
+        else:
+            pending.append(key)
+
+    jobs = [(_mesh_cache[key].vertices, _mesh_cache[key].faces, lod) for key in pending]
+    if executor is None or len(jobs) < 2:
+        results = [_build_lods(*job) for job in jobs]
+    else:
+        results = executor.map(_build_lods, *zip(*jobs))
+
+    for key, levels in zip(pending, results):
+        _store_lods(key, levels)
+        if cache:
+            arrays = {}
+            for n, (vertices, faces, error) in enumerate(levels, start=1):
+                arrays.update({f"vertices_{n}": vertices, f"faces_{n}": faces, f"error_{n}": np.float64(error)})
+            cache.store_arrays("meshes", f"{key[1]}_lod_{settings}", **arrays)
+
+    return len(pending)
+
+
+def _store_lods(key, levels):
+    meshes = [_mesh_cache[key]]
+    for vertices, faces, _ in levels:
+        previous = meshes[-1]
+        if len(faces) == len(previous.faces) and np.array_equal(faces, previous.faces) \
+                and np.array_equal(vertices, previous.vertices):
+            meshes.append(previous)
+        else:
+            meshes.append(trimesh.Trimesh(vertices=vertices, faces=faces, process=False))
+    _lod_meshes[key] = meshes[1:]
+    _lod_errors[key] = [float(error) for _, _, error in levels]
+
+
+def lod_source_level(visual, level):
+    """Lowest level whose mesh is the same as this level's, so the scene stores it once."""
+    geometry = visual["geometry"]
+    if geometry["type"] != "mesh" or not geometry["file"].exists():
+        return 0
+    key = _mesh_key(geometry["file"])
+    meshes = [_mesh_cache[key]] + _lod_meshes[key]
+    while level and meshes[level] is meshes[level - 1]:
+        level -= 1
+    return level
+
+
+def visual_mesh(visual, level=0):
+    """Shared untransformed mesh for a visual's geometry at a LOD level, or None if its file is missing."""
+    geometry = visual["geometry"]
+    if geometry["type"] == "mesh":
+        if not geometry["file"].exists():
+            print(f"  Warning: {geometry['file']} not found")
+            return None
+        if level:
+            return _lod_meshes[_mesh_key(geometry["file"])][level - 1]
+        return load_mesh(geometry["file"])
+    # Primitives are already cheap; every level uses the same shape
+    if geometry["type"] == "box":
+        return trimesh.creation.box(extents=geometry["size"])
+    if geometry["type"] == "cylinder":
+        return trimesh.creation.cylinder(radius=geometry["radius"], height=geometry["length"])
+    return trimesh.creation.icosphere(radius=geometry["radius"])
+
+
+def geometry_name(visual, level=0):
+    """Scene geometry name; visuals with the same geometry and material share one glTF mesh."""
+    geometry = visual["geometry"]
+    if geometry["type"] == "mesh":
+        name = f"{geometry['file'].stem}_{visual['material']}"
+    else:
+        params = cache_key({k: v for k, v in geometry.items() if k != "type"})[:8]
+        name = f"{geometry['type']}_{params}_{visual['material']}"
+    return f"{name}_LOD{level}" if level else name
+
+
+def geometry_identity(geometry):
+    """Cache-key form of a geometry: mesh files are identified by content, not path."""
+    if geometry["type"] == "mesh":
+        if not geometry["file"].exists():
+            return {**geometry, "file": None}
+        return {**geometry, "file": file_digest(geometry["file"])}
+    return geometry
+
+
+def colored_mesh(visual, level=0):
+    """Copy of a visual's mesh with its material color applied, or None if missing."""
+    mesh = visual_mesh(visual, level)
+    if mesh is None:
         return None
 
-    mesh = trimesh.load(stl_path)
-
-    # Apply mesh-local transform (from URDF visual origin)
-    local_transform = create_transform(mesh_def["xyz"], mesh_def["rpy"])
-    mesh.apply_transform(local_transform)
-
-    # Apply link transform (accumulated from joints)
-    mesh.apply_transform(link_transform)
+    mesh = mesh.copy()
 
     # Set material color
-    color = COLORS.get(mesh_def["material"], COLORS["3d_printed"])
-    mesh.visual.face_colors = [int(c * 255) for c in color]
+    mesh.visual.face_colors = [int(c * 255) for c in visual["color"]]
 
     return mesh
 
 
-def build_robot():
-    """Build the complete robot mesh hierarchy."""
-    print("Building SO-101 robot model...")
-
-    # Track accumulated transforms for each link
-    link_transforms = {"base_link": np.eye(4)}
-
-    # Calculate transforms for each link based on joint chain
-    for joint in JOINTS:
-        parent_transform = link_transforms[joint["parent"]]
-        joint_transform = create_transform(joint["origin_xyz"], joint["origin_rpy"])
-        link_transforms[joint["child"]] = parent_transform @ joint_transform
-
-    # Load all meshes
-    all_meshes = []
-
-    for link_name, mesh_defs in LINKS.items():
+# ============================================================================
+# Conversion
+# ============================================================================
+
+class StageTimer:
+    """Accumulates wall-clock seconds per conversion stage."""
+
+    STAGES = ("load", "simplify", "transform", "concatenate", "collision", "export")
+
+    def __init__(self):
+        self.seconds = dict.fromkeys(self.STAGES, 0.0)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - start
+
+
+def stack_parts(parts):
+    """Concatenate {"vertices", "faces", "face_colors"} parts, offsetting face indices."""
+    if not parts:
+        return {
+            "vertices": np.zeros((0, 3)),
+            "faces": np.zeros((0, 3), dtype=np.int64),
+            "face_colors": np.zeros((0, 4), dtype=np.uint8),
+        }
+    offsets = np.cumsum([0] + [len(part["vertices"]) for part in parts[:-1]])
+    return {
+        "vertices": np.concatenate([part["vertices"] for part in parts]),
+        "faces": np.concatenate([part["faces"] + offset for part, offset in zip(parts, offsets)]),
+        "face_colors": np.concatenate([part["face_colors"] for part in parts]),
+    }
+
+
+def build_robot(robot, link_transforms, timer, cache=None, level=0, lod=None):
+    """Build the complete robot as a single combined mesh at a LOD level, reusing cached links."""
+    print(f"Building {robot['label']} robot model" + (f" (LOD{level})..." if level else "..."))
+
+    with timer.stage("transform"):
+        visuals, _, world = visual_transforms(robot, link_transforms)
+
+    by_link = {}
+    for (link_name, _, visual), transform in zip(visuals, world):
+        by_link.setdefault(link_name, []).append((visual, transform))
+
+    parts = []
+    rebuilt = []
+    for link_name, link_visuals in by_link.items():
+        key = cache_key(
+            level,
+            lod if level else None,
+            [(geometry_identity(visual["geometry"]), visual["color"], transform.tolist())
+             for visual, transform in link_visuals],
+        )
+        with timer.stage("load"):
+            part = cache.load_arrays("links", key) if cache else None
+        if part is not None:
+            parts.append(part)
+            continue
+
+        rebuilt.append(link_name)
         print(f"Processing {link_name}...")
-        link_transform = link_transforms.get(link_name, np.eye(4))
-
-        for mesh_def in mesh_defs:
-            mesh = load_and_transform_mesh(mesh_def, link_transform)
-            if mesh:
-                all_meshes.append(mesh)
-                print(f"  Loaded {mesh_def['file']}")
+        with timer.stage("load"):
+            sources = []
+            for visual, transform in link_visuals:
+                mesh = visual_mesh(visual, level)
+                if mesh is not None:
+                    sources.append((mesh, transform, visual))
+
+        # One matrix multiply per visual: rotate, then translate, all vertices at once
+        with timer.stage("transform"):
+            link_parts = [
+                {
+                    "vertices": mesh.vertices @ transform[:3, :3].T + transform[:3, 3],
+                    "faces": mesh.faces,
+                    "face_colors": np.tile(
+                        np.array([int(c * 255) for c in visual["color"]], dtype=np.uint8), (len(mesh.faces), 1)
+                    ),
+                }
+                for mesh, transform, visual in sources
+            ]
+
+        with timer.stage("concatenate"):
+            part = stack_parts(link_parts)
+        if cache:
+            cache.store_arrays("links", key, **part)
+        parts.append(part)
+
+    print(f"\nCombining {len(parts)} links ({len(rebuilt)} rebuilt, {len(parts) - len(rebuilt)} cached)...")
+    with timer.stage("concatenate"):
+        combined = trimesh.Trimesh(**stack_parts(parts), process=False)
 
-    # Combine all meshes
-    print(f"\nCombining {len(all_meshes)} meshes...")
-    combined = trimesh.util.concatenate(all_meshes)
+    return combined
 
-    # Apply URDF Z-up to Y-up rotation
-    rotation_x = trimesh.transformations.rotation_matrix(-np.pi/2, [1, 0, 0])
-    combined.apply_transform(rotation_x)
 
-    return combined
+def export_scene_with_hierarchy(robot, link_transforms, timer, levels=0):
+    """
+    Export as a GLTF scene with proper node hierarchy for animation.
 
+    Each link is a node carrying its joint-chain transform, with one child
+    node per visual. Visuals that share a mesh and material (e.g. the five
+    STS3215 servos) reference a single glTF mesh instead of baked copies.
 
-def export_scene_with_hierarchy():
-    """Export as a GLTF scene with proper node hierarchy for animation."""
+    With LOD levels (opt-in, see --scene-lods), each link instead gets one
+    group node per level named {link}_LOD{n} (n = 0 is full resolution)
+    holding that level's visuals. All groups are visible as exported, so the
+    viewer must show one per link itself, e.g. by wrapping them in a THREE.LOD.
+    """
     print("\nCreating GLTF scene with hierarchy...")
 
     # Create scene
     scene = trimesh.Scene()
 
-    # Track accumulated transforms
-    link_transforms = {"base_link": np.eye(4)}
+    with timer.stage("transform"):
+        visuals, local, _ = visual_transforms(robot, link_transforms)
 
-    # Calculate transforms
-    for joint in JOINTS:
-        parent_transform = link_transforms[joint["parent"]]
-        joint_transform = create_transform(joint["origin_xyz"], joint["origin_rpy"])
-        link_transforms[joint["child"]] = parent_transform @ joint_transform
-
-    # URDF Z-up to Y-up rotation
-    urdf_to_three = trimesh.transformations.rotation_matrix(-np.pi/2, [1, 0, 0])
+    with timer.stage("load"):
+        for link_name in robot["links"]:
+            # Apply link transform and URDF rotation
+            full_transform = URDF_TO_THREE @ link_transforms.get(link_name, np.eye(4))
+            scene.graph.update(frame_from=scene.graph.base_frame, frame_to=link_name, matrix=full_transform)
+
+            if levels and robot["links"][link_name]:
+                for level in range(levels + 1):
+                    scene.graph.update(frame_from=link_name, frame_to=f"{link_name}_LOD{level}", matrix=np.eye(4))
+
+        for (link_name, i, visual), local_transform in zip(visuals, local):
+            for level in range(levels + 1):
+                geom_level = lod_source_level(visual, level) if level else 0
+                geom_name = geometry_name(visual, geom_level)
+                if geom_name not in scene.geometry:
+                    mesh = colored_mesh(visual, geom_level)
+                    if mesh is None:
+                        continue
+                    scene.geometry[geom_name] = mesh
+
+                # Visual origin as a child node referencing the shared mesh
+                parent = f"{link_name}_LOD{level}" if levels else link_name
+                scene.graph.update(
+                    frame_from=parent,
+                    frame_to=f"{parent}_visual_{i}",
+                    matrix=local_transform,
+                    geometry=geom_name,
+                )
+
+    instanced = len(visuals) * (levels + 1) - len(scene.geometry)
+    print(f"Scene uses {len(scene.geometry)} unique meshes ({instanced} instanced visuals)")
 
-    # Add each link as a separate node
-    for link_name, mesh_defs in LINKS.items():
-        print(f"Adding {link_name} to scene...")
-        link_transform = link_transforms.get(link_name, np.eye(4))
+    return scene
 
-        link_meshes = []
-        for mesh_def in mesh_defs:
-            mesh = load_and_transform_mesh(mesh_def, np.eye(4))  # No link transform yet
-            if mesh:
-                link_meshes.append(mesh)
 
-        if link_meshes:
-            combined_link = trimesh.util.concatenate(link_meshes)
-            # Apply link transform and URDF rotation
-            full_transform = urdf_to_three @ link_transform
-            scene.add_geometry(combined_link, node_name=link_name, transform=full_transform)
+def mesh_hull(visual, mesh, samples, cache=None):
+    """Convex hull (vertices, faces, inflation) of a visual's untransformed mesh, cached by mesh content."""
+    geometry = visual["geometry"]
+    key = f"{file_digest(geometry['file'])}_hull_{samples}" if geometry["type"] == "mesh" else None
+    arrays = cache.load_arrays("meshes", key) if cache and key else None
+    if arrays is not None:
+        return arrays["vertices"], arrays["faces"], float(arrays["inflation"])
+
+    vertices, faces, inflation = collision_proxies.convex_hull(mesh.vertices, samples)
+    if cache and key:
+        cache.store_arrays("meshes", key, vertices=vertices, faces=faces, inflation=inflation)
+    return vertices, faces, inflation
+
+
+def build_collision_proxies(robot, link_transforms, timer, cache=None, collision=None):
+    """
+    Convex hulls and an oriented box per link, in the link's URDF frame.
+    Returns (encoded sidecar bytes, per-link report rows).
+    """
+    mode, samples = collision["mode"], collision["samples"]
+    print(f"\nComputing collision proxies ({mode}, {samples or 'exact'} hull samples)...")
+
+    with timer.stage("transform"):
+        visuals, local, _ = visual_transforms(robot, link_transforms)
+
+    with timer.stage("collision"):
+        by_link = {}
+        for (link_name, _, visual), transform in zip(visuals, local):
+            mesh = visual_mesh(visual)
+            if mesh is None:
+                continue
+            # The hull of a transformed mesh is the transformed hull; mirroring scales flip the winding
+            vertices, faces, inflation = mesh_hull(visual, mesh, samples, cache)
+            if np.linalg.det(transform[:3, :3]) < 0:
+                faces = faces[:, ::-1]
+            # Inflation is in mesh units; the largest scale bounds it in meters
+            inflation *= np.linalg.norm(transform[:3, :3], 2)
+            source = mesh.vertices @ transform[:3, :3].T + transform[:3, 3]
+            by_link.setdefault(link_name, []).append(
+                (vertices @ transform[:3, :3].T + transform[:3, 3], faces, inflation, source)
+            )
+
+        links = []
+        sources = {}
+        inflations = {}
+        for link_name, parts in by_link.items():
+            sources[link_name] = np.concatenate([source for _, _, _, source in parts])
+            inflations[link_name] = max(inflation for _, _, inflation, _ in parts)
+            hulls = [(vertices, faces) for vertices, faces, _, _ in parts]
+            if mode == "link" and len(hulls) > 1:
+                # Hull of the (already conservative) part hulls, so no extra inflation
+                hulls = [collision_proxies.convex_hull(np.concatenate([vertices for vertices, _ in hulls]))[:2]]
+            links.append({
+                "name": link_name,
+                "rest": URDF_TO_THREE @ link_transforms.get(link_name, np.eye(4)),
+                "box": collision_proxies.oriented_box(sources[link_name]),
+                "hulls": hulls,
+            })
+
+        data = collision_proxies.encode_proxies(links, parts=mode == "parts")
+        # Verify what runtime code will read, not the float64 arrays it came from
+        decoded, _ = collision_proxies.decode_proxies(data)
+        collision_proxies.proxy_error(decoded, sources)
+
+    rows = [
+        (
+            link["name"], len(link["hulls"]), sum(len(vertices) for vertices, _ in link["hulls"]),
+            inflations[link["name"]], link["box"][2] * 2,
+        )
+        for link in links
+    ]
+    return data, rows
+
+
+def print_collision_report(rows, size):
+    """Print hull and box sizes per link."""
+    print(f"\nCollision proxies ({size / 1024:.1f} KB):")
+    print(f"  {'link':<28}{'hulls':>7}{'vertices':>10}{'inflation (mm)':>16}  box (mm)")
+    for link_name, hulls, vertices, inflation, extents in rows:
+        box = " x ".join(f"{extent * 1000:.1f}" for extent in extents)
+        print(f"  {link_name:<28}{hulls:>7}{vertices:>10}{inflation * 1000:>16.2f}  {box}")
+
+
+def gltf_files(mesh, name):
+    """Export as .gltf with buffers named after the robot, so several robots can share a directory."""
+    files = mesh.export(file_type="gltf")
+    model = json.loads(files.pop("model.gltf"))
+    renamed = {}
+    for buffer in model.get("buffers", []):
+        uri = f"{name}_{buffer['uri']}"
+        renamed[uri] = files[buffer["uri"]]
+        buffer["uri"] = uri
+    renamed[f"{name}.gltf"] = json.dumps(model, separators=(",", ":")).encode()
+    return renamed
+
+
+def write_outputs(paths, output_dir):
+    """Copy files into output_dir, leaving identical files untouched."""
+    written = []
+    for path in paths:
+        target = output_dir / path.name
+        if not (target.exists() and filecmp.cmp(path, target, shallow=True)):
+            shutil.copy2(path, target)
+        written.append(target)
+    return written
+
+
+def print_lod_report(rows):
+    """Print triangle count, max error and combined GLB size per LOD level."""
+    print("\nLevels of detail:")
+    print(f"  {'level':<8}{'triangles':>12}{'max error (mm)':>17}{'GLB size (KB)':>16}")
+    for level, triangles, error, size in rows:
+        print(f"  LOD{level:<5}{triangles:>12}{error * 1000:>17.3f}{size / 1024:>16.1f}")
+
+
+def print_compression_report(rows):
+    """Print size and verified geometric error of each compressed GLB."""
+    print("\nCompressed exports:")
+    print(f"  {'file':<28}{'size (KB)':>11}{'vs plain':>10}{'max error (mm)':>16}{'bound (mm)':>12}")
+    for file_name, size, plain_size, error, bound in rows:
+        print(f"  {file_name:<28}{size / 1024:>11.1f}{size / plain_size:>10.1%}{error * 1000:>16.4f}{bound * 1000:>12.4f}")
+
+
+def convert_robot(name, robot, output_dir, executor, cache=None, lod=None, compress=None, collision=None,
+                  scene_lods=False):
+    """Convert one robot definition, returning its output paths and stage timings."""
+    print("\n" + "-" * 60)
+    print(f"{robot['label']} ({name}: {robot['urdf']})")
+    print("-" * 60)
+    timer = StageTimer()
+
+    with timer.stage("load"):
+        mesh_paths = sorted({
+            visual["geometry"]["file"]
+            for visuals in robot["links"].values()
+            for visual in visuals
+            if visual["geometry"]["type"] == "mesh"
+        })
+        robot_key = cache_key(
+            name,
+            file_digest(robot["urdf"]),
+            robot["links"],
+            robot["joints"],
+            [file_digest(path) if path.exists() else None for path in mesh_paths],
+            lod,
+            compress,
+            collision,
+            scene_lods,
+        )
+        cached = cache.load_outputs(robot_key) if cache else None
+
+    if cached is not None:
+        with timer.stage("export"):
+            outputs = write_outputs(cached, output_dir)
+        print("Unchanged since last conversion, reused cached outputs")
+        return outputs, timer
+
+    with timer.stage("load"):
+        parsed = preload_meshes(mesh_paths, executor, cache)
+        print(f"Parsed {parsed} of {len(mesh_paths)} mesh files ({len(mesh_paths) - parsed} cached)")
+
+    levels = len(lod) if lod else 0
+    if levels:
+        with timer.stage("simplify"):
+            simplified = generate_lods(mesh_paths, lod, executor, cache)
+            print(f"Simplified {simplified} mesh files to {levels} levels ({len(mesh_paths) - simplified} cached)")
+
+    with timer.stage("transform"):
+        link_transforms = compute_link_transforms(robot)
+
+    # Option 1: Single combined mesh (simplest, works great), plus one per LOD level
+    robot_meshes = [build_robot(robot, link_transforms, timer, cache, level, lod) for level in range(levels + 1)]
+    robot_mesh = robot_meshes[0]
 
-    return scene
+    # Option 2: Scene with hierarchy (for future animation support)
+    scene = export_scene_with_hierarchy(robot, link_transforms, timer, levels if scene_lods else 0)
+
+    if collision:
+        collision_data, collision_rows = build_collision_proxies(robot, link_transforms, timer, cache, collision)
+
+    with timer.stage("export"):
+        files = {
+            # Binary GLTF - smaller, faster
+            f"{name}.glb": robot_mesh.export(file_type="glb"),
+            # Text GLTF for debugging
+            **gltf_files(robot_mesh, name),
+            f"{name}_scene.glb": scene.export(file_type="glb"),
+        }
+        for level, mesh in enumerate(robot_meshes[1:], start=1):
+            files[f"{name}_lod{level}.glb"] = mesh.export(file_type="glb")
+        if collision:
+            files[f"{name}_collision.bin"] = collision_data
+
+        # Compressed variants of every single-mesh GLB, verified against the uncompressed mesh
+        compression_rows = []
+        for level, mesh in enumerate(robot_meshes if compress else []):
+            stem = f"{name}_lod{level}" if level else name
+            for encoding in compress["encodings"]:
+                glb, error, bound = gltf_compress.export_compressed_glb(
+                    mesh, encoding, compress["position_bits"], compress["normal_bits"],
+                )
+                files[f"{stem}_{encoding}.glb"] = glb
+                compression_rows.append((f"{stem}_{encoding}.glb", len(glb), len(files[f"{stem}.glb"]), error, bound))
+        outputs = []
+        for file_name, data in files.items():
+            path = output_dir / file_name
+            path.write_bytes(data)
+            outputs.append(path)
+            print(f"Exported: {path} ({len(data) / 1024:.1f} KB)")
+        if cache:
+            cache.store_outputs(robot_key, files)
+
+    if levels:
+        rows = []
+        for level, mesh in enumerate(robot_meshes):
+            errors = [_lod_errors[_mesh_key(path)][level - 1] for path in mesh_paths if level and path.exists()]
+            glb = f"{name}_lod{level}.glb" if level else f"{name}.glb"
+            rows.append((level, len(mesh.faces), max(errors, default=0.0), len(files[glb])))
+        print_lod_report(rows)
+    if compression_rows:
+        print_compression_report(compression_rows)
+    if collision:
+        print_collision_report(collision_rows, len(collision_data))
+
+    return outputs, timer
+
+
+def resolve_robot(spec):
+    """
+    (name, robot) for a registered robot name or a path to a .urdf file. A path
+    to a registered robot's URDF gets that robot's colors; any other URDF is
+    colored by its own materials.
+    """
+    if spec in ROBOTS:
+        entry = ROBOTS[spec]
+        robot = parse_urdf(entry["urdf"], entry.get("colors"), entry.get("default_color", DEFAULT_COLOR))
+        robot["label"] = entry.get("label", robot["name"])
+        return spec, robot
+
+    path = Path(spec)
+    if path.suffix.lower() not in (".urdf", ".xml") or not path.exists():
+        raise ValueError(f"unknown robot {spec!r} (choose from {', '.join(ROBOTS)} or pass a .urdf file)")
+    entry = next((entry for entry in ROBOTS.values() if entry["urdf"].resolve() == path.resolve()), {})
+    robot = parse_urdf(path, entry.get("colors"), entry.get("default_color", DEFAULT_COLOR))
+    robot["label"] = robot["name"] or path.stem
+    return path.stem, robot
+
+
+def print_timings(timings):
+    """Print a per-robot table of stage timings."""
+    print("\nStage timings (seconds):")
+    print(f"  {'robot':<16}" + "".join(f"{stage:>13}" for stage in StageTimer.STAGES) + f"{'total':>13}")
+    for name, timer in timings.items():
+        seconds = timer.seconds
+        row = "".join(f"{seconds[stage]:>13.3f}" for stage in StageTimer.STAGES)
+        print(f"  {name:<16}{row}{sum(seconds.values()):>13.3f}")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Convert URDF robot models to GLTF/GLB")
+    parser.add_argument(
+        "robots", nargs="*", metavar="ROBOT",
+        help=f"Registered robot names or .urdf paths (default: all of {', '.join(ROBOTS)})",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=os.cpu_count() or 1,
+        help="Processes used to parse mesh files (1 disables the pool)",
+    )
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR, help="Where to write the GLB/GLTF files")
+    parser.add_argument("--cache-dir", type=Path, default=CACHE_DIR, help="Incremental build cache location")
+    parser.add_argument("--no-cache", action="store_true", help="Rebuild everything without reading or writing the cache")
+    parser.add_argument(
+        "--lod", metavar="LEVELS",
+        help="Comma-separated ratio:max_error_mm targets for LOD1, LOD2, ... or 'none' (default: "
+             + ",".join(f"{ratio}:{error * 1000:g}" for ratio, error in LOD_LEVELS) + ")",
+    )
+    parser.add_argument(
+        "--scene-lods", action="store_true",
+        help="Also add {link}_LOD<n> groups to <name>_scene.glb (all visible; the viewer must pick one per link)",
+    )
+    parser.add_argument(
+        "--compress", action="append", choices=gltf_compress.ENCODINGS,
+        help="Also write quantized (KHR_mesh_quantization) and/or Draco single-mesh GLBs; repeatable",
+    )
+    parser.add_argument(
+        "--position-bits", type=int, default=14,
+        help="Position precision of compressed output, in bits over the largest model extent",
+    )
+    parser.add_argument(
+        "--normal-bits", type=int, default=0,
+        help="Include normals at this precision (2-16) in compressed output (0 omits them, like the plain GLB)",
+    )
+    parser.add_argument(
+        "--collision", choices=(*collision_proxies.HULL_MODES, "none"), default="parts",
+        help="Collision hulls per visual part or per link, written to <name>_collision.bin (default: parts)",
+    )
+    parser.add_argument(
+        "--hull-samples", type=int, default=64,
+        help="Rebuild each part hull from this many vertices, inflated to stay conservative (0: exact hulls)",
+    )
+    args = parser.parse_args()
+
+    if args.hull_samples and args.hull_samples < 4:
+        parser.error("--hull-samples must be 0 or at least 4")
+    collision = None if args.collision == "none" else {"mode": args.collision, "samples": args.hull_samples}
+    compress = None
+    if args.compress:
+        # Positions are unsigned (2^bits - 1 steps), normals signed (2^(bits-1) - 1 levels per side)
+        if not 1 <= args.position_bits <= 16 or not (args.normal_bits == 0 or 2 <= args.normal_bits <= 16):
+            parser.error("--position-bits must be 1-16 and --normal-bits 0 or 2-16")
+        if "draco" in args.compress and gltf_compress.DracoPy is None:
+            parser.error("--compress draco needs DracoPy (pip install DracoPy)")
+        compress = {
+            "encodings": sorted(set(args.compress), key=args.compress.index),
+            "position_bits": args.position_bits,
+            "normal_bits": args.normal_bits,
+        }
+
+    lod = None
+    if args.lod != "none":
+        try:
+            targets = [
+                (float(ratio), float(error) / 1000)
+                for ratio, error in (level.split(":") for level in args.lod.split(","))
+            ] if args.lod else [list(level) for level in LOD_LEVELS]
+        except ValueError:
+            parser.error(f"invalid --lod value {args.lod!r}")
+        ratios = [ratio for ratio, _ in targets]
+        if any(not 0 < r < 1 for r in ratios) or ratios != sorted(ratios, reverse=True):
+            parser.error("--lod ratios must be decreasing and between 0 and 1")
+        if importlib.util.find_spec("fast_simplification") is None:
+            if args.lod:
+                parser.error("--lod needs fast-simplification (pip install fast-simplification)")
+            print("Warning: fast-simplification is not installed, skipping LOD generation")
+        else:
+            lod = [list(target) for target in targets]
+
+    try:
+        resolved = [resolve_robot(spec) for spec in (args.robots or list(ROBOTS))]
+    except (ValueError, ET.ParseError) as e:
+        parser.error(str(e))
+    robots = dict(resolved)
+    if len(robots) != len(resolved):
+        parser.error("two robots would be written to the same output name")
+
     print("=" * 60)
-    print("SO-101 URDF to GLTF Converter")
+    print("URDF to GLTF Converter")
     print("=" * 60)
 
     # Ensure output directory exists
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-
-    # Option 1: Single combined mesh (simplest, works great)
-    robot_mesh = build_robot()
-
-    # Export as GLB (binary GLTF - smaller, faster)
-    output_glb = OUTPUT_DIR / "so101.glb"
-    robot_mesh.export(output_glb, file_type='glb')
-    print(f"\nExported: {output_glb}")
-    print(f"File size: {output_glb.stat().st_size / 1024:.1f} KB")
-
-    # Also export as GLTF (text format for debugging)
-    output_gltf = OUTPUT_DIR / "so101.gltf"
-    robot_mesh.export(output_gltf, file_type='gltf')
-    print(f"Exported: {output_gltf}")
-
-    # Option 2: Scene with hierarchy (for future animation support)
-    scene = export_scene_with_hierarchy()
-    output_scene_glb = OUTPUT_DIR / "so101_scene.glb"
-    scene.export(output_scene_glb, file_type='glb')
-    print(f"Exported: {output_scene_glb}")
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    cache = None if args.no_cache else ConversionCache(args.cache_dir)
+
+    outputs = {}
+    timings = {}
+    executor = ProcessPoolExecutor(max_workers=args.jobs) if args.jobs > 1 else None
+    try:
+        for name, robot in robots.items():
+            outputs[name], timings[name] = convert_robot(
+                name, robot, args.output_dir, executor, cache, lod, compress, collision, args.scene_lods,
+            )
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if cache:
+            cache.save_hashes()
 
     print("\n" + "=" * 60)
     print("Conversion complete!")
     print("=" * 60)
+    print_timings(timings)
     print("\nFiles created:")
-    print(f"  - {output_glb} (single mesh, use this)")
-    print(f"  - {output_gltf} (debug version)")
-    print(f"  - {output_scene_glb} (with hierarchy)")
+    for name, paths in outputs.items():
+        for path in paths:
+            note = {".glb": "single mesh, use this", ".gltf": "debug version"}.get(path.suffix, "")
+            if path.name.endswith("_scene.glb"):
+                note = "with hierarchy"
+            elif path.stem.endswith("_collision"):
+                note = "collision proxies"
+            elif path.stem.endswith(gltf_compress.ENCODINGS):
+                note = "compressed single mesh"
+            elif "_lod" in path.stem:
+                note = "simplified single mesh"
+            print(f"  - {path}" + (f" ({note})" if note else ""))
     print("\nNext: Update React code to use useGLTF loader")
 
 
@@ -0,0 +1,352 @@
+"""
+Compact GLB export for single meshes, used by convert_urdf_to_gltf.py.
+
+Two encodings are supported, both loadable by three.js GLTFLoader:
+
+- "quantize" (KHR_mesh_quantization): positions become unsigned integers on a
+  uniform grid over the mesh bounds and the node's translation/scale maps them
+  back to meters; normals become normalized signed integers. Large meshes are
+  split into primitives of under 65536 vertices so indices fit in 16 bits.
+  No decoder needed.
+- "draco" (KHR_draco_mesh_compression): the geometry is Draco-encoded with the
+  same position/normal precision. Needs DracoPy here and DRACOLoader in the app.
+
+Every export is decoded again from the written bytes and checked against the
+source vertices, so a file is never written with more error than its stated bound.
+"""
+
+import json
+import struct
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+try:
+    import DracoPy
+except ImportError:  # Only needed for draco output
+    DracoPy = None
+
+ENCODINGS = ("quantize", "draco")
+
+# glTF component types
+BYTE = 5120
+UNSIGNED_BYTE = 5121
+SHORT = 5122
+UNSIGNED_SHORT = 5123
+UNSIGNED_INT = 5125
+FLOAT = 5126
+
+GLB_MAGIC = 0x46546C67
+JSON_CHUNK = 0x4E4F534A
+BIN_CHUNK = 0x004E4942
+
+GENERATOR = "robosim convert_urdf_to_gltf"
+
+
+def position_step(vertices, bits):
+    """Grid spacing used to quantize positions: the largest extent split into 2^bits - 1 steps"""
+    extent = float(np.ptp(vertices, axis=0).max()) if len(vertices) else 0.0
+    return (extent or 1.0) / ((1 << bits) - 1)
+
+
+def position_error_bound(vertices, bits):
+    """Largest distance (meters) between a vertex and its quantized position: half a grid cell diagonal"""
+    return position_step(vertices, bits) * np.sqrt(3) / 2
+
+
+def quantize_normals(normals, bits):
+    """
+    Normalized signed integers (int8 up to 8 bits, else int16) carrying `bits`
+    of precision. One bit is the sign alone, leaving no magnitude levels, so
+    `bits` must be 2-16.
+    """
+    if not 2 <= bits <= 16:
+        raise ValueError(f"normal bits must be between 2 and 16, got {bits}")
+    levels = (1 << (bits - 1)) - 1
+    dtype, full = (np.int8, 127) if bits <= 8 else (np.int16, 32767)
+    snapped = np.round(np.clip(normals, -1, 1) * levels) / levels
+    return np.round(snapped * full).astype(dtype), (BYTE if dtype == np.int8 else SHORT)
+
+
+def _padded(data, fill=b"\x00"):
+    return data + fill * (-len(data) % 4)
+
+
+def encode_glb(gltf, binary):
+    """Assemble a GLB container from the JSON document and the binary chunk"""
+    json_chunk = _padded(json.dumps(gltf, separators=(",", ":")).encode(), b" ")
+    bin_chunk = _padded(binary)
+    length = 12 + 8 + len(json_chunk) + 8 + len(bin_chunk)
+    return b"".join([
+        struct.pack("<III", GLB_MAGIC, 2, length),
+        struct.pack("<II", len(json_chunk), JSON_CHUNK), json_chunk,
+        struct.pack("<II", len(bin_chunk), BIN_CHUNK), bin_chunk,
+    ])
+
+
+def decode_glb(glb):
+    """(gltf JSON, binary chunk) of a GLB file"""
+    magic, _, _ = struct.unpack_from("<III", glb, 0)
+    if magic != GLB_MAGIC:
+        raise ValueError("not a GLB file")
+    json_length, _ = struct.unpack_from("<II", glb, 12)
+    gltf = json.loads(glb[20:20 + json_length])
+    offset = 20 + json_length
+    binary = b""
+    if offset < len(glb):
+        bin_length, _ = struct.unpack_from("<II", glb, offset)
+        binary = glb[offset + 8:offset + 8 + bin_length]
+    return gltf, binary
+
+
+class _Builder:
+    """Accumulates 4-byte aligned buffer views and accessors for one binary chunk."""
+
+    def __init__(self):
+        self.chunks = []
+        self.length = 0
+        self.buffer_views = []
+        self.accessors = []
+
+    def view(self, data, stride=None, target=None):
+        view = {"buffer": 0, "byteOffset": self.length, "byteLength": len(data)}
+        if stride:
+            view["byteStride"] = stride
+        if target:
+            view["target"] = target
+        padded = _padded(data)
+        self.chunks.append(padded)
+        self.length += len(padded)
+        self.buffer_views.append(view)
+        return len(self.buffer_views) - 1
+
+    def accessor(self, **fields):
+        self.accessors.append(fields)
+        return len(self.accessors) - 1
+
+    def attribute(self, values, component_type, type_, normalized=False, bounds=False):
+        """Vertex attribute padded to a 4-byte stride, as glTF requires"""
+        values = np.ascontiguousarray(values)
+        width = values.shape[1]
+        item = values.dtype.itemsize * width
+        stride = item + (-item % 4)
+        if stride != item:
+            padding = np.zeros((len(values), (stride - item) // values.dtype.itemsize), dtype=values.dtype)
+            values = np.hstack([values, padding])
+        fields = {
+            "bufferView": self.view(values.tobytes(), stride=stride, target=34962),
+            "componentType": component_type,
+            "count": len(values),
+            "type": type_,
+        }
+        if normalized:
+            fields["normalized"] = True
+        if bounds:
+            fields["min"] = values[:, :width].min(axis=0).tolist()
+            fields["max"] = values[:, :width].max(axis=0).tolist()
+        return self.accessor(**fields)
+
+    def binary(self):
+        return b"".join(self.chunks)
+
+
+def split_for_short_indices(faces, limit=65536):
+    """
+    Split faces into consecutive runs that each reference fewer than `limit` vertices.
+    Returns [(vertex_ids, local_faces)] where local_faces index into vertex_ids.
+    """
+    faces = np.asarray(faces)
+    if faces.size == 0 or faces.max() < limit:
+        return [(np.arange(faces.max() + 1 if faces.size else 0), faces)]
+
+    chunks = []
+    start = 0
+    while start < len(faces):
+        # Largest end whose faces touch fewer than `limit` distinct vertices (a closed
+        # mesh has about two faces per vertex, so searching further is pointless)
+        lo, hi = start + 1, min(len(faces), start + 4 * limit)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if len(np.unique(faces[start:mid])) < limit:
+                lo = mid
+            else:
+                hi = mid - 1
+        vertex_ids, local = np.unique(faces[start:lo], return_inverse=True)
+        chunks.append((vertex_ids, local.reshape(-1, 3)))
+        start = lo
+    return chunks
+
+
+def _vertex_colors(mesh):
+    """RGBA uint8 vertex colors of a trimesh, or None if it has no colors"""
+    if mesh.visual.kind is None:
+        return None
+    return np.asarray(mesh.visual.vertex_colors, dtype=np.uint8)
+
+
+def _document(builder, primitives, node, extensions):
+    gltf = {
+        "asset": {"version": "2.0", "generator": GENERATOR},
+        "scene": 0,
+        "scenes": [{"nodes": [0]}],
+        "nodes": [node],
+        "meshes": [{"name": "geometry_0", "primitives": primitives}],
+        "accessors": builder.accessors,
+        "bufferViews": builder.buffer_views,
+        "buffers": [{"byteLength": builder.length}],
+    }
+    if extensions:
+        gltf["extensionsUsed"] = list(extensions)
+        gltf["extensionsRequired"] = list(extensions)
+    return encode_glb(gltf, builder.binary())
+
+
+def export_quantized_glb(mesh, position_bits=14, normal_bits=0):
+    """GLB with KHR_mesh_quantization: uint16 positions on a uniform grid, normalized integer normals."""
+    if not 1 <= position_bits <= 16:
+        raise ValueError("position_bits must be between 1 and 16")
+    vertices = np.asarray(mesh.vertices, dtype=np.float64)
+    origin = vertices.min(axis=0)
+    step = position_step(vertices, position_bits)
+    positions = np.round((vertices - origin) / step).astype(np.uint16)
+
+    normals = quantize_normals(mesh.vertex_normals, normal_bits) if normal_bits else None
+    colors = _vertex_colors(mesh)
+
+    builder = _Builder()
+    primitives = []
+    for vertex_ids, faces in split_for_short_indices(mesh.faces):
+        indices = builder.accessor(
+            bufferView=builder.view(faces.astype(np.uint16).tobytes(), target=34963),
+            componentType=UNSIGNED_SHORT,
+            count=faces.size,
+            type="SCALAR",
+        )
+        attributes = {"POSITION": builder.attribute(positions[vertex_ids], UNSIGNED_SHORT, "VEC3", bounds=True)}
+        if normals is not None:
+            attributes["NORMAL"] = builder.attribute(normals[0][vertex_ids], normals[1], "VEC3", normalized=True)
+        if colors is not None:
+            attributes["COLOR_0"] = builder.attribute(colors[vertex_ids], UNSIGNED_BYTE, "VEC4", normalized=True)
+        primitives.append({"attributes": attributes, "indices": indices, "mode": 4})
+
+    # Uniform scale keeps normals valid without re-deriving them in quantized space
+    node = {"name": "geometry_0", "mesh": 0, "translation": origin.tolist(), "scale": [step] * 3}
+    return _document(builder, primitives, node, ["KHR_mesh_quantization"])
+
+
+def export_draco_glb(mesh, position_bits=14, normal_bits=0, compression_level=7):
+    """GLB with KHR_draco_mesh_compression at the given quantization precision."""
+    if DracoPy is None:
+        raise RuntimeError("draco output needs DracoPy (pip install DracoPy)")
+    if normal_bits and not 2 <= normal_bits <= 16:
+        raise ValueError(f"normal bits must be between 2 and 16, got {normal_bits}")
+
+    colors = _vertex_colors(mesh)
+    encoded = DracoPy.encode(
+        np.asarray(mesh.vertices, dtype=np.float64),
+        np.asarray(mesh.faces),
+        quantization_bits=position_bits,
+        compression_level=compression_level,
+        colors=colors,
+        normals=np.asarray(mesh.vertex_normals, dtype=np.float64) if normal_bits else None,
+        normal_quantization_bits=normal_bits or None,
+    )
+    # Draco may merge or reorder points; accessor counts and bounds come from the decoded mesh
+    decoded = DracoPy.decode(encoded)
+    unique_ids = {attribute["attribute_type"]: attribute["unique_id"] for attribute in decoded.attributes}
+    points = np.asarray(decoded.points)
+
+    builder = _Builder()
+    view = builder.view(encoded)
+    indices = builder.accessor(componentType=UNSIGNED_INT, count=int(np.asarray(decoded.faces).size), type="SCALAR")
+    attributes = {
+        "POSITION": builder.accessor(
+            componentType=FLOAT, count=len(points), type="VEC3",
+            min=points.min(axis=0).tolist(), max=points.max(axis=0).tolist(),
+        ),
+    }
+    draco_attributes = {"POSITION": unique_ids[0]}
+    if normal_bits:
+        attributes["NORMAL"] = builder.accessor(componentType=FLOAT, count=len(points), type="VEC3")
+        draco_attributes["NORMAL"] = unique_ids[1]
+    if colors is not None:
+        attributes["COLOR_0"] = builder.accessor(
+            componentType=UNSIGNED_BYTE, count=len(points), type="VEC4", normalized=True,
+        )
+        draco_attributes["COLOR_0"] = unique_ids[2]
+
+    primitive = {
+        "attributes": attributes,
+        "indices": indices,
+        "mode": 4,
+        "extensions": {"KHR_draco_mesh_compression": {"bufferView": view, "attributes": draco_attributes}},
+    }
+    node = {"name": "geometry_0", "mesh": 0}
+    return _document(builder, [primitive], node, ["KHR_draco_mesh_compression"])
+
+
+def read_glb_geometry(glb):
+    """Decode (positions in meters, faces) from a GLB written by this module"""
+    gltf, binary = decode_glb(glb)
+
+    def read(index):
+        accessor = gltf["accessors"][index]
+        view = gltf["bufferViews"][accessor["bufferView"]]
+        dtype = {UNSIGNED_SHORT: np.uint16, UNSIGNED_INT: np.uint32, FLOAT: np.float32}[accessor["componentType"]]
+        width = {"SCALAR": 1, "VEC3": 3}[accessor["type"]]
+        stride = view.get("byteStride", np.dtype(dtype).itemsize * width) // np.dtype(dtype).itemsize
+        data = np.frombuffer(binary, dtype=dtype, count=accessor["count"] * stride, offset=view["byteOffset"])
+        return data.reshape(-1, stride)[:, :width]
+
+    node = gltf["nodes"][0]
+    scale = np.asarray(node.get("scale", [1, 1, 1]))
+    translation = np.asarray(node.get("translation", [0, 0, 0]))
+    all_positions, all_faces = [], []
+    offset = 0
+    for primitive in gltf["meshes"][0]["primitives"]:
+        draco = primitive.get("extensions", {}).get("KHR_draco_mesh_compression")
+        if draco:
+            view = gltf["bufferViews"][draco["bufferView"]]
+            decoded = DracoPy.decode(binary[view["byteOffset"]:view["byteOffset"] + view["byteLength"]])
+            positions, faces = np.asarray(decoded.points, dtype=np.float64), np.asarray(decoded.faces).reshape(-1, 3)
+        else:
+            positions, faces = read(primitive["attributes"]["POSITION"]), read(primitive["indices"]).reshape(-1, 3)
+        all_positions.append(positions * scale + translation)
+        all_faces.append(faces.astype(np.int64) + offset)
+        offset += len(positions)
+    return np.concatenate(all_positions), np.concatenate(all_faces)
+
+
+def geometry_error(glb, mesh):
+    """
+    Largest distance (meters) between the GLB's decoded vertices and the source mesh's.
+    Vertices are matched by index when the order is preserved, else to the nearest
+    vertex in both directions (Draco reorders, split primitives repeat shared vertices).
+    """
+    positions, faces = read_glb_geometry(glb)
+    source = np.asarray(mesh.vertices, dtype=np.float64)
+    if len(faces) != len(mesh.faces):
+        raise ValueError(f"decoded {len(faces)} faces, expected {len(mesh.faces)}")
+    if len(positions) == len(source) and np.array_equal(faces, mesh.faces):
+        return float(np.linalg.norm(positions - source, axis=1).max())
+    return float(max(cKDTree(source).query(positions)[0].max(), cKDTree(positions).query(source)[0].max()))
+
+
+def export_compressed_glb(mesh, encoding, position_bits=14, normal_bits=0):
+    """
+    Export with the given encoding and verify the decoded result.
+    Returns (glb bytes, measured error, error bound) in meters; raises if over the bound.
+    """
+    if encoding == "quantize":
+        glb = export_quantized_glb(mesh, position_bits, normal_bits)
+    elif encoding == "draco":
+        glb = export_draco_glb(mesh, position_bits, normal_bits)
+    else:
+        raise ValueError(f"unknown encoding {encoding!r}")
+
+    bound = position_error_bound(mesh.vertices, position_bits)
+    error = geometry_error(glb, mesh)
+    # float32 rounding of the decoded positions is allowed on top of the grid bound
+    if error > bound * (1 + 1e-6) + 1e-7:
+        raise RuntimeError(f"{encoding} export error {error:.3g} m exceeds its bound {bound:.3g} m")
+    return glb, error, bound
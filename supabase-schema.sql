@@ -37,10 +37,31 @@ CREATE INDEX IF NOT EXISTS idx_usage_logs_user_id ON public.usage_logs(user_id);
 CREATE INDEX IF NOT EXISTS idx_usage_logs_created_at ON public.usage_logs(created_at);
 CREATE INDEX IF NOT EXISTS idx_user_profiles_email ON public.user_profiles(email);
 CREATE INDEX IF NOT EXISTS idx_user_profiles_tier ON public.user_profiles(tier);
+CREATE INDEX IF NOT EXISTS idx_user_profiles_stripe_customer_id ON public.user_profiles(stripe_customer_id);
+
+-- Stripe webhook events, keyed by Stripe's event id so redeliveries are recognized.
+-- The API records an event as 'pending', acknowledges it, then applies it and marks
+-- it 'processed' or 'failed'. claimed_at is when a worker last took the event on;
+-- failed events and pending ones with an old claim are re-claimed by redeliveries
+-- and by the API's periodic sweep. Only the service role (API) touches this table.
+CREATE TABLE IF NOT EXISTS public.stripe_events (
+  id TEXT PRIMARY KEY,
+  type TEXT NOT NULL,
+  payload JSONB NOT NULL,
+  status TEXT DEFAULT 'pending' NOT NULL CHECK (status IN ('pending', 'processed', 'failed')),
+  attempts INT DEFAULT 0 NOT NULL,
+  last_error TEXT,
+  received_at TIMESTAMPTZ DEFAULT NOW(),
+  claimed_at TIMESTAMPTZ DEFAULT NOW() NOT NULL,
+  processed_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_stripe_events_status ON public.stripe_events(status, claimed_at) WHERE status <> 'processed';
 
 -- Enable Row Level Security
 ALTER TABLE public.user_profiles ENABLE ROW LEVEL SECURITY;
 ALTER TABLE public.usage_logs ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.stripe_events ENABLE ROW LEVEL SECURITY;
 
 -- RLS Policies for user_profiles
 -- Users can only read their own profile
@@ -0,0 +1,28 @@
+"""
+Shared fixtures for the Python test suite (the Playwright specs in this folder
+are run separately by `npx playwright test`).
+
+The API is imported as the `api` package from the project root, and the
+scripts as top-level modules from scripts/, the same way
+scripts/convert_urdf_to_gltf.py imports its helpers. Supabase is replaced by
+the benchmark's in-memory stand-in.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+
+from benchmark_api import InMemorySupabase  # noqa: E402
+
+
+@pytest.fixture
+def supabase():
+    """Empty in-memory Supabase with the column defaults of supabase-schema.sql"""
+    return InMemorySupabase(defaults={
+        "stripe_events": {"attempts": 0, "last_error": None, "processed_at": None},
+    })
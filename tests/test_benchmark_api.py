@@ -0,0 +1,55 @@
+import pytest
+
+from benchmark_api import make_episodes, make_example_rows, percentile, summarize
+
+
+def test_synthetic_data_is_reproducible():
+    assert make_episodes(700, 300, seed=3) == make_episodes(700, 300, seed=3)
+    assert make_episodes(700, 300, seed=3) != make_episodes(700, 300, seed=4)
+
+    first = make_example_rows(50, seed=3)
+    second = make_example_rows(50, seed=3)
+    assert [row["id"] for row in first] == [row["id"] for row in second]
+    assert [row["object_position"] for row in first] == [row["object_position"] for row in second]
+
+
+def test_episodes_split_the_requested_frames():
+    episodes = make_episodes(700, 300)
+    assert [len(episode["frames"]) for episode in episodes] == [300, 300, 100]
+    assert [episode["episodeIndex"] for episode in episodes] == [0, 1, 2]
+
+
+def test_percentile_and_summary():
+    samples = [0.004, 0.001, 0.003, 0.002]
+    assert percentile(samples, 0) == 0.001
+    assert percentile(samples, 50) == 0.003
+    assert percentile(samples, 100) == 0.004
+
+    summary = summarize(samples, 10, "frames/s")
+    assert summary["calls"] == 4
+    assert summary["throughput"] == pytest.approx(40 / 0.010)
+    assert summary["mean_ms"] == pytest.approx(2.5)
+
+
+def test_in_memory_supabase_query_builder(supabase):
+    supabase.tables["events"] = [
+        {"id": "a", "status": "failed", "attempts": 1, "at": "2026-01-01T00:00:00.000000Z"},
+        {"id": "b", "status": "failed", "attempts": 5, "at": "2026-01-01T00:00:00.000000Z"},
+        {"id": "c", "status": "pending", "attempts": 0, "at": "2026-01-03T00:00:00.000000Z"},
+    ]
+    events = supabase.table
+
+    due = "and(status.eq.failed,attempts.lt.5),and(status.eq.pending,at.lt.2026-01-02T00:00:00.000000Z)"
+    assert [row["id"] for row in events("events").select("id").or_(due).execute().data] == ["a"]
+
+    updated = events("events").update({"status": "pending"}).eq("id", "a").execute().data
+    assert updated == [dict(supabase.tables["events"][0])]
+    assert supabase.tables["events"][0]["status"] == "pending"
+
+    page = events("events").select("id", count="exact").order("id", desc=True).range(1, 2).execute()
+    assert [row["id"] for row in page.data] == ["b", "a"]
+    assert page.count == 3
+
+    assert events("events").upsert({"id": "a"}, on_conflict="id", ignore_duplicates=True).execute().data == []
+    inserted = events("events").upsert({"id": "d"}, on_conflict="id", ignore_duplicates=True).execute().data
+    assert inserted == [{"id": "d"}]
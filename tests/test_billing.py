@@ -0,0 +1,203 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+import stripe
+
+from api import billing, main
+
+
+def checkout_event(event_id="evt_1", email="ada@example.com"):
+    return {
+        "id": event_id,
+        "type": "checkout.session.completed",
+        "data": {"object": {"customer": "cus_1", "customer_email": email, "subscription": "sub_1"}},
+    }
+
+
+def cancellation_event(event_id="evt_2", customer="cus_1"):
+    return {"id": event_id, "type": "customer.subscription.deleted", "data": {"object": {"customer": customer}}}
+
+
+class FakeStripe:
+    """The slice of the Stripe SDK billing uses: Customer.retrieve"""
+
+    def __init__(self, customers):
+        self.retrieved = []
+
+        def retrieve(customer_id):
+            self.retrieved.append(customer_id)
+            return customers[customer_id]
+
+        self.Customer = SimpleNamespace(retrieve=retrieve)
+
+
+@pytest.fixture
+def stripe_sdk():
+    return FakeStripe({"cus_1": {"email": "ada@example.com"}})
+
+
+def deliver(supabase, event, stripe_sdk=None):
+    """What the webhook does: record, then apply in the background if claimed"""
+    claimed = billing.record_event(supabase, event)
+    if claimed is not None:
+        billing.process_event(
+            supabase, stripe_sdk, event["id"], event["type"], event["data"]["object"], claimed["attempts"],
+        )
+    return claimed
+
+
+def event_row(supabase, event_id="evt_1"):
+    return next(row for row in supabase.tables["stripe_events"] if row["id"] == event_id)
+
+
+def age(row, minutes):
+    row["claimed_at"] = billing._timestamp(datetime.now(timezone.utc) - timedelta(minutes=minutes))
+
+
+@pytest.fixture
+def profiles(supabase):
+    supabase.tables["user_profiles"] = [{"email": "ada@example.com", "tier": "free"}]
+    return supabase.tables["user_profiles"]
+
+
+@pytest.fixture
+def failing_apply(monkeypatch):
+    def apply_event(supabase, stripe, event_type, obj):
+        raise RuntimeError("database unavailable")
+    monkeypatch.setattr(billing, "apply_event", apply_event)
+
+
+def test_new_event_is_applied_once(supabase, profiles):
+    assert deliver(supabase, checkout_event()) is not None
+
+    row = event_row(supabase)
+    assert row["status"] == "processed"
+    assert row["attempts"] == 1
+    assert profiles[0]["tier"] == "pro"
+    assert profiles[0]["stripe_customer_id"] == "cus_1"
+
+
+def test_duplicate_delivery_is_ignored(supabase, profiles):
+    deliver(supabase, checkout_event())
+    profiles[0]["tier"] = "free"
+
+    assert deliver(supabase, checkout_event()) is None
+    assert event_row(supabase)["attempts"] == 1
+    assert profiles[0]["tier"] == "free"
+
+
+def test_redelivery_while_pending_is_ignored(supabase, profiles):
+    assert billing.record_event(supabase, checkout_event()) is not None
+
+    assert billing.record_event(supabase, checkout_event()) is None
+    assert event_row(supabase)["status"] == "pending"
+
+
+def test_failed_event_is_claimed_again_on_redelivery(supabase, profiles, monkeypatch, failing_apply):
+    deliver(supabase, checkout_event())
+    row = event_row(supabase)
+    assert row["status"] == "failed"
+    assert row["last_error"] == "database unavailable"
+    assert profiles[0]["tier"] == "free"
+
+    monkeypatch.undo()
+    claimed = deliver(supabase, checkout_event())
+
+    assert claimed["attempts"] == 1
+    row = event_row(supabase)
+    assert row["status"] == "processed"
+    assert row["attempts"] == 2
+    assert row["last_error"] is None
+    assert profiles[0]["tier"] == "pro"
+
+
+def test_failed_redelivery_is_claimed_by_one_worker(supabase, profiles, failing_apply):
+    deliver(supabase, checkout_event())
+
+    first = billing.record_event(supabase, checkout_event())
+    second = billing.record_event(supabase, checkout_event())
+
+    assert first is not None
+    assert second is None
+
+
+def test_stale_pending_event_is_reclaimed(supabase, profiles):
+    billing.record_event(supabase, checkout_event())
+    age(event_row(supabase), minutes=1)
+    assert billing.record_event(supabase, checkout_event()) is None
+
+    age(event_row(supabase), minutes=10)
+    assert deliver(supabase, checkout_event()) is not None
+    assert billing.record_event(supabase, checkout_event()) is None
+    assert event_row(supabase)["status"] == "processed"
+    assert profiles[0]["tier"] == "pro"
+
+
+def test_sweep_applies_stale_pending_events(supabase, profiles):
+    billing.record_event(supabase, checkout_event())
+    assert billing.sweep_events(supabase, None) == 0
+
+    age(event_row(supabase), minutes=10)
+    assert billing.sweep_events(supabase, None) == 1
+    assert event_row(supabase)["status"] == "processed"
+    assert profiles[0]["tier"] == "pro"
+    assert billing.sweep_events(supabase, None) == 0
+
+
+def test_sweep_retries_failed_events_after_delay(supabase, profiles, monkeypatch, failing_apply):
+    deliver(supabase, checkout_event())
+    monkeypatch.undo()
+
+    # Failed just now: not due until RETRY_DELAY has passed
+    assert billing.sweep_events(supabase, None) == 0
+
+    age(event_row(supabase), minutes=2)
+    assert billing.sweep_events(supabase, None) == 1
+    assert event_row(supabase)["status"] == "processed"
+    assert event_row(supabase)["attempts"] == 2
+    assert profiles[0]["tier"] == "pro"
+
+
+def test_sweep_gives_up_after_max_attempts(supabase, profiles, failing_apply):
+    deliver(supabase, checkout_event())
+    row = event_row(supabase)
+    row["attempts"] = billing.MAX_ATTEMPTS
+    age(row, minutes=10)
+
+    assert billing.sweep_events(supabase, None) == 0
+    assert row["status"] == "failed"
+
+
+def test_sweep_downgrades_profiles_without_a_customer_id(supabase, stripe_sdk):
+    # Upgraded before stripe_customer_id was stored: the email is looked up through Stripe
+    supabase.tables["user_profiles"] = [{"email": "ada@example.com", "tier": "pro"}]
+    billing.record_event(supabase, cancellation_event())
+    age(event_row(supabase, "evt_2"), minutes=10)
+
+    assert billing.sweep_events(supabase, stripe_sdk) == 1
+
+    assert stripe_sdk.retrieved == ["cus_1"]
+    assert supabase.tables["user_profiles"][0] == {
+        "email": "ada@example.com", "tier": "free", "stripe_customer_id": "cus_1",
+    }
+    assert event_row(supabase, "evt_2")["status"] == "processed"
+
+
+def test_sweeper_passes_the_configured_stripe_sdk(supabase, monkeypatch):
+    monkeypatch.setattr(stripe, "api_key", None)
+    monkeypatch.setattr(main, "STRIPE_SECRET_KEY", "sk_test_sweep")
+    monkeypatch.setattr(main, "STRIPE_SWEEP_INTERVAL", 0)
+    monkeypatch.setattr(main, "get_supabase", lambda: supabase)
+    swept = []
+
+    def sweep_events(client, stripe_sdk):
+        swept.append((client, stripe_sdk.api_key))
+        raise asyncio.CancelledError  # Stop the loop after one sweep
+
+    monkeypatch.setattr(billing, "sweep_events", sweep_events)
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(main.sweep_stripe_events())
+    assert swept == [(supabase, "sk_test_sweep")]
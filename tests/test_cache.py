@@ -0,0 +1,65 @@
+import pytest
+
+from api.cache import GenerationCache, GenerationCounter, default_generation_path
+
+
+@pytest.fixture
+def counter_path(tmp_path):
+    return tmp_path / "examples.gen"
+
+
+def test_counter_is_shared_through_the_file(counter_path):
+    first = GenerationCounter(counter_path)
+    second = GenerationCounter(counter_path)
+
+    assert first.bump() == 1
+    assert second.current() == 1
+    assert second.bump() == 2
+    assert first.current() == 2
+
+
+def test_invalidate_drops_entries_of_every_cache(counter_path):
+    # Two workers: separate counter mappings and caches over the same file
+    worker_a = GenerationCache(GenerationCounter(counter_path))
+    worker_b = GenerationCache(GenerationCounter(counter_path))
+    calls = []
+
+    def compute(value):
+        def run():
+            calls.append(value)
+            return value
+        return run
+
+    assert worker_a.get_or_compute("count", compute(1)) == 1
+    assert worker_b.get_or_compute("count", compute(1)) == 1
+    assert worker_a.get_or_compute("count", compute(99)) == 1
+    assert worker_b.get_or_compute("count", compute(99)) == 1
+    assert calls == [1, 1]
+
+    worker_a.invalidate()
+
+    assert worker_b.get_or_compute("count", compute(2)) == 2
+    assert worker_a.get_or_compute("count", compute(2)) == 2
+    assert calls == [1, 1, 2, 2]
+
+
+def test_value_computed_across_an_invalidation_is_not_stored(counter_path):
+    cache = GenerationCache(GenerationCounter(counter_path))
+    other = GenerationCounter(counter_path)
+
+    def stale():
+        other.bump()
+        return "stale"
+
+    assert cache.get_or_compute("key", stale) == "stale"
+    assert cache.get_or_compute("key", lambda: "fresh") == "fresh"
+    assert cache.get_or_compute("key", lambda: "unused") == "fresh"
+
+
+def test_default_path_is_scoped_by_data():
+    a = default_generation_path("examples", "sqlite:/srv/a.db")
+    b = default_generation_path("examples", "sqlite:/srv/b.db")
+
+    assert a != b
+    assert a == default_generation_path("examples", "sqlite:/srv/a.db")
+    assert a.name.startswith("robosim-examples-")
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+import trimesh
+
+from collision_proxies import convex_hull, decode_proxies, encode_proxies, oriented_box
+
+
+def proxy_link(name, mesh, rest):
+    vertices, faces, _ = convex_hull(mesh.vertices)
+    return {"name": name, "rest": rest, "box": oriented_box(mesh.vertices), "hulls": [(vertices, faces)]}
+
+
+@pytest.fixture
+def links():
+    rest = np.eye(4)
+    rest[:3, 3] = [0.1, 0.2, 0.3]
+    return [
+        proxy_link("base_link", trimesh.creation.box([0.1, 0.2, 0.05]), np.eye(4)),
+        # Name length not a multiple of 4, odd triangle count: exercises the padding
+        proxy_link("gripper", trimesh.creation.icosphere(subdivisions=1, radius=0.03), rest),
+    ]
+
+
+@pytest.mark.parametrize("parts", [True, False])
+def test_round_trip(links, parts):
+    data = encode_proxies(links, parts=parts)
+    assert len(data) % 4 == 0
+
+    decoded, decoded_parts = decode_proxies(data)
+
+    assert decoded_parts is parts
+    assert [link["name"] for link in decoded] == ["base_link", "gripper"]
+    for original, link in zip(links, decoded):
+        np.testing.assert_allclose(link["rest"], original["rest"], atol=1e-7)
+        for value, expected in zip(link["box"], original["box"]):
+            np.testing.assert_allclose(value, expected, atol=1e-6)
+        assert len(link["hulls"]) == len(original["hulls"])
+        for (vertices, faces), (expected_vertices, expected_faces) in zip(link["hulls"], original["hulls"]):
+            np.testing.assert_allclose(vertices, expected_vertices, atol=1e-7)
+            np.testing.assert_array_equal(faces, expected_faces)
+
+
+def test_rejects_bad_files(links):
+    data = encode_proxies(links)
+
+    with pytest.raises(ValueError, match="not a collision proxy file"):
+        decode_proxies(b"XXXX" + data[4:])
+    with pytest.raises(ValueError, match="truncated"):
+        decode_proxies(data[:-4])
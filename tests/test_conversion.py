@@ -0,0 +1,68 @@
+import json
+
+import pyarrow.parquet as pq
+
+from api.conversion import DATA_FILE, write_lerobot_dataset
+
+
+def episode(index, task, length):
+    return {
+        "episodeIndex": index,
+        "frames": [
+            {
+                "timestamp": i / 30.0,
+                "observation": {"jointPositions": [0.0, 10.0, 20.0, 30.0, 40.0, 50.0]},
+                "action": {"jointPositions": [1.0, 11.0, 21.0, 31.0, 41.0, 51.0]},
+            }
+            for i in range(length)
+        ],
+        "metadata": {"languageInstruction": task},
+    }
+
+
+def write(tmp_path, episodes):
+    folder = tmp_path / "dataset"
+    folder.mkdir()
+    write_lerobot_dataset(str(folder), episodes, None, 30, "demo", "user/demo")
+    return folder
+
+
+def test_task_episodes_row_ranges(tmp_path):
+    folder = write(tmp_path, [
+        episode(0, "pick the cube", 3),
+        episode(1, "pick the cube", 2),
+        episode(2, "stack the blocks", 4),
+        episode(3, "pick the cube", 1),
+        episode(4, "stack the blocks", 0),
+    ])
+
+    task_episodes = json.loads((folder / "meta" / "task_episodes.json").read_text())
+    assert task_episodes["data_file"] == DATA_FILE
+    assert task_episodes["tasks"] == [
+        {"task_index": 0, "task": "pick the cube", "episodes": [0, 1, 3],
+         "row_ranges": [[0, 5], [9, 10]], "num_frames": 6},
+        {"task_index": 1, "task": "stack the blocks", "episodes": [2, 4],
+         "row_ranges": [[5, 9]], "num_frames": 4},
+    ]
+
+    # Every range selects exactly that task's rows of the data file
+    table = pq.read_table(folder / DATA_FILE)
+    task_column = table.column("task_index").to_pylist()
+    for entry in task_episodes["tasks"]:
+        rows = [i for start, end in entry["row_ranges"] for i in range(start, end)]
+        assert rows == [i for i, task in enumerate(task_column) if task == entry["task_index"]]
+
+
+def test_tasks_and_info_metadata(tmp_path):
+    folder = write(tmp_path, [episode(0, "pick the cube", 2), episode(1, "stack the blocks", 2)])
+
+    tasks = [json.loads(line) for line in (folder / "meta" / "tasks.jsonl").read_text().splitlines()]
+    assert tasks == [
+        {"task_index": 0, "task": "pick the cube"},
+        {"task_index": 1, "task": "stack the blocks"},
+    ]
+
+    info = json.loads((folder / "meta" / "info.json").read_text())
+    assert info["total_tasks"] == 2
+    assert info["total_frames"] == 4
+    assert "task_index" in info["features"]
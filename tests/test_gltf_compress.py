@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from gltf_compress import BYTE, SHORT, quantize_normals
+
+
+def unit_normals(count=500):
+    normals = np.random.default_rng(0).normal(size=(count, 3))
+    return normals / np.linalg.norm(normals, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("bits, dtype, component_type", [
+    (2, np.int8, BYTE),
+    (8, np.int8, BYTE),
+    (9, np.int16, SHORT),
+    (16, np.int16, SHORT),
+])
+def test_quantized_normals_stay_within_their_precision(bits, dtype, component_type):
+    normals = unit_normals()
+    quantized, component = quantize_normals(normals, bits)
+
+    assert quantized.dtype == dtype
+    assert component == component_type
+    full = np.iinfo(dtype).max
+    assert np.abs(quantized).max() <= full
+
+    # Decoded as a glTF normalized integer, each component is on a grid of 2^(bits-1) - 1 levels
+    levels = (1 << (bits - 1)) - 1
+    decoded = quantized / full
+    assert np.abs(decoded - normals).max() <= 0.5 / levels + 1.0 / full
+
+
+def test_out_of_range_components_are_clamped():
+    quantized, _ = quantize_normals(np.array([[1.5, -2.0, 0.0]]), 8)
+    assert quantized.tolist() == [[127, -127, 0]]
+
+
+@pytest.mark.parametrize("bits", [-1, 0, 1, 17])
+def test_rejects_unsupported_bit_counts(bits):
+    with pytest.raises(ValueError):
+        quantize_normals(unit_normals(), bits)
@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from api.conversion import end_effector_column
+from api.kinematics import KinematicChain, end_effector_positions, load_chain, normalize_robot_type
+from api.urdf import parse_urdf
+
+# Two-link planar arm: links of 0.3 m and 0.2 m, both joints about +Z
+PLANAR_ARM = """<?xml version="1.0"?>
+<robot name="planar_arm">
+  <link name="base"/>
+  <link name="upper"/>
+  <link name="lower"/>
+  <link name="tool"/>
+  <joint name="shoulder" type="revolute">
+    <parent link="base"/>
+    <child link="upper"/>
+    <origin xyz="0 0 0.1" rpy="0 0 0"/>
+    <axis xyz="0 0 1"/>
+    <limit lower="-1.57" upper="1.57" effort="1" velocity="1"/>
+  </joint>
+  <joint name="elbow" type="revolute">
+    <parent link="upper"/>
+    <child link="lower"/>
+    <origin xyz="0.3 0 0" rpy="0 0 0"/>
+    <axis xyz="0 0 1"/>
+    <limit lower="-2" upper="2" effort="1" velocity="1"/>
+  </joint>
+  <joint name="tool_mount" type="fixed">
+    <parent link="lower"/>
+    <child link="tool"/>
+    <origin xyz="0.2 0 0" rpy="0 0 0"/>
+  </joint>
+</robot>
+"""
+
+
+@pytest.fixture
+def chain(tmp_path):
+    urdf = tmp_path / "planar_arm.urdf"
+    urdf.write_text(PLANAR_ARM)
+    return KinematicChain(parse_urdf(urdf))
+
+
+def test_known_poses(chain):
+    q = np.array([
+        [0.0, 0.0],
+        [np.pi / 2, 0.0],
+        [0.0, np.pi / 2],
+        [np.pi / 4, -np.pi / 2],
+    ])
+
+    expected = np.array([
+        [0.5, 0.0, 0.1],
+        [0.0, 0.5, 0.1],
+        [0.3, 0.2, 0.1],
+        [0.3 / np.sqrt(2) + 0.2 / np.sqrt(2), 0.3 / np.sqrt(2) - 0.2 / np.sqrt(2), 0.1],
+    ])
+    np.testing.assert_allclose(chain.positions(q, "tool"), expected, atol=1e-12)
+
+    # Three.js frame is Y-up: (x, y, z) -> (x, z, -y)
+    np.testing.assert_allclose(
+        chain.positions(q, "tool", frame="three"), expected[:, [0, 2, 1]] * [1, 1, -1], atol=1e-12,
+    )
+
+
+def test_chunked_positions_match(chain):
+    q = np.random.default_rng(0).uniform(-1.5, 1.5, size=(100, 2))
+    np.testing.assert_allclose(chain.positions(q, "tool", chunk=7), chain.positions(q, "tool"))
+
+
+def test_link_pose_orientation(chain):
+    pose = chain.link_poses([[np.pi / 2, 0.0]], ["lower"])["lower"][0]
+    np.testing.assert_allclose(pose[:3, 3], [0.0, 0.3, 0.1], atol=1e-12)
+    np.testing.assert_allclose(pose[:3, 0], [0.0, 1.0, 0.0], atol=1e-12)
+
+
+def test_within_limits(chain):
+    assert chain.joint_names == ["shoulder", "elbow"]
+    mask = chain.within_limits([[0.0, 0.0], [1.6, 0.0], [0.0, -2.0]])
+    assert mask.tolist() == [True, False, True]
+
+
+def test_unknown_robot_has_no_end_effector():
+    assert end_effector_positions("unknown-arm", [[0.0] * 6]) is None
+
+
+@pytest.mark.parametrize("robot_type", ["so101", "SO-101", "so_101", "arm"])
+def test_robot_types_resolve_to_the_so101(robot_type):
+    assert normalize_robot_type(robot_type) == "so101"
+    assert load_chain(robot_type) is load_chain("so101")
+
+
+def test_so101_end_effector_at_home():
+    # Uploads from the app send "arm"; home pose with the gripper open is above the table
+    positions = end_effector_positions("arm", [[0.0, 0.0, 0.0, 0.0, 0.0, 100.0]])
+    np.testing.assert_allclose(positions, end_effector_positions("so101", [[0.0, 0.0, 0.0, 0.0, 0.0, 100.0]]))
+    assert positions.shape == (1, 3)
+    assert positions[0, 1] > 0
+
+
+def test_arm_uploads_get_end_effector_positions():
+    states = [[0.0, 0.0, 0.0, 0.0, 0.0, 100.0], [30.0, -20.0, 10.0, 0.0, 0.0, 50.0]]
+
+    column = end_effector_column("arm", states)
+
+    assert column is not None
+    np.testing.assert_allclose(
+        np.asarray(column.flatten()).reshape(-1, 3), end_effector_positions("so101", states), atol=1e-6,
+    )
+    assert end_effector_column("wheeled", states) is None
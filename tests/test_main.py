@@ -0,0 +1,71 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Routers are mounted when api.main is imported, so each configuration gets a fresh interpreter
+REPORT = """
+import json
+import api.main
+print(json.dumps({
+    "paths": sorted(api.main.app.openapi()["paths"]),
+    "report": api.main.startup_report(),
+}))
+"""
+
+
+def import_main(routers=None):
+    env = {key: value for key, value in os.environ.items() if key != "API_ROUTERS"}
+    if routers is not None:
+        env["API_ROUTERS"] = routers
+    return subprocess.run(
+        [sys.executable, "-c", REPORT], cwd=PROJECT_ROOT, env=env, capture_output=True, text=True,
+    )
+
+
+def loaded(routers=None):
+    result = import_main(routers)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_all_routers_are_mounted_by_default():
+    app = loaded()
+
+    assert app["report"]["routers"] == ["datasets", "examples", "training", "billing"]
+    assert {
+        "/health", "/api/dataset/upload", "/api/dataset/convert", "/api/examples/similar",
+        "/api/examples/all", "/api/training/trigger", "/api/stripe/webhook",
+    } <= set(app["paths"])
+
+
+def test_only_selected_routers_are_mounted():
+    app = loaded(" examples , billing ")
+
+    assert app["report"]["routers"] == ["examples", "billing"]
+    assert app["paths"] == [
+        "/api/examples",
+        "/api/examples/all",
+        "/api/examples/coverage-gaps",
+        "/api/examples/similar",
+        "/api/examples/stats",
+        "/api/stripe/webhook",
+        "/health",
+    ]
+
+
+def test_import_loads_no_heavy_dependencies():
+    assert loaded()["report"]["heavy_modules_loaded"] == []
+
+
+@pytest.mark.parametrize("routers", ["examples,payments", "dataset"])
+def test_unknown_router_fails_at_import(routers):
+    result = import_main(routers)
+
+    assert result.returncode != 0
+    assert "Unknown router in API_ROUTERS" in result.stderr
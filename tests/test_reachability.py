@@ -0,0 +1,113 @@
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from api import main
+from api.kinematics import end_effector_positions
+from api.reachability import CELL_DTYPE, FORMAT_VERSION, SEED_JOINTS, ReachabilityMap
+from api.storage import SQLiteExampleStore
+from build_reachability_map import build_map
+
+VOXEL = 0.1
+
+
+def seed(value):
+    return [value] * len(SEED_JOINTS)
+
+
+@pytest.fixture
+def reachability():
+    """4 x 3 x 4 voxels of 10 cm from the origin, three of them reachable along the diagonal"""
+    cells = np.zeros((4, 3, 4), dtype=CELL_DTYPE)
+    for i, index in enumerate([(1, 0, 1), (2, 1, 2), (3, 2, 3)]):
+        cells["count"][index] = 10
+        cells["seed"][index] = seed(float(i + 1))
+    meta = {"version": FORMAT_VERSION, "voxel_size": VOXEL, "origin": [0.0, 0.0, 0.0], "shape": [4, 3, 4]}
+    return ReachabilityMap(cells, meta)
+
+
+def test_seed_near_picks_the_nearest_reachable_voxel(reachability):
+    found = reachability.seed_near([0.24, 0.14, 0.24], max_distance=0.2)
+
+    assert found["joints"] == dict(zip(SEED_JOINTS, seed(2.0)))
+    assert found["position"] == [0.25, 0.15, 0.25]
+    assert found["distance"] == pytest.approx(np.sqrt(3) * 0.01)
+
+
+def test_seed_near_always_considers_the_containing_voxel(reachability):
+    found = reachability.seed_near([0.11, 0.01, 0.11], max_distance=0.001)
+    assert found["joints"]["base"] == 1.0
+
+
+def test_seed_near_without_reachable_voxels_in_range(reachability):
+    # Unreachable voxel, farther than max_distance from any reachable one
+    assert reachability.seed_near([0.05, 0.25, 0.35], max_distance=0.1) is None
+    # Outside the map
+    assert reachability.seed_near([5.0, 5.0, 5.0], max_distance=0.1) is None
+    assert reachability.seed_near([-1.0, 0.0, 0.0], max_distance=0.1) is None
+
+
+def test_reachable_columns(reachability):
+    # Voxel centers are 0.05 + 0.1 * i, i.e. cells 1, 3, 5, 7 of a 5 cm grid
+    assert reachability.reachable_columns(0.05, 0.0, 0.3) == {(3, 3), (5, 5), (7, 7)}
+    assert reachability.reachable_columns(0.05, 0.0, 0.1) == {(3, 3)}
+    assert reachability.reachable_columns(0.05, 0.1, 0.2) == {(5, 5)}
+    assert reachability.reachable_columns(0.05, 1.0, 2.0) == set()
+
+
+def test_load(tmp_path, reachability):
+    path = tmp_path / "reachability"
+    assert ReachabilityMap.load(path) is None
+
+    np.save(path.with_suffix(".npy"), reachability.cells)
+    path.with_suffix(".json").write_text(json.dumps(reachability.meta))
+    loaded = ReachabilityMap.load(path)
+    assert loaded.seed_near([0.15, 0.05, 0.15], 0.01)["joints"]["base"] == 1.0
+
+    path.with_suffix(".json").write_text(json.dumps(dict(reachability.meta, version=FORMAT_VERSION + 1)))
+    with pytest.raises(ValueError, match="unsupported"):
+        ReachabilityMap.load(path)
+
+
+def test_built_seeds_reach_their_voxels():
+    cells, meta = build_map("so101", samples=20_000, voxel=0.05, min_y=0.0, seed=0)
+    reachability = ReachabilityMap(cells, meta)
+
+    indices = np.argwhere(cells["count"] > 0)
+    seeds = np.array([cells["seed"][tuple(index)] for index in indices])
+    reached = end_effector_positions("so101", seeds)
+
+    distance = np.linalg.norm(reached - reachability.center(indices), axis=1)
+    assert distance.max() <= meta["voxel_size"] * np.sqrt(3) / 2 + 1e-6
+
+
+# =============================================================================
+# GET /api/examples/similar
+# =============================================================================
+
+@pytest.fixture
+def client(tmp_path, monkeypatch, reachability):
+    store = SQLiteExampleStore(tmp_path / "examples.db")
+    monkeypatch.setattr(main, "get_example_store", lambda: store)
+    monkeypatch.setattr(main, "get_reachability_map", lambda: reachability)
+    return TestClient(main.app)
+
+
+def test_similar_returns_a_seed_only_when_asked(client):
+    query = {"x": 0.15, "y": 0.05, "z": 0.15}
+
+    assert client.get("/api/examples/similar", params=query).json() == []
+
+    seeded = client.get("/api/examples/similar", params=dict(query, fallback_seed="true")).json()
+    assert len(seeded) == 1
+    assert seeded[0]["source"] == "reachability"
+    assert seeded[0]["similarity"] == pytest.approx(1.0)
+
+
+def test_similar_rejects_a_zero_max_distance(client):
+    response = client.get("/api/examples/similar", params={
+        "x": 0.15, "y": 0.05, "z": 0.15, "max_distance": 0, "fallback_seed": "true",
+    })
+    assert response.status_code == 422
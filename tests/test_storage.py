@@ -0,0 +1,197 @@
+import pytest
+
+from api.storage import (
+    CANDIDATE_COLUMNS,
+    DETAIL_CHUNK,
+    ExampleStore,
+    SQLiteExampleStore,
+    SupabaseExampleStore,
+    payload_bytes,
+)
+from benchmark_api import InMemoryAPIError, InMemoryQuery
+
+
+def example(position, object_type="cube", **fields):
+    return dict({
+        "object_position": position,
+        "object_type": object_type,
+        "object_scale": 1.0,
+        "joint_sequence": [[0.0, 10.0, 20.0, 30.0, 40.0, 50.0]],
+        "user_message": "pick it up",
+    }, **fields)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteExampleStore(tmp_path / "examples.db")
+
+
+def test_example_store_is_abstract():
+    with pytest.raises(TypeError):
+        ExampleStore()
+
+
+def test_insert_and_count(store):
+    assert store.count() == 0
+    example_id = store.insert(example([0.1, 0.0, 0.1]))
+    store.insert(example([0.2, 0.0, 0.2], id="fixed-id"))
+
+    assert isinstance(example_id, str)
+    assert store.count() == 2
+    assert store.stats()["by_type"] == {"cube": 2}
+
+
+def test_similar_is_ranked_and_filtered(store):
+    near = store.insert(example([0.10, 0.0, 0.10]))
+    nearer = store.insert(example([0.11, 0.0, 0.10]))
+    store.insert(example([0.11, 0.0, 0.11], object_type="ball"))
+    store.insert(example([0.50, 0.0, 0.50]))
+
+    rows, read_stats = store.read_similar([0.11, 0.0, 0.10], max_distance=0.05, object_type="cube")
+
+    assert [row["id"] for row in rows] == [nearer, near]
+    assert rows[0]["distance"] == pytest.approx(0.0)
+    assert rows[1]["distance"] == pytest.approx(0.01)
+    assert rows[0]["joint_sequence"] == [[0.0, 10.0, 20.0, 30.0, 40.0, 50.0]]
+    assert "user_message" not in rows[0]
+    assert read_stats["candidate_rows"] == read_stats["detail_rows"] == 2
+
+
+def test_similar_respects_limit_and_radius(store):
+    for i in range(5):
+        store.insert(example([0.01 * i, 0.0, 0.0]))
+
+    rows, _ = store.read_similar([0.0, 0.0, 0.0], max_distance=0.025, limit=2)
+    assert [row["object_position"] for row in rows] == [[0.0, 0.0, 0.0], [0.01, 0.0, 0.0]]
+
+    rows, _ = store.read_similar([1.0, 1.0, 1.0], max_distance=0.1)
+    assert rows == []
+
+
+def test_page_is_newest_first(store):
+    ids = [
+        store.insert(example([0.1 * i, 0.0, 0.0], created_at=f"2026-01-0{i + 1}T00:00:00"))
+        for i in range(5)
+    ]
+
+    first, _ = store.read_page(limit=2)
+    second, _ = store.read_page(limit=2, offset=2)
+    last, _ = store.read_page(limit=2, offset=4)
+
+    assert [row["id"] for row in first + second + last] == ids[::-1]
+    assert first[0]["joint_sequence"] == [[0.0, 10.0, 20.0, 30.0, 40.0, 50.0]]
+    assert "user_message" not in first[0]
+
+
+# =============================================================================
+# SUPABASE
+# =============================================================================
+
+def supabase_rows(*positions):
+    return [
+        dict(example(position), id=f"ex-{i}", created_at=f"2026-01-0{i + 1}T00:00:00", ik_errors={"grasp": 0.001})
+        for i, position in enumerate(positions)
+    ]
+
+
+def test_supabase_similar_uses_the_rpc(supabase):
+    supabase.tables["shared_examples"] = supabase_rows([0.1, 0.0, 0.1], [0.3, 0.0, 0.3])
+    calls = []
+
+    def match_similar_examples(**params):
+        calls.append(params)
+        return [{"id": "ex-0", "object_position": [0.1, 0.0, 0.1], "object_type": "cube",
+                 "object_scale": 1.0, "distance": 0.01}]
+
+    supabase.functions["match_similar_examples"] = match_similar_examples
+    store = SupabaseExampleStore(supabase)
+
+    rows, _ = store.read_similar([0.11, 0.0, 0.1], max_distance=0.05, object_type="cube", limit=3)
+
+    assert calls == [{
+        "target_x": 0.11, "target_y": 0.0, "target_z": 0.1,
+        "max_distance": 0.05, "match_count": 3, "filter_type": "cube",
+    }]
+    assert [row["id"] for row in rows] == ["ex-0"]
+    assert rows[0]["joint_sequence"] == [[0.0, 10.0, 20.0, 30.0, 40.0, 50.0]]
+
+
+def test_supabase_similar_falls_back_without_the_rpc(supabase, monkeypatch):
+    supabase.tables["shared_examples"] = supabase_rows([0.10, 0.0, 0.10], [0.11, 0.0, 0.10], [0.3, 0.0, 0.3])
+    rpc_calls = []
+    rpc = supabase.rpc
+    monkeypatch.setattr(supabase, "rpc", lambda *args: rpc_calls.append(args) or rpc(*args))
+    store = SupabaseExampleStore(supabase)
+
+    rows, read_stats = store.read_similar([0.11, 0.0, 0.10], max_distance=0.05)
+    assert [row["id"] for row in rows] == ["ex-1", "ex-0"]
+    assert rows[1]["distance"] == pytest.approx(0.01)
+    # Every candidate row crossed the wire, not only the two in range
+    table = supabase.tables["shared_examples"]
+    assert read_stats["candidate_bytes"] == payload_bytes([{c: row[c] for c in CANDIDATE_COLUMNS} for row in table])
+
+    # PGRST202 is remembered: later queries go straight to the fallback
+    store.read_similar([0.3, 0.0, 0.3], max_distance=0.05)
+    assert len(rpc_calls) == 1
+
+
+def test_supabase_similar_raises_other_rpc_errors(supabase):
+    def match_similar_examples(**params):
+        raise InMemoryAPIError({"code": "57014", "message": "canceling statement due to statement timeout"})
+
+    supabase.functions["match_similar_examples"] = match_similar_examples
+    store = SupabaseExampleStore(supabase)
+
+    with pytest.raises(InMemoryAPIError):
+        store.read_similar([0.0, 0.0, 0.0], max_distance=0.05)
+
+
+@pytest.fixture
+def query_log(monkeypatch):
+    """Columns selected and id-list sizes of every in-memory Supabase query"""
+    log = []
+    select, in_ = InMemoryQuery.select, InMemoryQuery.in_
+    monkeypatch.setattr(InMemoryQuery, "select",
+                        lambda self, columns="*", count=None: log.append(("select", columns)) or select(self, columns, count))
+    monkeypatch.setattr(InMemoryQuery, "in_",
+                        lambda self, column, values: log.append(("in", len(values))) or in_(self, column, values))
+    return log
+
+
+def test_supabase_similar_reads_details_only_for_returned_ids(supabase, query_log):
+    supabase.tables["shared_examples"] = supabase_rows([0.10, 0.0, 0.10], [0.11, 0.0, 0.10], [0.3, 0.0, 0.3])
+    store = SupabaseExampleStore(supabase)
+
+    rows, read_stats = store.read_similar([0.11, 0.0, 0.10], max_distance=0.05, limit=1)
+
+    assert query_log == [
+        ("select", "id, object_position, object_type, object_scale"),
+        ("select", "id, joint_sequence"),
+        ("in", 1),
+    ]
+    assert set(rows[0]) == {"id", "object_position", "object_type", "object_scale", "distance", "joint_sequence"}
+    assert read_stats["detail_rows"] == 1
+
+
+def test_supabase_page_is_one_query(supabase, query_log):
+    supabase.tables["shared_examples"] = supabase_rows(*([[0.1, 0.0, 0.1]] * 5))
+    store = SupabaseExampleStore(supabase)
+
+    rows, read_stats = store.read_page(limit=2, offset=1)
+
+    assert query_log == [("select", "id, object_position, object_type, object_scale, joint_sequence")]
+    assert [row["id"] for row in rows] == ["ex-3", "ex-2"]
+    assert rows[0]["joint_sequence"] == [[0.0, 10.0, 20.0, 30.0, 40.0, 50.0]]
+    assert "user_message" not in rows[0]
+    assert read_stats["detail_bytes"] == 0
+
+
+def test_supabase_details_are_fetched_in_chunks(supabase, query_log):
+    supabase.tables["shared_examples"] = [dict(example([0.0, 0.0, 0.0]), id=f"ex-{i}") for i in range(450)]
+    store = SupabaseExampleStore(supabase)
+
+    details = store.fetch_details([f"ex-{i}" for i in range(450)])
+
+    assert [entry for entry in query_log if entry[0] == "in"] == [("in", DETAIL_CHUNK), ("in", DETAIL_CHUNK), ("in", 50)]
+    assert len(details) == 450
+    assert details["ex-449"]["joint_sequence"] == [[0.0, 10.0, 20.0, 30.0, 40.0, 50.0]]